@@ -17,22 +17,33 @@
 
 from __future__ import division
 from __future__ import print_function
-from six import iteritems, text_type
+from six import iteritems, text_type, PY2
 from six.moves import input
 from textwrap import TextWrapper
 from getpass import getpass
 from collections import defaultdict, OrderedDict
 from datetime import datetime, timedelta
-from argparse import ArgumentParser
+from argparse import ArgumentParser, ArgumentTypeError
 from itertools import chain
+from bisect import bisect_left
+import multiprocessing
+import resource
 import threading
 import functools
+import atexit
 import shutil
 import warnings
 import time
+import uuid
+import codecs
+import signal
 import pexpect
 import logging
+import logging.handlers
 import subprocess
+import tarfile
+import gzip
+import io
 import json
 import sys
 import os
@@ -40,6 +51,21 @@ import re
 
 SCRIPT_VERSION = "v4.2.0"
 DEFAULT_TIMEOUT = 600  # sec
+# time.monotonic() is not available in python2
+monotonic = getattr(time, "monotonic", time.time)
+# worker pool constants
+WORKERS_PER_CPU = 4
+WORKER_MEMORY_BUDGET = 64 * 1024 * 1024  # bytes
+MAX_DEFAULT_WORKERS = 32
+MEMORY_POLL_INTERVAL = 1  # sec, to re-check available memory for checks waiting for it
+SSH_FANOUT_PARALLELISM = 8  # hosts per check to SSH at the same time
+SSH_CONTROL_PERSIST = 300  # sec a ControlMaster stays after its last command, also when the script is killed
+SSH_PROMPT_SETTLE = 0.5  # sec without more output to take the prompt at the end of a streamed output
+MAX_TABLE_ROWS = 1000  # rows of each table to print. All rows are in TABLE_DIR
+TABLE_PRINT_CHUNK = 500  # lines per write to the output
+FINGERPRINT_JOIN_TIMEOUT = 60  # sec to wait for fingerprints after all checks finished
+CHECKPOINT_SAVE_EVERY = 20  # finished checks between checkpoint saves
+CHECKPOINT_SAVE_INTERVAL = 60  # sec, max between checkpoint saves while checks finish
 # result constants
 DONE = 'DONE'
 PASS = 'PASS'
@@ -104,10 +130,26 @@ JSON_DIR = os.path.join(DIR, 'json_results/')
 META_FILE = os.path.join(DIR, 'meta.json')
 RESULT_FILE = os.path.join(DIR, 'preupgrade_validator_%s%s.txt' % (ts, tz))
 SUMMARY_FILE = os.path.join(DIR, 'summary.json')
+RESULT_JOURNAL = os.path.join(DIR, 'results.jsonl')
+TABLE_DIR = os.path.join(DIR, 'tables/')  # full tables too long to print
+FINGERPRINT_FILE = os.path.join(DIR, 'fingerprints.json')  # classes read by checks, for `--rerun-from`
 LOG_FILE = os.path.join(DIR, 'preupgrade_validator_debug.log')
+RESPONSE_LOG_FILE = os.path.join(DIR, 'preupgrade_validator_responses.log')
+SSH_CONTROL_DIR = os.path.join(DIR, 'ssh/')  # sockets of OpenSSH ControlMaster
+CHECKPOINT_FILE = os.path.join(DIR, 'checkpoint.json')  # for `--resume`
+CHECKPOINT_DATA_FILE = os.path.join(DIR, 'checkpoint_data.json')  # shared data for `--resume`
+# Kept outside of DIR to be used across runs
+STATS_FILE = 'preupgrade_validator_stats.json'
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
 log = logging.getLogger()
+# Full responses of API queries and commands. Only with `enable_response_log()`
+response_log = logging.getLogger("responses")
+response_log.propagate = False
+response_log.disabled = True
+RESPONSE_LOG_CAP = 2048  # bytes of a response in LOG_FILE, half from the head and half from the tail
+RESPONSE_LOG_MAX_BYTES = 50 * 1024 * 1024  # per RESPONSE_LOG_FILE before rotating
+RESPONSE_LOG_BACKUPS = 2
 
 
 # TimeoutError is only from py3.3
@@ -118,6 +160,11 @@ except NameError:
         pass
 
 
+class CheckCancelled(Exception):
+    """ A check was cancelled because it ran out of time """
+    pass
+
+
 class OldVerClassNotFound(Exception):
     """ Later versions of ACI can have class properties not found in older versions """
     pass
@@ -150,12 +197,18 @@ class Connection(object):
                                for prompt character.
                                This should only be used in those unique scenarios...
                                Default is 0 seconds (disabled).  If needed, set to 8 (seconds)
+        control_dir      (opt) directory for OpenSSH ControlMaster sockets (default None)
+                               When set, login() starts one ControlMaster for the host, and
+                               each cmd() is a non-interactive `ssh -S <socket> host command`
+                               over it. No prompt matching or terminal length is involved, and
+                               `exit_status` is set. Only for the ssh protocol.
 
         functions:
         connect()        (opt) connect to device with provided protocol/port/hostname
         login()          (opt) log into device with provided credentials
         close()          (opt) close current connection
         cmd()            execute a command on the device (provide matches and timeout)
+        run_batch()      execute multiple shell commands with one write and one prompt wait
 
     Example using all defaults
         c = Connection("10.122.140.89")
@@ -179,8 +232,12 @@ class Connection(object):
         self.verify = False
         self.searchwindowsize = 256
         self.force_wait = 0
+        self.control_dir = None
+        self.ssh = "ssh"  # ssh executable
         self.child = None
         self.output = ""  # output from last command
+        self.last_match = None  # matched key of last command (i.e. prompt, timeout), error when it raised
+        self.exit_status = None  # exit status of last command in ControlMaster mode
         self._term_len = 0  # terminal length for cisco devices
         self._login = False  # set to true at first successful login
         self._log = None  # private variable for tracking logfile state
@@ -234,6 +291,13 @@ class Connection(object):
                 self.port = 22
             if self.protocol == "telnet":
                 self.port = 23
+        # ControlMaster is started at login
+        if self.control_dir is not None:
+            if self.protocol.lower() != "ssh":
+                raise Exception("ControlMaster is only for ssh, not %s" % self.protocol)
+            if not os.path.isdir(self.control_dir):
+                os.makedirs(self.control_dir, 0o700)
+            return
         # spawn new thread
         if self.protocol.lower() == "ssh":
             log.debug(
@@ -254,6 +318,12 @@ class Connection(object):
         self.start_log()
 
     def close(self):
+        if self.control_dir is not None:
+            if self._login:
+                log.info("stopping ControlMaster for %s" % self.hostname)
+                self.__control(["-O", "exit"])
+            self._login = False
+            return
         # try to gracefully close the connection if opened
         if self.__connected():
             log.info("closing current connection")
@@ -301,6 +371,9 @@ class Connection(object):
 
         log.debug("Logging into host")
 
+        if self.control_dir is not None:
+            return self.__start_control_master(max_attempts, timeout)
+
         # successfully logged in at a different time
         if not self.__connected(): self.connect()
         # check for user provided 'prompt' which indicates successful login
@@ -349,6 +422,103 @@ class Connection(object):
         log.error("failed to login after multiple attempts")
         return False
 
+    @property
+    def control_path(self):
+        return os.path.join(self.control_dir, "%s@%s:%s" % (self.username, self.hostname, self.port))
+
+    def __control(self, args, command=None, timeout=None):
+        """
+        run ssh over the ControlMaster socket with `args` such as ['-O', 'check'].
+        returns (exit status, output). exit status is None on timeout.
+        """
+        argv = [self.ssh, "-S", self.control_path, "-o", "ControlMaster=no", "-o", "BatchMode=yes",
+                "-p", str(self.port)] + args + ["%s@%s" % (self.username, self.hostname)]
+        if command is not None:
+            argv.append(command)
+        # in its own session to kill any of its children at timeout as well.
+        # `preexec_fn` is not safe while other threads run, but python2 has only that.
+        if PY2:
+            session_kwargs = {"preexec_fn": os.setsid}
+        else:
+            session_kwargs = {"start_new_session": True}
+        with open(os.devnull, "rb") as devnull:
+            proc = subprocess.Popen(argv, stdin=devnull, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                    **session_kwargs)
+
+        def _kill():
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except OSError:  # already exited
+                pass
+        # `communicate(timeout)` is py3 only
+        timer = threading.Timer(timeout if timeout is not None else self.timeout, _kill)
+        timer.start()
+        try:
+            output = proc.communicate()[0]
+        finally:
+            timer.cancel()
+        status = proc.returncode
+        if status is not None and status < 0:  # killed by the timer
+            status = None
+        return status, output.decode("utf-8", "replace")
+
+    def __start_control_master(self, max_attempts, timeout):
+        """start a ControlMaster for the host unless one is running, and returns true when running"""
+        if not os.path.isdir(self.control_dir):
+            self.connect()
+        if self.__control(["-O", "check"])[0] == 0:
+            self._login = True
+            return True
+        no_verify = " -o StrictHostKeyChecking=no -o LogLevel=ERROR -o UserKnownHostsFile=/dev/null"
+        if self.verify: no_verify = ""
+        # the client exits after authentication and the master stays in the background
+        # until it is idle for SSH_CONTROL_PERSIST so that it never outlives a killed script for long
+        command = "%s %s -o ControlMaster=yes -o ControlPersist=%d -S %s -p %d %s@%s true" % (
+            self.ssh, no_verify, SSH_CONTROL_PERSIST, self.control_path, self.port, self.username, self.hostname)
+        log.debug("spawning ControlMaster: %s" % command)
+        child = pexpect.spawn(command)
+        try:
+            password_sent = False
+            while max_attempts > 0:
+                max_attempts -= 1
+                match = child.expect(["(?i)yes/no", "(?i)password[ \t]*:[ \t]*$", pexpect.EOF, pexpect.TIMEOUT], timeout)
+                if match == 0:
+                    child.sendline("yes")
+                elif match == 1:
+                    if password_sent:
+                        log.error("password rejected by host")
+                        break
+                    child.sendline(self.password)
+                    password_sent = True
+                else:
+                    break
+        finally:
+            child.close(force=True)
+        self._login = self.__control(["-O", "check"])[0] == 0
+        if not self._login:
+            log.error("failed to start ControlMaster")
+        return self._login
+
+    def __control_cmd(self, command, timeout):
+        """execute a command over the ControlMaster. Same return values as cmd()"""
+        self.exit_status = None
+        if not self._login and not self.login():
+            raise Exception("failed to login to host")
+        log.debug("cmd command: %s" % command)
+        self.exit_status, self.output = self.__control([], command, timeout)
+        if self.exit_status is None:
+            log.warning("unexpected timeout occurred")
+            self.last_match = "timeout"
+        elif self.exit_status == 255:
+            # ssh itself failed, such as the master being gone. The output is
+            # the error of ssh, not of the command. Login again next time.
+            log.warning("ssh failed over the ControlMaster: %s" % self.output.strip())
+            self.last_match = "eof"
+            self._login = False
+        else:
+            self.last_match = "prompt"
+        return self.last_match
+
     def cmd(self, command, **kargs):
         """
         execute a command on a device and wait for one of the provided matches to return.
@@ -364,6 +534,15 @@ class Connection(object):
             echo_cmd - boolean flag to echo commands sent (default to false)
                 note most terminals (i.e., Cisco devices) will echo back all typed characters
                 by default.  Therefore, enabling echo_cmd may cause duplicate cmd characters
+            stream - boolean flag to read the output in chunks for large outputs (default to false)
+                only the prompt is detected, after the last newline of the output and only when
+                no more output comes in SSH_PROMPT_SETTLE seconds. 'matches' is ignored.
+                self.output keeps only the last 'tail' characters.
+            on_line - function called with each output line, including the echo of the command,
+                without the line ending. Implies stream
+            line_regex - regex. Only the lines matching it from the beginning are passed to
+                'on_line' as the match object. Implies stream
+            tail - characters of the output kept in self.output in stream (default to 65536)
         Return:
         returns the key from the matched regex.  For most scenarios, this will be 'prompt'.  The output
         from the command can be collected from self.output variable
@@ -381,12 +560,33 @@ class Connection(object):
             sendline = kargs["sendline"]
         if "echo_cmd" in kargs:
             echo_cmd = kargs["echo_cmd"]
+        on_line = kargs.get("on_line")
+        line_regex = kargs.get("line_regex")
+        stream = kargs.get("stream", False) or on_line is not None or line_regex is not None
+        tail = kargs.get("tail", 65536)
 
         # ensure prompt is in the matches list
         if "prompt" not in matches:
             matches["prompt"] = self.prompt
 
+        # stop here when the check running this command ran out of time, or
+        # wait only for the remaining time of the check
+        check_cancelled()
+        token = CancelToken.current()
+        if token is not None and token.remaining() is not None:
+            timeout = min(timeout, token.remaining())
+
+        # stays until the command completes so that a stale match does not
+        # hide an exception in the middle of the command
+        self.last_match = "error"
         self.output = ""
+        if self.control_dir is not None:
+            result = self.__control_cmd(command, timeout)
+            if stream:
+                for line in self.output.splitlines():
+                    self.__handle_line(line, on_line, line_regex)
+                self.output = self.output[-tail:]
+            return result
         # check if we've ever logged into device or currently connected
         if (not self.__connected()) or (not self._login):
             log.debug("no active connection, attempt to login")
@@ -411,12 +611,263 @@ class Connection(object):
         if self.force_wait != 0:
             time.sleep(self.force_wait)
 
+        if stream:
+            result = self.__stream(timeout, on_line, line_regex, tail)
+            self.last_match = result
+            if result == "eof" or result == "timeout":
+                log.warning("unexpected %s occurred" % result)
+            return result
+
         result = self.__expect(matches, timeout)
-        self.output = "%s%s" % (self.child.before.decode("utf-8"), self.child.after.decode("utf-8"))
+        self.last_match = result
+        # `after` is pexpect.TIMEOUT or pexpect.EOF instead of the matched bytes for those
+        after = self.child.after if isinstance(self.child.after, bytes) else b""
+        self.output = "%s%s" % (self.child.before.decode("utf-8"), after.decode("utf-8"))
         if result == "eof" or result == "timeout":
             log.warning("unexpected %s occurred" % result)
         return result
 
+    @staticmethod
+    def __handle_line(line, on_line, line_regex):
+        if line_regex is not None:
+            line = re.match(line_regex, line)
+            if line is None:
+                return
+        if on_line is not None:
+            on_line(line)
+
+    def __stream(self, timeout, on_line, line_regex, tail, chunk_size=8192):
+        """
+        read the output in chunks until the prompt. Each complete line is handed to
+        'on_line' right away, and only the last 'tail' characters are kept in self.output.
+        returns 'prompt', 'timeout' or 'eof'
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        prompt = re.compile(self.prompt)
+        pending = ""  # the last line without newline yet
+        prompt_seen = False  # pending looks like the prompt
+        result = "timeout"
+        deadline = monotonic() + timeout
+        while True:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                if prompt_seen:
+                    return "prompt"
+                break
+            try:
+                # a chunk may end in the middle of a line that only looks like the prompt.
+                # it is the prompt only when no more output follows.
+                chunk = self.child.read_nonblocking(
+                    chunk_size, min(remaining, SSH_PROMPT_SETTLE) if prompt_seen else remaining)
+            except pexpect.TIMEOUT:
+                if prompt_seen:
+                    return "prompt"
+                break
+            except pexpect.EOF:
+                result = "eof"
+                break
+            text = decoder.decode(chunk)
+            self.output = (self.output + text)[-tail:]
+            lines = (pending + text).split("\n")
+            pending = lines.pop()
+            for line in lines:
+                self.__handle_line(line.rstrip("\r"), on_line, line_regex)
+            # the prompt comes at the end of the output, after the last newline
+            prompt_seen = bool(prompt.search(pending))
+            # a line too long to be a prompt
+            if not prompt_seen and len(pending) > tail:
+                self.__handle_line(pending, on_line, line_regex)
+                pending = ""
+        if pending:
+            self.__handle_line(pending.rstrip("\r"), on_line, line_regex)
+        return result
+
+    def run_batch(self, commands, timeout=None):
+        """
+        execute multiple commands with a single write and a single prompt wait.
+        Each command is followed by `echo` of a unique sentinel with its exit code
+        to split the combined output back into each command.
+        Only for shells with `;` and `$?` such as bash on APIC, not for NX-OS CLI.
+        Required argument list commands
+        Optional arguments:
+            timeout - seconds to wait for all commands to complete (default to self.timeout)
+        Return:
+        returns a list of (output, exit code) for each command. The exit code is None for
+        the commands that did not complete, in which case self.last_match shows the reason
+        such as 'timeout'. The combined output can be collected from self.output variable
+        """
+        if not commands:
+            return []
+        if self.control_dir is not None:
+            # each exec is cheap over the ControlMaster and has its own exit status
+            results = []
+            for command in commands:
+                if self.cmd(command, **({"timeout": timeout} if timeout is not None else {})) != "prompt":
+                    break
+                results.append((self.output, self.exit_status))
+            return results + [("", None)] * (len(commands) - len(results))
+        marker = "PUV%s" % uuid.uuid4().hex[:12]
+        sentinel = "%s_%%d_$?_" % marker
+        line = " ; ".join(
+            "%s ; echo %s" % (command, sentinel % i) for i, command in enumerate(commands)
+        )
+        last_sentinel = r"%s_%d_\d+_" % (marker, len(commands) - 1)
+        kargs = {"matches": {"prompt": r"%s[\s\S]*?%s" % (last_sentinel, self.prompt)}}
+        if timeout is not None:
+            kargs["timeout"] = timeout
+        self.cmd(line, **kargs)
+
+        output = self.output
+        # skip the echo of the command line itself, which ends with the last sentinel
+        echo_end = output.rfind(sentinel % (len(commands) - 1))
+        start = output.find("\n", echo_end) + 1 if echo_end >= 0 else 0
+        results = []
+        sentinel_regex = re.compile(r"%s_(\d+)_(\d+)_" % marker)
+        m = sentinel_regex.search(output, start)
+        while m:
+            results.append((output[start:m.start()].strip("\r\n"), int(m.group(2))))
+            start = m.end()
+            m = sentinel_regex.search(output, start)
+        if len(results) < len(commands):
+            log.warning("only %d of %d commands completed" % (len(results), len(commands)))
+            results.append((output[start:].strip("\r\n"), None))
+        results += [("", None)] * (len(commands) - len(results))
+        return results
+
+
+class ConnectionPool(object):
+    """SSH sessions shared by checks during one script run, keyed by (hostname, username).
+
+    Each host is logged into only once even when multiple checks SSH to it,
+    which saves seconds per login with remote AAA (TACACS/RADIUS). A session
+    is used by one check at a time. `acquire()` waits for it while the other
+    check is using it, and `release()` must be called when done.
+
+    A session whose last command ended with timeout, EOF or an exception, or
+    that is released with `broken=True`, is closed at `release()` because
+    leftover output would be mixed into the next command.
+    All sessions are closed at `close_all()` in `wrapup_system()`.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conns = {}  # {(hostname, username): Connection}
+        self._host_locks = {}  # {(hostname, username): Lock}
+        self.control_dir = None  # OpenSSH ControlMaster mode when set (see `Connection`)
+
+    def acquire(self, hostname, username, password=None):
+        """Returns a connected Connection for exclusive use until `release()`"""
+        key = (hostname, username)
+        with self._lock:
+            host_lock = self._host_locks.setdefault(key, threading.Lock())
+        while not host_lock.acquire(False):
+            check_cancelled()
+            time.sleep(0.1)
+        try:
+            c = self._conns.get(key)
+            if c is None:
+                c = Connection(hostname)
+                c.username = username
+                if password is not None:
+                    c.password = password
+                c.log = LOG_FILE
+                c.control_dir = self.control_dir
+                c.connect()
+                self._conns[key] = c
+            else:
+                log.debug("Reusing the SSH session to %s@%s", username, hostname)
+        except Exception:
+            host_lock.release()
+            raise
+        return c
+
+    def release(self, c, broken=False):
+        """Return `c` to the pool. `broken` when the user of `c` failed while using it."""
+        key = (c.hostname, c.username)
+        # No leftover output with ControlMaster. Keep the master for the next check.
+        if broken or (c.last_match in ("eof", "timeout", "error") and c.control_dir is None):
+            self._discard(key)
+        self._host_locks[key].release()
+
+    def _discard(self, key):
+        with self._lock:
+            c = self._conns.pop(key, None)
+        if c is not None:
+            try:
+                c.close()
+            except Exception:
+                log.warning("Failed to close the SSH session to %s@%s", key[1], key[0], exc_info=True)
+
+    def close_all(self):
+        with self._lock:
+            keys = list(self._conns)
+        for key in keys:
+            self._discard(key)
+
+
+# Shared by all checks in one script run
+ssh_pool = ConnectionPool()
+
+
+def ssh_fanout(hosts, func, username, password=None, parallel=SSH_FANOUT_PARALLELISM):
+    """Run `func(c)` with a session from `ssh_pool` to each host concurrently.
+
+    At most `parallel` hosts are worked on at a time. The CancelToken of the
+    calling check applies to all of them.
+
+    Args:
+        hosts (list): Hostnames or IP addresses.
+        func (callable): Takes a logged-in `Connection` and returns anything.
+    Returns:
+        list: (return value of `func`, None) or (None, exception) per host,
+              in the same order as `hosts`. The exception is either from
+              connecting to the host or from `func`.
+    """
+    results = [(None, None)] * len(hosts)
+    pending = list(enumerate(hosts))
+    lock = threading.Lock()
+    token = CancelToken.current()
+
+    def _worker():
+        CancelToken.set_current(token)
+        while True:
+            with lock:
+                if not pending:
+                    return
+                i, host = pending.pop(0)
+            try:
+                c = ssh_pool.acquire(host, username, password)
+            except Exception as e:
+                log.error("Failed to connect to %s: %s", host, e)
+                results[i] = (None, e)
+                continue
+            broken = True
+            try:
+                results[i] = (func(c), None)
+                broken = False
+            except Exception as e:
+                log.error("Failed to run commands on %s: %s", host, e, exc_info=True)
+                results[i] = (None, e)
+            finally:
+                ssh_pool.release(c, broken=broken)
+
+    threads = []
+    for i in range(min(parallel, len(hosts))):
+        thread = CustomThread(target=_worker, name="{}-ssh-{}".format(threading.current_thread().name, i))
+        thread.daemon = True
+        try:
+            thread.start()
+        except RuntimeError:
+            log.warning("Failed to start a thread for SSH. Continue with %d threads.", len(threads), exc_info=True)
+            break
+        threads.append(thread)
+    if not threads:
+        _worker()
+    for thread in threads:
+        thread.join()
+    # Do not report the hosts interrupted by cancellation as errors of each host
+    check_cancelled()
+    return results
+
 
 class IPAddress:
     """Custom IP handling class since old APICs do not have `ipaddress` module.
@@ -476,16 +927,47 @@ class IPAddress:
         return ip_network == subnet_network
 
 
-class AciVersion():
+@functools.total_ordering
+class AciVersion(object):
     """
     ACI Version parser class. Parses the version string and provides methods to compare versions.
     Supported version formats:
     - APIC: `5.2(7f)`, `5.2.7f`, `5.2(7.123a)`, `5.2.7.123a`, `5.2(7.123)`, `5.2.7.123`, `aci-apic-dk9.5.2.7f.iso/bin`
     - Switch: `15.2(7f)`, `15.2.7f`, `15.2(7.123a)`, `15.2.7.123a`, `15.2(7.123)`, `15.2.7.123`, `aci-n9000-dk9.15.2.7f.bin`
+
+    Parsed versions are immutable and cached per version string, so that the same string
+    such as `cversion.older_than("5.2(6e)")` is parsed only once per script run.
+    Each version carries a sort key, which allows versions to be compared with
+    `<`, `==` etc., sorted, or used in sets and as dict keys.
     """
     v_regex = r'(?:dk9\.)?[1]?(?P<major1>\d)\.(?P<major2>\d)(?:\.|\()(?P<maint>\d+)(?P<QAdot>\.?)(?P<patch1>(?:[a-z]|\d+))(?P<patch2>[a-z]?)\)?'
 
+    _cache = {}
+    _cache_size = 1024
+    _cache_lock = threading.Lock()
+
+    def __new__(cls, version):
+        with cls._cache_lock:
+            cached = cls._cache.get(version)
+        if cached is not None:
+            return cached
+        self = super(AciVersion, cls).__new__(cls)
+        self._parse(version)
+        with cls._cache_lock:
+            if len(cls._cache) >= cls._cache_size:
+                cls._cache.clear()
+            cls._cache[version] = self
+        return self
+
     def __init__(self, version):
+        # All attributes are set only once in `__new__()` via `_parse()`.
+        pass
+
+    def __reduce__(self):
+        # Re-parse from the original string. The regex match object cannot be pickled.
+        return (AciVersion, (self.original,))
+
+    def _parse(self, version):
         self.original = version
         v = re.search(self.v_regex, version)
         if not v:
@@ -500,42 +982,64 @@ class AciVersion():
         self.patch1 = v.group("patch1")
         self.patch2 = v.group("patch2")
         self.regex = v
+        # Patch1 can be alphabet (CCO) or number (QA). Alphabet is always older than
+        # number. e.g., 5.2(7f) is older than 5.2(7.123)
+        # Patch2 (alphabet) is optional. One without Patch2 is older.
+        if self.patch1.isdigit():
+            patch1_key = (1, int(self.patch1), "")
+        else:
+            patch1_key = (0, 0, self.patch1)
+        self.key = (int(self.major1), int(self.major2), int(self.maint)) + patch1_key + (self.patch2,)
 
     def __str__(self):
         return self.version
 
+    def __repr__(self):
+        return "AciVersion('%s')" % self.version
+
+    @classmethod
+    def _to_version(cls, version):
+        return version if isinstance(version, AciVersion) else cls(version)
+
+    @classmethod
+    def _to_key(cls, other):
+        """Sort key of `other` for rich comparison. None when `other` is not a version."""
+        if isinstance(other, AciVersion):
+            return other.key
+        if isinstance(other, (str, text_type)):
+            try:
+                return cls(other).key
+            except ValueError:
+                return None
+        return None
+
+    def __eq__(self, other):
+        key = self._to_key(other)
+        if key is None:
+            return NotImplemented
+        return self.key == key
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __lt__(self, other):
+        key = self._to_key(other)
+        if key is None:
+            return NotImplemented
+        return self.key < key
+
+    def __hash__(self):
+        return hash(self.key)
+
     def older_than(self, version):
-        v2 = version if isinstance(version, AciVersion) else AciVersion(version)
-        for key in ["major1", "major2", "maint"]:
-            if int(self.regex.group(key)) > int(v2.regex.group(key)): return False
-            elif int(self.regex.group(key)) < int(v2.regex.group(key)): return True
-        # Patch1 can be alphabet or number
-        if self.patch1.isalpha() and v2.patch1.isdigit():
-            return True  # e.g., 5.2(7f) is older than 5.2(7.123)
-        elif self.patch1.isdigit() and v2.patch1.isalpha():
-            return False
-        elif self.patch1.isalpha() and v2.patch1.isalpha():
-            if self.patch1 > v2.patch1: return False
-            elif self.patch1 < v2.patch1: return True
-        elif self.patch1.isdigit() and v2.patch1.isdigit():
-            if int(self.patch1) > int(v2.patch1): return False
-            elif int(self.patch1) < int(v2.patch1): return True
-            # Patch2 (alphabet) is optional.
-            if not self.patch2 and v2.patch2:
-                return True  # one without Patch2 is older.
-            elif self.patch2 and not v2.patch2:
-                return False
-            elif self.patch2 and v2.patch2:
-                if self.patch2 > v2.patch2: return False
-                elif self.patch2 < v2.patch2: return True
-        return False
+        return self.key < self._to_version(version).key
 
     def newer_than(self, version):
-        return not self.older_than(version) and not self.same_as(version)
+        return self.key > self._to_version(version).key
 
     def same_as(self, version):
-        v2 = version if isinstance(version, AciVersion) else AciVersion(version)
-        return self.version == v2.version
+        return self.key == self._to_version(version).key
 
 
 class AciObjectCrawler(object):
@@ -548,6 +1052,9 @@ class AciObjectCrawler(object):
     def __init__(self, mos):
         self.mos = mos
         self.mos_per_class = defaultdict(list)
+        # Built per class at the first lookup by DN
+        self._sorted_dns = {}  # {classname: sorted [(dn, index in mos_per_class), ...]}
+        self._mo_per_dn = {}  # {classname: {dn: MO}}
 
         self.init_mos_per_class()
 
@@ -573,7 +1080,32 @@ class AciObjectCrawler(object):
             list of dict: The MOs of children_class under parent_dn.
         """
         mos = self.get_mos(children_class)
-        return [mo for mo in mos if mo["dn"].startswith(parent_dn + "/")]
+        if children_class not in self._sorted_dns:
+            self._sorted_dns[children_class] = sorted((mo["dn"], idx) for idx, mo in enumerate(mos))
+        sorted_dns = self._sorted_dns[children_class]
+        # DNs under parent_dn are contiguous in the sorted DNs
+        prefix = parent_dn + "/"
+        indexes = []
+        for i in range(bisect_left(sorted_dns, (prefix,)), len(sorted_dns)):
+            dn, idx = sorted_dns[i]
+            if not dn.startswith(prefix):
+                break
+            indexes.append(idx)
+        return [mos[idx] for idx in sorted(indexes)]
+
+    def get_mo(self, dn, classname):
+        """
+        Args:
+            dn (str): DN of the MO.
+            classname (str): Class name of the MO.
+        Returns:
+            dict: The MO, or None when it is not in `self.mos`.
+        """
+        if classname not in self._mo_per_dn:
+            mo_per_dn = self._mo_per_dn[classname] = {}
+            for mo in self.get_mos(classname):
+                mo_per_dn.setdefault(mo["dn"], mo)
+        return self._mo_per_dn[classname].get(dn)
 
     def get_parent(self, child_dn, parent_class):
         """
@@ -600,11 +1132,9 @@ class AciObjectCrawler(object):
         targets = []
         rel_mos = self.get_children(src_dn, rel_class)
         for rel_mo in rel_mos:
-            mos = self.get_mos(rel_mo["tCl"])
-            for mo in mos:
-                if mo["dn"] == rel_mo["tDn"]:
-                    targets.append(mo)
-                    break
+            mo = self.get_mo(rel_mo["tDn"], rel_mo["tCl"])
+            if mo is not None:
+                targets.append(mo)
             else:
                 # The target objects may not be in our self.mos_per_class.
                 # In that case, just return the DN and class.
@@ -696,6 +1226,12 @@ class AciAccessPolicyParser(AciObjectCrawler):
     SWP_to_IFP = "infraRsAccPortP"
     IFPol_L2_to_IFPG = "l2RtL2IfPol"
 
+    # Attributes used in this class. Not a class name for `get_classes()`.
+    attributes = (
+        "dn", "name", "tDn", "tCl", "fexId", "lagT", "vlanScope", "from_", "to_", "from", "to",
+        "fromCard", "toCard", "fromPort", "toPort", "fromSubPort", "toSubPort",
+    )
+
     def __init__(self, mos):
         super(AciAccessPolicyParser, self).__init__(mos)
         self.nodes_per_ifp = defaultdict(list)
@@ -943,6 +1479,187 @@ class AciAccessPolicyParser(AciObjectCrawler):
         return ifpol_l2s[0] if ifpol_l2s else {}
 
 
+def compact_access_policy_mos(mos):
+    """Returns MOs only with the attributes used by AciAccessPolicyParser"""
+    compact_mos = []
+    for mo in mos:
+        for classname, mo_body in iteritems(mo):
+            attrs = mo_body["attributes"]
+            compact_mos.append({classname: {"attributes": dict(
+                (key, attrs[key]) for key in AciAccessPolicyParser.attributes if key in attrs
+            )}})
+    return compact_mos
+
+
+def parse_access_policy(mos):
+    """Returns `port_data` and `vpool_per_dom` of AciAccessPolicyParser with `mos`.
+
+    Run in a worker process via `run_in_process()`. Only the results are sent
+    back instead of the parser holding all MOs.
+    """
+    parser = AciAccessPolicyParser(mos)
+    return dict(parser.port_data), dict(parser.vpool_per_dom)
+
+
+class AccessPolicy(object):
+    """Access policies shared by checks. See AciAccessPolicyParser for the format of each attribute."""
+    def __init__(self, port_data=None, vpool_per_dom=None):
+        self.port_data = port_data or {}
+        self.vpool_per_dom = vpool_per_dom or {}
+
+
+class VrfModel(object):
+    """
+    Tenant routing model (VRF, BD, EPG, L3Out and their subnets) shared by all
+    routing related checks in one script run.
+
+    Each index is built from flat class queries the first time any check asks
+    for it and then reused by all other checks. Checks run in their own threads,
+    so building an index is serialized per index. A class that no check needs is
+    never queried.
+
+    Indexes (all keyed by DN unless stated otherwise):
+        vnid_to_vrf     {VRF VNID (fvCtx.scope): VRF DN}
+        vrf_to_vnid     {VRF DN: VRF VNID}
+        bd_to_vrf       {BD DN: VRF DN}
+        vrf_to_bds      {VRF DN: [BD DN, ...]}
+        bd_to_subnets   {BD DN: [fvSubnet attributes, ...]}
+        epg_to_subnets  {EPG DN: [fvSubnet attributes, ...]}
+        epg_to_bd       {EPG DN: BD DN}
+        l3out_to_vrf    {L3Out DN: VRF DN}
+        l3out_subnets   {L3Out DN: [l3extSubnet attributes, ...]}
+        l3out_prefixes  {VRF DN: {prefix: [l3extSubnet attributes, ...]}}
+    """
+
+    def __init__(self):
+        self._indexes = {}
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def __getstate__(self):
+        # Only indexes are saved in a checkpoint. Locks are per process.
+        return {"_indexes": dict(self._indexes)}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self._indexes.update(state["_indexes"])
+
+    def _get(self, name, builder):
+        with self._locks_lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in self._indexes:
+                self._indexes[name] = builder()
+            return self._indexes[name]
+
+    def _get_attrs(self, classname):
+        def _query():
+            mos = icurl("class", classname + ".json")
+            return [mo[classname]["attributes"] for mo in mos]
+        return self._get(classname, _query)
+
+    @staticmethod
+    def _parent_dn(dn, rn_prefix):
+        """`uni/tn-a/BD-b/subnet-[1.1.1.1/24]` -> `uni/tn-a/BD-b` with rn_prefix `/subnet-[`"""
+        return dn.split(rn_prefix)[0]
+
+    @property
+    def vnid_to_vrf(self):
+        def _build():
+            return dict((vrf["scope"], vrf["dn"]) for vrf in self._get_attrs("fvCtx"))
+        return self._get("vnid_to_vrf", _build)
+
+    @property
+    def vrf_to_vnid(self):
+        def _build():
+            return dict((vrf["dn"], vrf["scope"]) for vrf in self._get_attrs("fvCtx"))
+        return self._get("vrf_to_vnid", _build)
+
+    @property
+    def bd_to_vrf(self):
+        def _build():
+            # fvRsCtx.dn is always BD DN + "/rsctx"
+            return dict(
+                (self._parent_dn(rs["dn"], "/rsctx"), rs["tDn"])
+                for rs in self._get_attrs("fvRsCtx")
+            )
+        return self._get("bd_to_vrf", _build)
+
+    @property
+    def vrf_to_bds(self):
+        def _build():
+            vrf_to_bds = defaultdict(list)
+            # Same order as fvRsCtx regardless of the python version
+            for rs in self._get_attrs("fvRsCtx"):
+                vrf_to_bds[rs["tDn"]].append(self._parent_dn(rs["dn"], "/rsctx"))
+            return dict(vrf_to_bds)
+        return self._get("vrf_to_bds", _build)
+
+    def _build_subnets_per_parent(self):
+        """fvSubnet is used under BDs, EPGs and others. Split them per parent type."""
+        # Same order as fvSubnet regardless of the python version
+        subnets = {"fvBD": OrderedDict(), "fvAEPg": OrderedDict()}
+        for subnet in self._get_attrs("fvSubnet"):
+            parent_dn = self._parent_dn(subnet["dn"], "/subnet-[")
+            parent_rn = parent_dn.split("/")[-1]
+            if parent_rn.startswith("BD-"):
+                subnets["fvBD"].setdefault(parent_dn, []).append(subnet)
+            elif parent_rn.startswith("epg-"):
+                subnets["fvAEPg"].setdefault(parent_dn, []).append(subnet)
+        return subnets
+
+    @property
+    def bd_to_subnets(self):
+        return self._get("subnets_per_parent", self._build_subnets_per_parent)["fvBD"]
+
+    @property
+    def epg_to_subnets(self):
+        return self._get("subnets_per_parent", self._build_subnets_per_parent)["fvAEPg"]
+
+    @property
+    def epg_to_bd(self):
+        def _build():
+            # fvRsBd.dn is always EPG DN + "/rsbd". Same order as fvRsBd.
+            return OrderedDict(
+                (self._parent_dn(rs["dn"], "/rsbd"), rs["tDn"])
+                for rs in self._get_attrs("fvRsBd")
+            )
+        return self._get("epg_to_bd", _build)
+
+    @property
+    def l3out_to_vrf(self):
+        def _build():
+            # l3extRsEctx.dn is always L3Out DN + "/rsectx"
+            return dict(
+                (self._parent_dn(rs["dn"], "/rsectx"), rs["tDn"])
+                for rs in self._get_attrs("l3extRsEctx")
+            )
+        return self._get("l3out_to_vrf", _build)
+
+    @property
+    def l3out_subnets(self):
+        def _build():
+            l3out_subnets = defaultdict(list)
+            for subnet in self._get_attrs("l3extSubnet"):
+                l3out_subnets[self._parent_dn(subnet["dn"], "/instP-")].append(subnet)
+            return dict(l3out_subnets)
+        return self._get("l3out_subnets", _build)
+
+    @property
+    def l3out_prefixes(self):
+        def _build():
+            prefixes = defaultdict(lambda: defaultdict(list))
+            l3out_to_vrf = self.l3out_to_vrf
+            for l3out_dn, subnets in iteritems(self.l3out_subnets):
+                vrf_dn = l3out_to_vrf.get(l3out_dn)
+                if not vrf_dn:
+                    continue
+                for subnet in subnets:
+                    prefixes[vrf_dn][subnet["ip"]].append(subnet)
+            return dict((vrf_dn, dict(pfxs)) for vrf_dn, pfxs in iteritems(prefixes))
+        return self._get("l3out_prefixes", _build)
+
+
 def is_firstver_gt_secondver(first_ver, second_ver):
     """ Used for CIMC version comparison """
     result = False
@@ -960,6 +1677,123 @@ def is_firstver_gt_secondver(first_ver, second_ver):
     return result
 
 
+class CancelToken(object):
+    """Cooperative cancellation of a check.
+
+    ThreadManager gives each check a token which is available through
+    `CancelToken.current()` in the thread running the check. `icurl()`,
+    `run_cmd()` and `Connection.cmd()` call `check_cancelled()` before any I/O
+    so that a check that exceeded its own time budget, or that was cancelled
+    due to the script timeout, stops sending requests to the APIC.
+    """
+    _local = threading.local()
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout  # sec
+        self.deadline = monotonic() + timeout if timeout else None
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def current(cls):
+        return getattr(cls._local, "token", None)
+
+    @classmethod
+    def set_current(cls, token):
+        cls._local.token = token
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set() or self.remaining() == 0
+
+    def remaining(self):
+        """Returns the remaining time (sec) of the budget, or None without budget."""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - monotonic(), 0)
+
+    def raise_if_cancelled(self):
+        if self._cancelled.is_set():
+            raise CheckCancelled("Cancelled due to the script timeout.")
+        if self.remaining() == 0:
+            raise CheckCancelled("Timeout. Unable to finish in time ({} sec).".format(self.timeout))
+
+
+def check_cancelled():
+    """Raise CheckCancelled when the check running in this thread is cancelled."""
+    token = CancelToken.current()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+class ProcessPool(object):
+    """Pool of worker processes for CPU heavy analysis in checks.
+
+    Pure python analysis holds the GIL and stalls all other check threads.
+    Functions that only take and return picklable data can be run in a worker
+    process with `run_in_process()` instead. The pool is started by
+    CheckManager before any check thread so that workers are forked from a
+    single threaded process. Without a pool, functions run in the caller's
+    thread as usual.
+    """
+    def __init__(self):
+        self._pool = None
+
+    @property
+    def processes(self):
+        return self._pool._processes if self._pool is not None else 0
+
+    def start(self, processes):
+        if self._pool is not None or not processes or processes <= 0:
+            return
+        try:
+            self._pool = multiprocessing.Pool(processes)
+            log.info("Started {} worker processes.".format(processes))
+        except (OSError, ImportError):
+            # i.e. no /dev/shm in some containers
+            log.warning("Failed to start worker processes. Analysis runs in threads.", exc_info=True)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+
+    def run(self, func, *args):
+        """Run `func(*args)` in a worker process and return the result.
+
+        Exceptions from `func` are raised as is. The check is cancelled while
+        waiting when its CancelToken is cancelled.
+        """
+        pool = self._pool
+        if pool is None:
+            return func(*args)
+        async_result = pool.apply_async(func, args)
+        while True:
+            try:
+                return async_result.get(1)
+            except multiprocessing.TimeoutError:
+                check_cancelled()
+
+
+# Shared by all checks in one script run
+process_pool = ProcessPool()
+
+
+def run_in_process(func, *args):
+    return process_pool.run(func, *args)
+
+
+def get_default_process_count(cpu_count=None):
+    """One process per CPU except one for the main process and check threads, up to 4"""
+    if cpu_count is None:
+        try:
+            cpu_count = multiprocessing.cpu_count()
+        except NotImplementedError:
+            cpu_count = 1
+    return max(0, min(cpu_count - 1, 4))
+
+
 class CustomThread(threading.Thread):
     def __init__(self, *args, **kwargs):
         super(CustomThread, self).__init__(*args, **kwargs)
@@ -1039,46 +1873,267 @@ class CustomThread(threading.Thread):
             del self._target, self._args, self._kwargs
 
 
+def _read_int_file(path):
+    """Returns the first token in `path` as int, or None when unreadable or not a number (i.e. `max`)"""
+    try:
+        with open(path, "r") as f:
+            return int(f.read().split()[0])
+    except (IOError, OSError, ValueError, IndexError):
+        return None
+
+
+def get_available_memory():
+    """Returns the memory available to this process in bytes, or None when unknown.
+
+    This is the smaller of MemAvailable in /proc/meminfo and the room left in
+    the memory limit of the cgroup (v2 or v1), because PUV may run in a
+    container that is capped well below the memory of the host.
+    """
+    available = None
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    available = int(line.split()[1]) * 1024
+                    break
+    except (IOError, OSError, ValueError, IndexError):
+        log.debug("Failed to read available memory from /proc/meminfo.", exc_info=True)
+    for limit_file, usage_file in (
+        ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),  # v2
+        ("/sys/fs/cgroup/memory/memory.limit_in_bytes", "/sys/fs/cgroup/memory/memory.usage_in_bytes"),  # v1
+    ):
+        limit = _read_int_file(limit_file)
+        usage = _read_int_file(usage_file)
+        if limit is None or usage is None:
+            continue
+        # v1 shows a huge number close to 2^63 when unlimited
+        if available is None or limit - usage < available:
+            available = max(0, limit - usage)
+        break
+    return available
+
+
+def get_default_worker_count(cpu_count=None, mem_available=None):
+    """Return the number of workers for the worker pool mode of ThreadManager.
+
+    Checks mostly wait for API or SSH responses. Hence, a few workers per CPU
+    are used, capped by the available memory so that each worker has
+    `WORKER_MEMORY_BUDGET` bytes to work with.
+
+    Args:
+        cpu_count (int): Number of CPUs. Detected when not provided.
+        mem_available (int): Available memory in bytes. Taken from
+                             `get_available_memory()` when not provided.
+    """
+    if cpu_count is None:
+        try:
+            cpu_count = multiprocessing.cpu_count()
+        except NotImplementedError:
+            cpu_count = 1
+    if mem_available is None:
+        mem_available = get_available_memory()
+    count = cpu_count * WORKERS_PER_CPU
+    if mem_available is not None:
+        count = min(count, mem_available // WORKER_MEMORY_BUDGET)
+    return int(max(1, min(count, MAX_DEFAULT_WORKERS)))
+
+
+def get_rss():
+    """Returns the current resident memory of this process in bytes, or None if unknown"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (IOError, OSError, ValueError, IndexError):
+        return None
+
+
+class CheckStats(object):
+    """Duration and peak memory of each check learned from previous runs.
+
+    Used by ThreadManager to start the checks expected to be the longest
+    first and to avoid running memory heavy checks at the same time.
+    The memory of a check is the growth of the resident memory of the process
+    from the start to the end of the check. It is recorded only from runs
+    where no other check or provider was running at the same time, since the
+    process memory cannot be attributed to one of concurrent checks.
+    `memory` is None until such a run.
+
+    File format (JSON):
+        {
+            "version": 2,
+            "checks": {
+                check_id: {"duration": sec, "memory": bytes or None, "runs": count},
+            }
+        }
+    """
+    version = 2
+    heavy_memory = 100 * 1024 * 1024  # bytes
+    weight = 0.5  # weight of the latest run in the moving average
+
+    def __init__(self, filepath=None):
+        self.filepath = filepath
+        self.checks = {}
+        self._lock = threading.Lock()
+        if filepath:
+            self.load()
+
+    def load(self):
+        try:
+            with open(self.filepath, "r") as f:
+                data = json.load(f)
+            if data.get("version") == self.version:
+                self.checks = data["checks"]
+        except (IOError, OSError, ValueError, KeyError, AttributeError):
+            log.info("No check stats loaded from {}".format(self.filepath))
+
+    def save(self):
+        with self._lock:
+            content = {"version": self.version, "checks": self.checks}
+        try:
+            write_jsonfile(self.filepath, content)
+        except (IOError, OSError):
+            log.warning("Failed to save check stats in {}".format(self.filepath), exc_info=True)
+
+    def record(self, check_id, duration, memory=None):
+        """`memory` of None when it was not measured in this run"""
+        with self._lock:
+            stats = self.checks.get(check_id)
+            if not stats:
+                self.checks[check_id] = {"duration": duration, "memory": memory, "runs": 1}
+                return
+            for key, value in (("duration", duration), ("memory", memory)):
+                if value is None:
+                    continue
+                if stats[key] is None:
+                    stats[key] = value
+                else:
+                    stats[key] = self.weight * value + (1 - self.weight) * stats[key]
+            stats["runs"] += 1
+
+    def expected_duration(self, check_id):
+        stats = self.checks.get(check_id)
+        return stats["duration"] if stats else None
+
+    def expected_memory(self, check_id):
+        stats = self.checks.get(check_id)
+        return stats["memory"] if stats else None
+
+    def is_memory_heavy(self, check_id):
+        memory = self.expected_memory(check_id)
+        return memory is not None and memory >= self.heavy_memory
+
+    def sort(self, funcs):
+        """Sort funcs in the order of longest expected duration first.
+
+        Checks without any stats come first in the original order since they
+        may be the longest.
+        """
+        def _key(func):
+            duration = self.expected_duration(func.__name__)
+            return (0, 0) if duration is None else (1, -duration)
+        return sorted(funcs, key=_key)
+
+
 class ThreadManager:
     """A class managing all threads to run individual checks.
 
     This class starts and monitors the status of all threads for check
     functions decorated with check_wrapper(). This stops monitoring when all
     threads completed or when timeout expired.
+    Each check signals its completion through a condition variable so that
+    the progress is reported as soon as it changes and the end of all checks
+    is detected immediately.
     On a memory constrained setup, it may take time to start each thread. Some
     thread/check may complete before other threads get started. To monitor the
     progress correctly from the beginning, the monitoring is also done in a
     thread while the main thread is starting all threads for each check.
+
+    When `workers` is given, a fixed pool of worker threads is used instead of
+    one thread per check. Each worker pulls checks from a queue and runs them
+    one by one. This keeps the number of threads, hence the memory usage,
+    flat regardless of the number of checks.
+
+    `providers` are functions preparing data shared by checks. They are all
+    started first in their own threads, outside of `max_threads`/`workers`.
+    A check with the attribute `providers` (list of provider names) becomes
+    runnable only after those providers completed, successfully or not,
+    while other checks run in the meantime.
+
+    With `stats` (CheckStats), checks start in the order of the longest
+    expected duration first, memory heavy checks wait for each other, and the
+    duration and memory of each check in this run are recorded.
+
+    A check with a memory estimate, from `memory_estimates` ({check name:
+    bytes}) or learned in `stats`, is admitted only when the available memory
+    (see `get_available_memory()`) covers it and the part of the estimates of
+    the other admitted checks that they have not used yet. What they used is
+    taken as the drop of the available memory since the first of them was
+    admitted, because it is already gone from the available memory.
+    Otherwise it waits until enough memory is freed instead of failing with
+    MemoryError. The first such check is always admitted so that the run
+    keeps moving.
+
+    Each check runs with a CancelToken with the time budget from
+    `check_timeouts` ({check name: sec}), if any. All tokens are cancelled at
+    timeout so that remaining checks stop at their next I/O.
     """
     def __init__(
         self,
         funcs,
         common_kwargs,
-        monitor_interval=0.5,  # sec
         monitor_timeout=600,  # sec
         max_threads=None,
+        workers=None,
+        providers=None,
+        stats=None,
+        check_timeouts=None,
+        memory_estimates=None,
         callback_on_monitoring=None,
         callback_on_start_failure=None,
         callback_on_timeout=None,
     ):
-        self.funcs = funcs
+        self.stats = stats
+        self.funcs = stats.sort(funcs) if stats is not None else funcs
+        self.check_timeouts = check_timeouts or {}
+        self._tokens = {}  # {check name: CancelToken}
         self.threads = None
         self.common_kwargs = common_kwargs
         # Semaphore to cap the number of concurrently running check threads.
-        # None means unlimited.
-        self.semaphore = threading.Semaphore(max_threads) if max_threads and max_threads > 0 else None
+        # None means unlimited. Not used in the worker pool mode where the
+        # number of workers is the cap.
+        self.workers = workers if workers and workers > 0 else None
+        self.semaphore = None
+        if not self.workers and max_threads and max_threads > 0:
+            self.semaphore = threading.Semaphore(max_threads)
+
+        self.providers = providers or []
+        self._provider_names = set(provider.__name__ for provider in self.providers)
+        self._provider_threads = []
+        self._ready_providers = set()
+        self._heavy_running = set()  # memory heavy checks being run
+        self.memory_estimates = memory_estimates or {}
+        self._admitted_memory = {}  # {check name: estimated bytes} for running checks
+        self._memory_baseline = None  # available bytes when the first of them was admitted
+        self._memory_waiting = set()  # checks waiting for memory
+
+        # Worker pool mode
+        self._queue = []  # (check func, check name, provider names) waiting for a worker
+        self._running = {}  # {worker name: check name}
+        self._check_exceptions = []
+
+        # Completion tracking. Notified each time a check completed or failed to start.
+        self._done_cond = threading.Condition()
+        self._done_count = 0
+        self._active_checks = 0  # checks being run by `_run_check()`
+        self._check_starts = 0  # checks started by `_run_check()` so far
+        self._finished = set()  # names of checks that completed
 
         # Not using `thread.join(timeout)` because it waits for each thread sequentially,
         # which means the program may wait for "timeout * num of threads" at worst case.
         self.timeout_event = threading.Event()
-        self.monitor_interval = monitor_interval
         self.monitor_timeout = monitor_timeout
         self._monitor = self._generate_thread(target=self._monitor_progress)
 
-        # Number of threads that were processed by `_start_thread()`, including
-        # both success and failure to start.
-        self._processed_threads_count = 0
-
         # Custom callbacks
         self._cb_on_monitoring = callback_on_monitoring
         self._cb_on_start_failure = callback_on_start_failure
@@ -1089,15 +2144,36 @@ class ThreadManager:
         if self._monitor.is_alive():
             raise RuntimeError("Threading on going. Cannot start again.")
 
+        self._start_providers()
+
+        if self.workers:
+            self._start_workers()
+            return
+
         self.threads = [
-            self._generate_thread(target=func, kwargs=self.common_kwargs, use_semaphore=True)
+            self._generate_thread(target=self._track_completion(func), kwargs=self.common_kwargs, use_semaphore=True)
             for func in self.funcs
         ]
 
         self._monitor.start()
 
-        for thread in self.threads:
-            self._start_thread(thread)
+        pending = [
+            (thread, thread.name, getattr(func, "providers", ()))
+            for thread, func in zip(self.threads, self.funcs)
+        ]
+        while pending:
+            thread = self._pop_runnable(pending)
+            if thread is None:
+                break
+            if not self._start_thread(thread):
+                self._handle_start_failure(thread.name)
+                self._notify_done(thread.name, finished=False)
+
+        # Checks still waiting for providers at timeout
+        for thread, name, _ in pending:
+            log.error("({}) Failed to start thread.".format(name))
+            self._handle_start_failure(name)
+            self._notify_done(name, finished=False)
 
     def join(self):
         self._monitor.join()
@@ -1108,6 +2184,8 @@ class ThreadManager:
         for thread in self.threads:
             if thread.exception:
                 raise thread.exception
+        if self._check_exceptions:
+            raise self._check_exceptions[0]
         # Exception in the callback means failure to update the result as error. Need to
         # re-raise it in the main thread to notify the script excutor about the risk of
         # some check results left with in-progress forever.
@@ -1136,35 +2214,243 @@ class ThreadManager:
         thread.daemon = True
         return thread
 
-    def _start_thread(self, thread):
+    def _generate_worker(self, index):
+        thread = CustomThread(target=self._run_worker, name="worker-{}".format(index))
+        thread.daemon = True
+        return thread
+
+    def _start_providers(self):
+        for provider in self.providers:
+            thread = self._generate_thread(target=self._track_provider(provider))
+            self._provider_threads.append(thread)
+            if not self._start_thread(thread, use_semaphore=False):
+                self._mark_provider_ready(provider.__name__)
+
+    def _track_provider(self, provider):
+        """Wrap a provider to make the checks depending on it runnable when it's done"""
+        def _wrapped_provider():
+            try:
+                provider()
+            finally:
+                self._mark_provider_ready(provider.__name__)
+        _wrapped_provider.__name__ = provider.__name__
+        return _wrapped_provider
+
+    def _mark_provider_ready(self, name):
+        with self._done_cond:
+            self._ready_providers.add(name)
+            self._done_cond.notify_all()
+
+    def _is_memory_heavy(self, check_name):
+        return self.stats is not None and self.stats.is_memory_heavy(check_name)
+
+    def _pop_runnable(self, pending):
+        """Pop the first item whose providers are ready. Wait when there is none.
+
+        A memory heavy check is not runnable while another one is running.
+
+        Args:
+            pending (list): List of (item, check name, provider names).
+        Returns:
+            The item, or None when `pending` is empty or timeout expired.
+        """
+        with self._done_cond:
+            while pending and not self.is_timeout():
+                item = self._pop_runnable_nowait(pending)
+                if item is not None:
+                    return item
+                # Memory can be freed without any check completing
+                self._done_cond.wait(MEMORY_POLL_INTERVAL if self._memory_waiting else None)
+        return None
+
+    def _pop_runnable_nowait(self, pending):
+        """Same as `_pop_runnable()` but returns None instead of waiting.
+        Must be called with `self._done_cond`.
+        """
+        for i, (item, check_name, provider_names) in enumerate(pending):
+            if not all(name in self._ready_providers or name not in self._provider_names
+                       for name in provider_names):
+                continue
+            if self._is_memory_heavy(check_name) and self._heavy_running:
+                continue
+            if not self._admit_memory(check_name):
+                continue
+            if self._is_memory_heavy(check_name):
+                self._heavy_running.add(check_name)
+            del pending[i]
+            return item
+        return None
+
+    def _get_memory_estimate(self, check_name):
+        """The larger of the declared and the learned memory. A learned 0 is not an estimate."""
+        estimates = [self.memory_estimates.get(check_name)]
+        if self.stats is not None:
+            estimates.append(self.stats.expected_memory(check_name))
+        estimates = [estimate for estimate in estimates if estimate]
+        return max(estimates) if estimates else None
+
+    def _admit_memory(self, check_name):
+        """Reserve the estimated memory of a check if available.
+        Must be called with `self._done_cond`.
+
+        Returns:
+            bool: False when the check needs to wait for memory.
+        """
+        estimate = self._get_memory_estimate(check_name)
+        if not estimate:
+            return True
+        available = get_available_memory()
+        if self._admitted_memory and available is not None and self._memory_baseline is not None:
+            # Running checks may not have used all of their estimates yet
+            used = max(0, self._memory_baseline - available)
+            reserved = max(0, sum(self._admitted_memory.values()) - used)
+            if estimate + reserved > available:
+                if check_name not in self._memory_waiting:
+                    log.info("({}) Waiting for memory. Estimated {} MB, available {} MB, reserved {} MB.".format(
+                        check_name, estimate // 1024 ** 2, available // 1024 ** 2, reserved // 1024 ** 2))
+                    self._memory_waiting.add(check_name)
+                return False
+        if not self._admitted_memory:
+            self._memory_baseline = available
+        self._memory_waiting.discard(check_name)
+        self._admitted_memory[check_name] = estimate
+        return True
+
+    def _start_workers(self):
+        self._queue.extend((func, func.__name__, getattr(func, "providers", ())) for func in self.funcs)
+        self.threads = [self._generate_worker(i) for i in range(min(self.workers, len(self.funcs)))]
+        log.info("Running {} checks with {} workers.".format(len(self.funcs), len(self.threads)))
+
+        self._monitor.start()
+
+        started_count = 0
+        for thread in self.threads:
+            if self._start_thread(thread):
+                started_count += 1
+
+        # When no worker is running, nobody is going to pick up the queued checks.
+        if not started_count:
+            while self._queue:
+                func, check_name, _ = self._queue.pop(0)
+                self._handle_start_failure(check_name)
+                self._notify_done(check_name, finished=False)
+
+    def _run_worker(self):
+        """Executed in each worker thread in the worker pool mode"""
+        name = threading.current_thread().name
+        while not self.is_timeout():
+            func = self._pop_runnable(self._queue)
+            if func is None:
+                break
+            with self._done_cond:
+                self._running[name] = func.__name__
+            log.info("({}) Running in {}.".format(func.__name__, name))
+            try:
+                self._run_check(func, **self.common_kwargs)
+            except Exception as e:
+                # Same as `CustomThread.run()`, exceptions should be captured in
+                # `check_wrapper`. Keep it to notify the main thread and move on
+                # to the next check.
+                log.error("({}) Unexpected error in {}.".format(func.__name__, name), exc_info=True)
+                self._check_exceptions.append(e)
+            finally:
+                with self._done_cond:
+                    del self._running[name]
+                self._notify_done(func.__name__)
+
+    def _run_check(self, func, *args, **kwargs):
+        """Run a check with its CancelToken and record its duration and memory in `self.stats`"""
+        token = CancelToken(self.check_timeouts.get(func.__name__))
+        with self._done_cond:
+            self._tokens[func.__name__] = token
+            # Timeout may have expired while the check was being started
+            if self.is_timeout():
+                token.cancel()
+        CancelToken.set_current(token)
+        with self._done_cond:
+            self._active_checks += 1
+            self._check_starts += 1
+            start_count = self._check_starts
+            alone = self._active_checks == 1 and self._ready_providers >= self._provider_names
+        start_time = monotonic()
+        start_rss = get_rss() if self.stats is not None and alone else None
+        try:
+            return func(*args, **kwargs)
+        finally:
+            CancelToken.set_current(None)
+            with self._done_cond:
+                self._active_checks -= 1
+                # No other check started while this one was running
+                alone = alone and self._check_starts == start_count
+            if self.stats is not None:
+                memory = None
+                end_rss = get_rss() if alone and start_rss is not None else None
+                if end_rss is not None:
+                    memory = max(0, end_rss - start_rss)
+                self.stats.record(func.__name__, monotonic() - start_time, memory)
+
+    def _track_completion(self, func):
+        """Wrap a check to signal its completion to the monitor thread"""
+        def _wrapped_func(*args, **kwargs):
+            try:
+                self._run_check(func, *args, **kwargs)
+            finally:
+                self._notify_done(func.__name__)
+        _wrapped_func.__name__ = func.__name__
+        return _wrapped_func
+
+    def _notify_done(self, check_name, finished=True):
+        """Count a check that completed or failed to start, and wake up the monitor
+        and those waiting for a runnable check.
+
+        Args:
+            check_name (str): Name of the check.
+            finished (bool): False when the check failed to start.
+        """
+        with self._done_cond:
+            self._done_count += 1
+            if finished:
+                self._finished.add(check_name)
+            self._heavy_running.discard(check_name)
+            self._admitted_memory.pop(check_name, None)
+            self._done_cond.notify_all()
+
+    def _start_thread(self, thread, use_semaphore=True):
         """ Start a thread. When failed due to OOM, retry again after an interval.
         Until one of the following conditions are met, we don't move on.
           - successfuly started the thread
-          - exceeded the queue timeout and gave up on this thread
+          - exceeded the queue timeout and gave up on this thread. While other
+            check threads are running, the queue timeout is extended up to the
+            overall timeout because they free their memory when they complete.
           - failed to start the thread for an unknown reason
+
+        Returns:
+            bool: True when the thread was started.
         """
         queue_timeout = 10  # sec
         queue_interval = 1  # sec
         time_elapsed = 0  # sec
         thread_started = False
+        semaphore = self.semaphore if use_semaphore else None
         while not self.is_timeout():
             try:
-                if self.semaphore is not None:
+                if semaphore is not None:
                     log.info("({}) Waiting for an available thread slot.".format(thread.name))
-                    self.semaphore.acquire()
+                    semaphore.acquire()
                 log.info("({}) Starting thread.".format(thread.name))
                 thread.start()
                 thread_started = True
                 break
             except RuntimeError as e:
-                if self.semaphore is not None:
-                    self.semaphore.release()
+                if semaphore is not None:
+                    semaphore.release()
                 if str(e) != "can't start new thread":
                     log.error("({}) Unexpected error to start a thread.".format(thread.name), exc_info=True)
                     break
 
                 log_msg = "({}) Not enough memory to start a new thread. ".format(thread.name)
-                if time_elapsed >= queue_timeout:
+                max_queue_time = self.monitor_timeout if self._has_running_check_threads() else queue_timeout
+                if time_elapsed >= max_queue_time:
                     log.error(log_msg + "No queue time left. Give up.")
                     break
                 else:
@@ -1173,63 +2459,200 @@ class ThreadManager:
                     time_elapsed += queue_interval
                     continue
             except Exception:
-                if self.semaphore is not None:
-                    self.semaphore.release()
+                if semaphore is not None:
+                    semaphore.release()
                 log.error("({}) Unexpected error to start a thread.".format(thread.name), exc_info=True)
                 break
 
-        # Custom cleanup callback for a thread that couldn't start.
         if not thread_started and not thread.is_alive():
             log.error("({}) Failed to start thread.".format(thread.name))
-            if self._cb_on_start_failure is not None:
-                try:
-                    self._cb_on_start_failure(thread.name)
-                except Exception as e:
-                    log.error("({}) Failed to update the result as error.".format(thread.name), exc_info=True)
-                    self._cb_on_start_failure_exception = e
+            return False
+        return True
 
-        self._processed_threads_count += 1
+    def _has_running_check_threads(self):
+        # Not for workers. Other workers keep processing the queue anyway.
+        if self.workers or not self.threads:
+            return False
+        return any(thread.is_alive() for thread in self.threads)
+
+    def _handle_start_failure(self, name):
+        """Custom cleanup callback for a check that couldn't start."""
+        if self._cb_on_start_failure is not None:
+            try:
+                self._cb_on_start_failure(name)
+            except Exception as e:
+                log.error("({}) Failed to update the result as error.".format(name), exc_info=True)
+                self._cb_on_start_failure_exception = e
+
+    def _get_unfinished_checks(self):
+        with self._done_cond:
+            if self.workers:
+                return list(self._running.values()) + [check_name for _, check_name, _ in self._queue]
+            return [
+                thread.name for thread in self.threads
+                if thread.is_alive() and thread.name not in self._finished
+            ]
 
     def _monitor_progress(self):
         """Executed in a separate monitor thread"""
-        total = len(self.threads)
-        time_elapsed = 0  # sec
+        total = len(self.funcs)
+        deadline = monotonic() + self.monitor_timeout
+        reported = None
         while True:
-            alive_count = sum(thread.is_alive() for thread in self.threads)
-            done = self._processed_threads_count - alive_count
+            with self._done_cond:
+                while self._done_count == reported and monotonic() < deadline:
+                    self._done_cond.wait(max(deadline - monotonic(), 0))
+                done = self._done_count
 
             # Custom monitor callback
-            if self._cb_on_monitoring is not None:
-                self._cb_on_monitoring(done, total)
+            if done != reported:
+                reported = done
+                if self._cb_on_monitoring is not None:
+                    self._cb_on_monitoring(done, total)
 
             if done == total:
                 break
 
-            time.sleep(self.monitor_interval)
-            time_elapsed += self.monitor_interval
-            if time_elapsed > self.monitor_timeout:
+            if monotonic() >= deadline:
                 log.error("Timeout. Stop monitoring threads.")
-                self.timeout_event.set()
+                with self._done_cond:
+                    self.timeout_event.set()
+                    # Wake up those waiting for providers
+                    self._done_cond.notify_all()
+                    # Stop the checks still running at their next I/O
+                    for token in self._tokens.values():
+                        token.cancel()
                 break
 
-        # Custom timeout callback per thread
+        # Custom timeout callback per check
         if self.is_timeout() and self._cb_on_timeout is not None:
-            for thread in self.threads:
-                if thread.is_alive():
-                    self._cb_on_timeout(thread.name)
+            for name in self._get_unfinished_checks():
+                self._cb_on_timeout(name)
+
+
+class ResultJournal(object):
+    """Append-only journal of check results with one JSON line per state change.
+
+    Each line is an `AciResult` dict, from in-progress to the final result.
+    Lines are flushed as they are appended, but fsynced only every
+    `fsync_lines` lines or `fsync_interval` seconds and at `close()` so that
+    results of many checks completing at once do not cost a sync each.
+    The file is opened at the first line since `DIR` may not exist yet when
+    this is created.
+    """
+    def __init__(self, filepath, fsync_lines=50, fsync_interval=1.0):
+        self.filepath = filepath
+        self.fsync_lines = fsync_lines
+        self.fsync_interval = fsync_interval  # sec
+        self._f = None
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = monotonic()
+
+    def append(self, aci_result):
+        line = json.dumps(aci_result, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._f is None:
+                self._f = open(self.filepath, "a")
+            self._f.write(line)
+            self._f.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_lines or monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def _sync(self):
+        os.fsync(self._f.fileno())
+        self._unsynced = 0
+        self._last_sync = monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._f is not None:
+                self._sync()
+                self._f.close()
+                self._f = None
+
+    @staticmethod
+    def replay(filepath):
+        """Returns the latest `AciResult` dict of each check in the journal.
+
+        A broken last line from a crash in the middle of a write is ignored.
+        """
+        states = OrderedDict()
+        with open(filepath, "r") as f:
+            for line in f:
+                try:
+                    aci_result = json.loads(line)
+                except ValueError:
+                    log.warning("Ignoring a broken line in {}".format(filepath))
+                    continue
+                states[aci_result["ruleId"]] = aci_result
+        return states
 
 
 class ResultManager:
-    def __init__(self):
+    """Keeps the result of each check and writes it in a JSON file per check.
+
+    With `journal_file`, every state change is appended to a `ResultJournal`.
+    `json_files` controls when the JSON file per check is written:
+        sync: at each state change. (default)
+        deferred: only at `flush_json_files()` with the latest state of the
+                  checks changed since the last flush. The caller flushes
+                  periodically to serve in-progress states live, or only once
+                  at the end.
+    With `columnar_rows`, results with more rows than that are written in
+    the compact `AciResult.DETAILS_V2` format without indentation.
+    """
+    def __init__(self, json_files="sync", journal_file=None, columnar_rows=None, bundle=None):
         self.titles = {}  # {check_id: check_title}
         self.results = {}  # {check_id: Result}
+        self.json_files = json_files
+        self.columnar_rows = columnar_rows
+        # `ResultBundle` to add final results to as they come
+        self.bundle = bundle
+        self.journal = ResultJournal(journal_file) if journal_file else None
+        self._unflushed = {}  # {check_id: AciResult dict} not written in JSON files yet
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
 
     def _update_aci_result(self, check_id, check_title, result_obj=None):
-        aci_result = AciResult(check_id, check_title, result_obj)
+        aci_result = AciResult(check_id, check_title, result_obj, self.columnar_rows).as_dict()
+        if self.journal is not None:
+            self.journal.append(aci_result)
         filepath = self.get_result_filepath(check_id)
-        write_jsonfile(filepath, aci_result.as_dict())
+        if self.json_files == "sync":
+            self._write_aci_result(filepath, aci_result)
+        else:
+            with self._lock:
+                self._unflushed[check_id] = aci_result
+        if result_obj is not None and self.bundle is not None:
+            self.bundle.add_json(filepath, aci_result, indent=self._get_indent(aci_result))
         return filepath
 
+    def flush_json_files(self):
+        """Write JSON files of the checks changed since the last flush"""
+        # Serialized to never overwrite a file with an older state
+        with self._flush_lock:
+            with self._lock:
+                unflushed, self._unflushed = self._unflushed, {}
+            for check_id, aci_result in unflushed.items():
+                self._write_aci_result(self.get_result_filepath(check_id), aci_result)
+
+    @staticmethod
+    def _get_indent(aci_result):
+        if aci_result["failureDetails"].get("version") == AciResult.DETAILS_V2:
+            return None
+        return 2
+
+    @staticmethod
+    def _write_aci_result(filepath, aci_result):
+        write_jsonfile(filepath, aci_result, indent=ResultManager._get_indent(aci_result))
+
+    def close(self):
+        self.flush_json_files()
+        if self.journal is not None:
+            self.journal.close()
+
     def init_result(self, check_id, check_title):
         self.titles[check_id] = check_title
         filepath = self._update_aci_result(check_id, check_title)
@@ -1280,7 +2703,14 @@ class AciResult:
     PASS = "passed"
     FAIL = "failed"
 
-    def __init__(self, func_name, name, result_obj=None):
+    # failureDetails format versions
+    # 1: "data" is a list of {header: value}. No "version" key for compatibility.
+    # 2: "data" is a list of row arrays in the order of "header". Only for
+    #    consumers that opt in with `columnar_rows`.
+    DETAILS_V1 = 1
+    DETAILS_V2 = 2
+
+    def __init__(self, func_name, name, result_obj=None, columnar_rows=None):
         self.ruleId = func_name
         self.name = name
         self.description = ""
@@ -1299,7 +2729,20 @@ class AciResult:
             "unformatted_data": [],
         }
         if result_obj:
-            self.update_with_results(result_obj)
+            self.update_with_results(result_obj, columnar_rows)
+
+    @staticmethod
+    def convert_data_columnar(column, rows):
+        """Same as `convert_data()` but keeps each row as an array for DETAILS_V2.
+            AciResult - [[d11, d21,,,], [d21, d22,,,],,,]
+        """
+        if not (isinstance(rows, list) and isinstance(column, list)):
+            raise TypeError("Rows and column must be lists.")
+        c_len = len(column)
+        for row in rows:
+            if len(row) != c_len:
+                raise ValueError("Row length ({}), data: {} does not match column length ({}).".format(len(row), row, c_len))
+        return [[str(value) for value in row] for row in rows]
 
     @staticmethod
     def convert_data(column, rows):
@@ -1321,7 +2764,8 @@ class AciResult:
             data.append(entry)
         return data
 
-    def update_with_results(self, result_obj):
+    def update_with_results(self, result_obj, columnar_rows=None):
+        """`columnar_rows`: Use DETAILS_V2 for more rows than this. None to always use DETAILS_V1."""
         self.recommended_action = result_obj.recommended_action
         self.docUrl = result_obj.doc_url
 
@@ -1344,12 +2788,17 @@ class AciResult:
 
         # failureDetails
         if self.ruleStatus == AciResult.FAIL:
+            convert_data = self.convert_data
+            total_rows = len(result_obj.data) + len(result_obj.unformatted_data)
+            if columnar_rows is not None and total_rows > columnar_rows:
+                convert_data = self.convert_data_columnar
+                self.failureDetails["version"] = AciResult.DETAILS_V2
             self.failureDetails["failType"] = result
             self.failureDetails["header"] = result_obj.headers
-            self.failureDetails["data"] = self.convert_data(result_obj.headers, result_obj.data)
+            self.failureDetails["data"] = convert_data(result_obj.headers, result_obj.data)
             if result_obj.unformatted_headers and result_obj.unformatted_data:
                 self.failureDetails["unformatted_header"] = result_obj.unformatted_headers
-                self.failureDetails["unformatted_data"] = self.convert_data(
+                self.failureDetails["unformatted_data"] = convert_data(
                     result_obj.unformatted_headers, result_obj.unformatted_data
                 )
                 self.recommended_action += (
@@ -1393,13 +2842,97 @@ class Result:
         return {slot: getattr(self, slot) for slot in self.__slots__}
 
 
-def check_wrapper(check_title):
+class AffectedVersions(object):
+    """Declarative version gate of a check given via `check_wrapper(affected_versions=...)`.
+
+    A spec is defined per version in the common data (`cversion`, `tversion` or `sw_cversion`).
+    Each spec is a string of comma separated conditions that all must match, or a list of
+    such strings where any of them must match. A condition is an operator (`<`, `<=`, `>`,
+    `>=`, `==`) followed by a version.
+
+    Examples:
+        {"cversion": "<6.0(2a)", "tversion": ">6.0(2a)"}
+            -> cversion older than 6.0(2a) AND tversion newer than 6.0(2a)
+        {"tversion": [">=6.1(2f), <=6.1(5e)", "==6.2(1g)"]}
+            -> 6.1(2f) <= tversion <= 6.1(5e) OR tversion is 6.2(1g)
+
+    A check is affected only when the specs of all versions match.
+    """
+    VERSION_KEYS = ("cversion", "tversion", "sw_cversion")
+    condition_regex = r'^\s*(?P<op><=|>=|==|<|>)\s*(?P<version>\S+)\s*$'
+    operators = {
+        "<": lambda v1, v2: v1 < v2,
+        "<=": lambda v1, v2: v1 <= v2,
+        ">": lambda v1, v2: v1 > v2,
+        ">=": lambda v1, v2: v1 >= v2,
+        "==": lambda v1, v2: v1 == v2,
+    }
+
+    def __init__(self, specs):
+        self.specs = {}  # {version_key: [[(op, AciVersion), ...], ...]}
+        for key, spec in iteritems(specs):
+            if key not in self.VERSION_KEYS:
+                raise ValueError("Unknown version `%s` in affected_versions" % key)
+            ranges = [spec] if isinstance(spec, str) else spec
+            self.specs[key] = [self.parse_range(r) for r in ranges]
+
+    @classmethod
+    def parse_range(cls, range_str):
+        conditions = []
+        for condition in range_str.split(","):
+            m = re.search(cls.condition_regex, condition)
+            if not m:
+                raise ValueError("Invalid version condition `%s` in affected_versions" % condition)
+            conditions.append((m.group("op"), AciVersion(m.group("version"))))
+        return conditions
+
+    def is_affected(self, versions):
+        """
+        Args:
+            versions (dict): Common data with `AciVersion` for each version key.
+        Returns:
+            bool or None: None when any of the versions in the specs is unknown (None).
+                          Such a check should run and handle the missing version by itself.
+        """
+        if any(not versions.get(key) for key in self.specs):
+            return None
+        for key, ranges in iteritems(self.specs):
+            version = versions[key]
+            if not any(
+                all(self.operators[op](version, boundary) for op, boundary in conditions)
+                for conditions in ranges
+            ):
+                return False
+        return True
+
+
+def check_wrapper(check_title, affected_versions=None, providers=None, timeout=None, memory=None, classes=None):
     """Decorator to wrap a check function with initializer and finalizer from `CheckManager`.
 
     The goal is for each check function to focus only on the check logic itself and return
     `Result` object. The rest such as initializing the result, printing the result to stdout,
     writing the result in a file in JSON etc. are handled through this wrapper and CheckManager.
+
+    When `affected_versions` is provided (see `AffectedVersions`), the check is finalized as
+    N/A without being executed if the current/target versions are not affected.
+    `CheckManager` evaluates it before starting any thread.
+
+    `providers` is a list of names of shared data (see `CheckManager.shared_data_builders`)
+    that the check needs. Each is passed to the check as a keyword argument of the same name.
+    The check starts only after they are ready and is finalized as ERROR when any failed.
+
+    `timeout` is the time budget (sec) of the check. When it expires, the check stops
+    at its next I/O (`icurl()`, `run_cmd()`, `Connection.cmd()`) and becomes ERROR.
+    It can be overridden with the CLI option `--check-timeout`.
+
+    `memory` is the estimated memory (bytes) the check needs. The check waits to start until
+    that much memory is available. Without it, the memory learned from previous runs is used.
+
+    `classes` is a list of the classes the check reads. With `--rerun-from`, a check that
+    passed in the previous run is re-run only when any of them changed.
     """
+    version_gate = AffectedVersions(affected_versions) if affected_versions else None
+
     def decorator(check_func):
         @functools.wraps(check_func)
         def wrapper(*args, **kwargs):
@@ -1423,7 +2956,14 @@ def check_wrapper(check_title):
             # and abort the script immediately.
             finalize_check = kwargs.pop("finalize_check")
             try:
-                r = check_func(*args, **kwargs)
+                if version_gate and version_gate.is_affected(kwargs) is False:
+                    r = Result(result=NA, msg=VER_NOT_AFFECTED)
+                else:
+                    r = check_func(*args, **kwargs)
+                finalize_check(wrapper.__name__, r)
+            except CheckCancelled as e:
+                r = Result(result=ERROR, msg=str(e))
+                log.error("Cancelled: {}".format(e))
                 finalize_check(wrapper.__name__, r)
             except MemoryError:
                 msg = "Not enough memory to complete this check."
@@ -1436,6 +2976,11 @@ def check_wrapper(check_title):
                 log.error(msg, exc_info=True)
                 finalize_check(wrapper.__name__, r)
             return r
+        wrapper.affected_versions = version_gate
+        wrapper.providers = tuple(providers or ())
+        wrapper.timeout = timeout
+        wrapper.memory = memory
+        wrapper.classes = tuple(classes or ())
         return wrapper
     return decorator
 
@@ -1443,6 +2988,16 @@ def check_wrapper(check_title):
 def format_table(headers, data,
                  min_width=5, left_padding=2, hdr_sp='-', col_sp='  '):
     """ get string results in table format
+    See `iter_table()` for args.
+    Returns:
+        str: table with columns aligned with spacing
+    """
+    return '\n'.join(iter_table(headers, data, min_width, left_padding, hdr_sp, col_sp))
+
+
+def iter_table(headers, data,
+               min_width=5, left_padding=2, hdr_sp='-', col_sp='  '):
+    """ get string results in table format one row at a time
     Args:
         header (list): list of column headers (optional)
                 each header can either be a string representing the name or a
@@ -1460,14 +3015,14 @@ def format_table(headers, data,
         left_padding (int, optional): number of spaces to 'pad' left most column. Defaults to 2.
         hdr_sp (str, optional): print a separator string between hdr and data row. Defaults to '-'.
         col_sp (str, optional): print a separator string between data columns. Defaults to '  '.
-    Returns:
-        str: table with columns aligned with spacing
+    Yields:
+        str: each row of the table with columns aligned with spacing.
+             A row may span multiple lines when its values are wrapped.
     """
     if type(data) is not list or len(data) == 0:
-        return ""
+        return
     cl = 800
     col_widths = []
-    rows = []
 
     def update_col_widths(idx, new_width):
         if len(col_widths) < idx + 1:
@@ -1477,10 +3032,9 @@ def format_table(headers, data,
 
     for row in data:
         if type(row) is not list:
-            return ""
+            return
         for idx, col in enumerate(row):
-            update_col_widths(idx, len(str(col)))
-        rows.append([str(col) for col in row])
+            update_col_widths(idx, len(col if isinstance(col, str) else str(col)))
     h_cols = []
     for idx, col in enumerate(headers):
         if isinstance(col, str):
@@ -1514,32 +3068,40 @@ def format_table(headers, data,
             col_widths[idx] = recovery_width
 
     pad = ' ' * left_padding
-    output = []
+    wrappers = {}  # {width: TextWrapper} shared by all rows
     if headers:
-        output.append(
-            get_row(col_widths, [c['name'] for c in h_cols], col_sp, pad)
-        )
+        yield get_row(col_widths, [c['name'] for c in h_cols], col_sp, pad, wrappers)
         if isinstance(hdr_sp, str):
             if len(hdr_sp) > 0:
                 hsp_sp = hdr_sp[0]  # only single char for hdr_sp
             values = [hsp_sp * len(c['name']) for c in h_cols]
-            output.append(
-                get_row(col_widths, values, col_sp, pad)
-            )
-    for row in rows:
-        output.append(get_row(col_widths, row, col_sp, pad))
-    return '\n'.join(output)
+            yield get_row(col_widths, values, col_sp, pad, wrappers)
+    for row in data:
+        yield get_row(col_widths, [col if isinstance(col, str) else str(col) for col in row], col_sp, pad, wrappers)
+
+
+# Chars that `TextWrapper` converts or wraps at even in a value shorter than its column
+_wrap_sensitive_regex = re.compile(r'[\t\n\x0b\x0c\r]')
 
 
-def get_row(widths, values, spad="  ", lpad=""):
+def get_row(widths, values, spad="  ", lpad="", wrappers=None):
+    if wrappers is None:
+        wrappers = {}
     cols = []
     row_maxnum = 0
     for i, value in enumerate(values):
         w = widths[i] if widths[i] > 0 else 1
-        tw = TextWrapper(width=w)
-        lines = []
-        for v in value.split('\n'):
-            lines += tw.wrap(v)
+        if len(value) <= w and not _wrap_sensitive_regex.search(value):
+            # Nothing to wrap. `TextWrapper` would only drop trailing spaces.
+            value = value.rstrip()
+            lines = [value] if value else []
+        else:
+            tw = wrappers.get(w)
+            if tw is None:
+                tw = wrappers[w] = TextWrapper(width=w)
+            lines = []
+            for v in value.split('\n'):
+                lines += tw.wrap(v)
         cols.append({'width': w, 'lines': lines})
         if row_maxnum < len(lines): row_maxnum = len(lines)
     spad2 = ' ' * len(spad)  # space separators except for the 1st line
@@ -1558,17 +3120,97 @@ def get_row(widths, values, spad="  ", lpad=""):
     return ('\n'.join(output).rstrip())
 
 
-def prints(objects, sep=' ', end='\n'):
-    with open(RESULT_FILE, 'a') as f:
+class OutputSink(object):
+    """Output to the terminal and to a file with one buffered file handle.
+
+    Output is printed to stdout right away. For the file, it is buffered and
+    written when the buffer reaches `flush_size` chars, `flush_interval` sec
+    after the first buffered output, or at `flush()`/`close()`.
+    Progress updates are only for the terminal. The last one is written to
+    the file once the next regular output comes or at `close()`.
+    """
+    def __init__(self, filepath, flush_size=8192, flush_interval=1.0):
+        self.filepath = filepath
+        self.flush_size = flush_size  # chars
+        self.flush_interval = flush_interval  # sec
+        self._f = None
+        self._buffer = []
+        self._size = 0
+        self._progress = None
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def write(self, objects, end='\n', progress=False):
+        with self._lock:
+            try:
+                print(objects, end=end, file=sys.stdout)
+                sys.stdout.flush()
+            except OSError:
+                pass
+            if progress:
+                self._progress = objects
+                return
+            if self._progress is not None:
+                self._append(self._progress, "\n")
+                self._progress = None
+            if end == "\r":
+                end = "\n"  # easier to read with \n in a log file
+            self._append(objects, end)
+
+    def _append(self, objects, end):
+        text = (objects if isinstance(objects, (str, text_type)) else str(objects)) + end
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= self.flush_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_on_timer(self):
         try:
-            print(objects, sep=sep, end=end, file=sys.stdout)
-            sys.stdout.flush()
-        except OSError:
-            pass
-        if end == "\r":
-            end = "\n"  # easier to read with \n in a log file
-        print(objects, sep=sep, end=end, file=f)
-        f.flush()
+            self.flush()
+        except Exception as e:
+            log.error("Failed to write output to %s - %s", self.filepath, e)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        buffer, self._buffer, self._size = self._buffer, [], 0
+        if self._f is None:
+            self._f = open(self.filepath, 'a')
+        self._f.write("".join(buffer))
+        self._f.flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """Write everything including the last progress and close the file.
+        A new output after this opens the file again.
+        """
+        with self._lock:
+            if self._progress is not None:
+                self._append(self._progress, "\n")
+                self._progress = None
+            self._flush()
+            if self._f is not None:
+                self._f.close()
+                self._f = None
+
+
+output_sink = OutputSink(RESULT_FILE)
+# Not to lose buffered output on a crash
+atexit.register(output_sink.close)
+
+
+def prints(objects, sep=' ', end='\n'):
+    output_sink.write(objects, end=end)
 
 
 def print_progress(done, total, bar_length=100):
@@ -1578,7 +3220,7 @@ def print_progress(done, total, bar_length=100):
         progress = done / float(total)
     filled = int(bar_length * progress)
     bar = "█" * filled + "-" * (bar_length - filled)
-    prints("Progress: |{}| {}/{} checks completed".format(bar, done, total), end="\r")
+    output_sink.write("Progress: |{}| {}/{} checks completed".format(bar, done, total), end="\r", progress=True)
 
 
 def print_result(index, total, title,
@@ -1586,8 +3228,14 @@ def print_result(index, total, title,
                  headers=None, data=None,
                  unformatted_headers=None, unformatted_data=None,
                  recommended_action='',
-                 doc_url=''):
-    """Print `[Check XX/YY] <title>... <msg> --padding-- <result>` + some data"""
+                 doc_url='',
+                 table_file=None, max_rows=MAX_TABLE_ROWS):
+    """Print `[Check XX/YY] <title>... <msg> --padding-- <result>` + some data
+
+    When `table_file` is given and a table has more than `max_rows` rows,
+    only the first `max_rows` rows are printed and all rows are written
+    in `table_file` instead.
+    """
     idx_len = len(str(total)) + 1
     output = "[Check{:{}}/{}] {}... {}".format(index, idx_len, total, title, msg)
     FULL_LEN = 138  # length of `[Check XX/YY] <title>... <msg> --padding-- <result>`
@@ -1598,28 +3246,456 @@ def print_result(index, total, title,
         # In such a case, keep one whitespace padding even if the full length gets longer.
         padding = len(result) + 1
     output += "{:>{}}".format(result, padding)
+    tables = []
     if data:
         data.sort()
-        output += '\n' + format_table(headers, data)
+        tables.append((headers, data))
     if unformatted_data:
         unformatted_data.sort()
-        output += '\n\n' + format_table(unformatted_headers, unformatted_data)
-    if data or unformatted_data:
-        output += '\n'
-        if recommended_action:
-            output += '\n  Recommended Action: %s' % recommended_action
-        if doc_url:
-            output += '\n  Reference Document: %s' % doc_url
-        output += '\n' * 2
-    prints(output)
+        tables.append((unformatted_headers, unformatted_data))
+    if table_file and any(len(rows) > max_rows for _, rows in tables):
+        write_table_file(table_file, output, tables)
+    else:
+        table_file = None
+
+    def iter_lines():
+        yield output
+        for _headers, rows in tables:
+            if rows is unformatted_data:
+                yield ''
+            if table_file and len(rows) > max_rows:
+                for row in iter_table(_headers, rows[:max_rows]):
+                    yield row
+                yield '  ... {} more rows. See {} for all rows.'.format(len(rows) - max_rows, table_file)
+            else:
+                for row in iter_table(_headers, rows):
+                    yield row
+        if tables:
+            yield ''
+            if recommended_action:
+                yield '  Recommended Action: %s' % recommended_action
+            if doc_url:
+                yield '  Reference Document: %s' % doc_url
+            yield ''
+            yield ''
+
+    # Large tables are printed in chunks instead of as one giant string
+    chunk = []
+    for line in iter_lines():
+        chunk.append(line)
+        if len(chunk) >= TABLE_PRINT_CHUNK:
+            prints('\n'.join(chunk))
+            chunk = []
+    if chunk:
+        prints('\n'.join(chunk))
+
+
+def write_table_file(filepath, title, tables):
+    dirpath = os.path.dirname(filepath)
+    if dirpath and not os.path.isdir(dirpath):
+        os.makedirs(dirpath)
+    with open(filepath, 'w') as f:
+        f.write(title + '\n')
+        for headers, rows in tables:
+            f.write('\n')
+            for row in iter_table(headers, rows):
+                f.write(row + '\n')
 
 
-def write_jsonfile(filepath, content):
+def write_jsonfile(filepath, content, indent=2):
     with open(filepath, 'w') as f:
-        json.dump(content, f, indent=2)
+        if indent is None:
+            json.dump(content, f, separators=(',', ':'))
+        else:
+            json.dump(content, f, indent=indent)
+
+
+def get_class_fingerprint(class_name):
+    """Returns `[count, latest modTs]` of a class to tell whether it changed since another run"""
+    data = _icurl('class', '{0}.json?order-by={0}.modTs|desc'.format(class_name), page=0, page_size=1)
+    mod_ts = ""
+    for mo in data['imdata']:
+        for attr in mo.values():
+            mod_ts = attr['attributes'].get('modTs', '')
+    return [int(data['totalCount']), mod_ts]
+
+
+def get_class_fingerprints(classes):
+    """Returns {class: fingerprint}. A fingerprint is None when it failed."""
+    fingerprints = {}
+    for class_name in classes:
+        try:
+            fingerprints[class_name] = get_class_fingerprint(class_name)
+        except Exception as e:
+            log.error("Failed to get the fingerprint of %s - %s", class_name, e)
+            fingerprints[class_name] = None
+    return fingerprints
+
+
+class PreviousRun(object):
+    """Results of a previous run for `--rerun-from`, loaded from its bundle or summary.json.
+
+    A check that passed (PASS or N/A) in the previous run can be reused
+    when the APIC versions and the script version are the same, and none of
+    the classes it declared with `check_wrapper(classes=...)` changed.
+    A check without declared classes always runs again since there is no way
+    to tell whether its input changed.
+    """
+    def __init__(self, path, results=None, metadata=None, fingerprints=None):
+        self.path = path
+        self.results = results or {}  # {check_id: AciResult dict}
+        self.metadata = metadata or {}
+        self.fingerprints = fingerprints or {}  # {class: fingerprint}
+
+    @classmethod
+    def load(cls, path):
+        json_dirname = os.path.basename(os.path.normpath(JSON_DIR))
+        files = {}  # {(dirname, filename): content}
+        if os.path.isfile(path) and tarfile.is_tarfile(path):
+            with tarfile.open(path) as tar:
+                for member in tar:
+                    if not member.isfile() or not member.name.endswith('.json'):
+                        continue
+                    key = (os.path.basename(os.path.dirname(member.name)), os.path.basename(member.name))
+                    files[key] = tar.extractfile(member).read().decode('utf-8')
+        else:
+            # summary.json in the directory of the previous run
+            dirpath = os.path.dirname(os.path.abspath(path))
+            for dirname, _dirpath in (("", dirpath), (json_dirname, os.path.join(dirpath, json_dirname))):
+                for filename in os.listdir(_dirpath):
+                    if filename.endswith('.json'):
+                        with open(os.path.join(_dirpath, filename), 'r') as f:
+                            files[(dirname, filename)] = f.read()
+        results, metadata, fingerprints = {}, {}, {}
+        for (dirname, filename), content in files.items():
+            if dirname == json_dirname:
+                aci_result = json.loads(content)
+                results[aci_result['ruleId']] = aci_result
+            elif filename == os.path.basename(META_FILE):
+                metadata = json.loads(content)
+            elif filename == os.path.basename(FINGERPRINT_FILE):
+                fingerprints = json.loads(content)
+        if not results:
+            raise ValueError("No check results found in {}".format(path))
+        log.info("Loaded %d results of the previous run from %s", len(results), path)
+        return cls(path, results, metadata, fingerprints)
+
+    def is_same_environment(self, common_data):
+        for key in ("cversion", "tversion", "sw_cversion"):
+            if self.metadata.get(key) != str(common_data.get(key)):
+                return False
+        return self.metadata.get("script_version") == str(SCRIPT_VERSION)
+
+    def get_reusable_result(self, check_func, fingerprints):
+        """Returns `Result` to carry forward or None when the check needs to run again"""
+        aci_result = self.results.get(check_func.__name__)
+        if not aci_result or aci_result.get("ruleStatus") != AciResult.PASS:
+            return None
+        classes = getattr(check_func, "classes", None)
+        if not classes:
+            return None
+        for class_name in classes:
+            fingerprint = fingerprints.get(class_name)
+            if fingerprint is None or fingerprint != self.fingerprints.get(class_name):
+                return None
+        return Result(
+            # N/A is the only passed result without validation
+            result=PASS if aci_result.get("showValidation", True) else NA,
+            msg=aci_result.get("reason", ""),
+            recommended_action=aci_result.get("recommended_action", ""),
+            doc_url=aci_result.get("docUrl", ""),
+        )
+
+
+def write_file_atomic(filepath, data):
+    """Write `data` (bytes) in a temporary file and replace `filepath` with it.
+    Readers see either the old or the new content even if the script dies midway.
+    """
+    tmp_filepath = filepath + ".tmp"
+    with open(tmp_filepath, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.rename(tmp_filepath, filepath)
+
+
+class Checkpoint(object):
+    """Checkpoint of finished checks and shared data of a run for `--resume`.
+
+    Results are saved in `filepath` and shared data in `data_filepath`, both as
+    JSON and written atomically. Shared data is never unpickled, so a file placed
+    in the directory cannot run code. A checkpoint is valid only for the same
+    APIC versions and script version.
+    Results of ERROR are not saved so that those checks run again on resume.
+
+    Results are saved by `save_if_due()` only every `save_every` new results or
+    `save_interval` sec, and by `save()` when the run is interrupted.
+    Shared data that cannot be serialized in JSON is recorded as absent and
+    built again on resume.
+
+    `filepath` format:
+        {
+            "version": 1,
+            "environment": {"cversion": str, "tversion": str, "sw_cversion": str, "script_version": str},
+            "results": {check_id: `Result.as_dict()`},
+        }
+
+    `data_filepath` format:
+        {name: {"class": name in `data_classes` or None, "data": JSON data, or the state of the class}}
+        {name: {"class": None, "absent": true}} for data that could not be saved
+    """
+    version = 1
+    # Classes of shared data restored from their state. Other data is saved as it is.
+    data_classes = dict((cls.__name__, cls) for cls in (AccessPolicy, VrfModel))
+
+    def __init__(self, filepath, data_filepath, save_every=CHECKPOINT_SAVE_EVERY, save_interval=CHECKPOINT_SAVE_INTERVAL):
+        self.filepath = filepath
+        self.data_filepath = data_filepath
+        self.save_every = save_every
+        self.save_interval = save_interval  # sec
+        self.environment = {}
+        self.results = OrderedDict()  # {check_id: Result}
+        self.shared_data = {}  # {name: data}
+        self._dirty = False
+        self._unsaved = 0  # results added since the last save
+        self._saved_at = time.time()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    @staticmethod
+    def get_environment(common_data):
+        environment = dict((key, str(common_data.get(key))) for key in ("cversion", "tversion", "sw_cversion"))
+        environment["script_version"] = str(SCRIPT_VERSION)
+        return environment
 
+    def load(self):
+        """Returns True when a checkpoint was loaded"""
+        try:
+            with open(self.filepath, "r") as f:
+                content = json.load(f, object_pairs_hook=OrderedDict)
+            if content.get("version") != self.version:
+                return False
+            self.environment = content["environment"]
+            self.results = OrderedDict(
+                (check_id, Result(**result)) for check_id, result in content["results"].items()
+            )
+        except (IOError, OSError, ValueError, KeyError, TypeError, AttributeError):
+            log.info("No checkpoint loaded from {}".format(self.filepath))
+            return False
+        try:
+            with open(self.data_filepath, "r") as f:
+                self.shared_data = dict(
+                    (name, self.load_data(content))
+                    for name, content in json.load(f, object_pairs_hook=OrderedDict).items()
+                    if not content.get("absent")
+                )
+        except Exception:
+            log.info("No shared data loaded from {}".format(self.data_filepath), exc_info=True)
+        log.info("Loaded a checkpoint with %d results from %s", len(self.results), self.filepath)
+        return True
+
+    def matches(self, common_data):
+        return self.environment == self.get_environment(common_data)
+
+    def dump_data(self, data):
+        classname = type(data).__name__
+        if self.data_classes.get(classname) is not type(data):
+            return {"class": None, "data": data}
+        getstate = getattr(data, "__getstate__", None)
+        return {"class": classname, "data": getstate() if getstate else vars(data)}
+
+    def load_data(self, content):
+        if content["class"] is None:
+            return content["data"]
+        cls = self.data_classes[content["class"]]
+        data = cls.__new__(cls)
+        if hasattr(data, "__setstate__"):
+            data.__setstate__(content["data"])
+        else:
+            data.__dict__.update(content["data"])
+        return data
+
+    def start(self, common_data):
+        """Start a new checkpoint for the run. Results of the loaded one are kept."""
+        self.environment = self.get_environment(common_data)
+        self._dirty = True
+
+    def add_result(self, check_id, result_obj):
+        if result_obj.result == ERROR:
+            return
+        with self._lock:
+            self.results[check_id] = result_obj
+            self._dirty = True
+            self._unsaved += 1
+
+    def save_if_due(self):
+        """Save results after `save_every` new results or `save_interval` sec since the last save"""
+        with self._lock:
+            due = self._unsaved >= self.save_every or (
+                self._dirty and time.time() - self._saved_at >= self.save_interval
+            )
+        if due:
+            self.save()
+
+    def _dump_shared_data(self):
+        """JSON of all shared data. Data that cannot be serialized is recorded as absent."""
+        entries = []
+        for name, data in self.shared_data.items():
+            try:
+                entry = json.dumps(self.dump_data(data))
+            except (TypeError, ValueError):
+                log.error("(%s) Shared data cannot be saved in the checkpoint. It will be built again on resume.", name, exc_info=True)
+                entry = json.dumps({"class": None, "absent": True})
+            entries.append("{}:{}".format(json.dumps(name), entry))
+        return "{" + ",".join(entries) + "}"
+
+    def save(self, shared_data=None):
+        """Save results if changed since the last save, and `shared_data` if given"""
+        with self._save_lock:
+            try:
+                if shared_data:
+                    self.shared_data.update(shared_data)
+                    write_file_atomic(self.data_filepath, self._dump_shared_data().encode("utf-8"))
+                with self._lock:
+                    if not self._dirty:
+                        return
+                    content = {
+                        "version": self.version,
+                        "environment": self.environment,
+                        "results": OrderedDict((k, r.as_dict()) for k, r in self.results.items()),
+                    }
+                    self._dirty = False
+                    self._unsaved = 0
+                    self._saved_at = time.time()
+                write_file_atomic(self.filepath, json.dumps(content).encode("utf-8"))
+            except (IOError, OSError):
+                log.warning("Failed to save the checkpoint in {}".format(self.filepath), exc_info=True)
+
+    def remove(self):
+        for filepath in (self.filepath, self.data_filepath):
+            if os.path.exists(filepath):
+                os.remove(filepath)
+
+
+class ResultBundle(object):
+    """The result bundle written as a stream while the script runs.
+
+    Final results are added as soon as they come via `add_json()` so that
+    compression happens during the run. At `close()`, the other files under
+    the directory that are complete only by then, such as the debug log and
+    the summary, are added before the bundle is closed.
+    `compresslevel` of 0 writes an uncompressed tar.
+
+    The bundle is written as `<filepath>.partial` and renamed to `filepath`
+    only at `close()` so that an aborted run never leaves a truncated bundle
+    under the final name. `abort()` removes the partial bundle instead.
+    Each file is added only once. The first final result of a check wins,
+    e.g. over a timeout reported while the check was finishing.
+    """
+    def __init__(self):
+        self.filepath = None
+        self.partial_filepath = None
+        self._f = None
+        self._gz = None
+        self._tar = None
+        self._added = set()
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._tar is not None
+
+    def open(self, filepath, compresslevel=6):
+        self.filepath = filepath
+        self.partial_filepath = filepath + '.partial'
+        self._f = open(self.partial_filepath, 'wb')
+        fileobj = self._f
+        if compresslevel:
+            fileobj = self._gz = gzip.GzipFile(
+                filename='', mode='wb', fileobj=self._f, compresslevel=compresslevel
+            )
+        self._tar = tarfile.open(fileobj=fileobj, mode='w|')
+        self._added = set()
+
+    def _add(self, path):
+        if path in self._added or not os.path.exists(path):
+            return
+        self._tar.add(path, recursive=False)
+        self._added.add(path)
+
+    def add_json(self, filepath, content, indent=2):
+        """Add a JSON file with `content` without reading it back from disk"""
+        if indent is None:
+            data = json.dumps(content, separators=(',', ':'))
+        else:
+            data = json.dumps(content, indent=indent)
+        data = data.encode('utf-8')
+        filepath = os.path.normpath(filepath)
+        info = tarfile.TarInfo(filepath)
+        info.size = len(data)
+        info.mtime = time.time()
+        info.mode = 0o644
+        with self._lock:
+            if self._tar is None:
+                return
+            if filepath in self._added:
+                log.warning("%s is already in the result bundle. Ignoring the new content.", filepath)
+                return
+            try:
+                for dirpath in self._parent_dirs(filepath):
+                    self._add(dirpath)
+                self._tar.addfile(info, io.BytesIO(data))
+                self._added.add(filepath)
+            except Exception as e:
+                log.error("Failed to add %s to the result bundle - %s", filepath, e)
 
-def write_script_metadata(api_only, timeout, total_checks, common_data):
+    @staticmethod
+    def _parent_dirs(filepath):
+        dirpaths = []
+        dirpath = os.path.dirname(filepath)
+        while dirpath:
+            dirpaths.insert(0, dirpath)
+            dirpath = os.path.dirname(dirpath)
+        return dirpaths
+
+    def close(self, dirpath):
+        """Add files under `dirpath` not in the bundle yet, then close it"""
+        with self._lock:
+            for root, dirs, files in os.walk(dirpath):
+                dirs.sort()
+                self._add(os.path.normpath(root))
+                for filename in sorted(files):
+                    self._add(os.path.normpath(os.path.join(root, filename)))
+            self._close_streams()
+            os.rename(self.partial_filepath, self.filepath)
+
+    def abort(self):
+        """Close and remove the partial bundle if it is still open"""
+        with self._lock:
+            if self._tar is None:
+                return
+            try:
+                self._close_streams()
+            finally:
+                if os.path.exists(self.partial_filepath):
+                    os.remove(self.partial_filepath)
+
+    def _close_streams(self):
+        try:
+            self._tar.close()
+            if self._gz is not None:
+                self._gz.close()
+        finally:
+            self._f.close()
+            self._tar = self._gz = self._f = None
+
+
+result_bundle = ResultBundle()
+# Not to leave a partial bundle when the script is aborted
+atexit.register(result_bundle.abort)
+
+
+def write_script_metadata(api_only, timeout, total_checks, common_data, rerun_from=None, reused_checks=None, resumed_checks=None):
     metadata = {
         "name": "PreupgradeCheck",
         "method": "standalone script",
@@ -1632,9 +3708,71 @@ def write_script_metadata(api_only, timeout, total_checks, common_data):
         "timeout": timeout,
         "total_checks": total_checks,
     }
+    if rerun_from:
+        metadata["rerun_from"] = rerun_from
+        metadata["reused_checks"] = reused_checks or []
+    if resumed_checks is not None:
+        metadata["resumed_checks"] = resumed_checks
     write_jsonfile(META_FILE, metadata)
 
 
+class CappedResponse(object):
+    """A response to log with up to `cap` bytes from its head and tail.
+
+    Formatted only when the log record is emitted. Pass it as an argument
+    of %-style logging instead of formatting the message beforehand.
+    `cap` of None to log the whole response.
+    """
+    def __init__(self, response, cap=RESPONSE_LOG_CAP):
+        self.response = response
+        self.cap = cap
+
+    def __str__(self):
+        response = self.response
+        if self.cap is None or len(response) <= self.cap:
+            return self._decode(response)
+        half = self.cap // 2
+        return "{} ...<{} bytes omitted out of {}>... {}".format(
+            self._decode(response[:half]),
+            len(response) - half * 2,
+            len(response),
+            self._decode(response[-half:]),
+        )
+
+    @staticmethod
+    def _decode(response):
+        if isinstance(response, bytes) and bytes is not str:
+            return response.decode("utf-8", "replace")
+        return response
+
+
+def enable_response_log(filepath=RESPONSE_LOG_FILE):
+    """Dump full responses in a rotating file in addition to capped ones in the debug log"""
+    if not response_log.disabled:
+        return
+    handler = logging.handlers.RotatingFileHandler(
+        filepath, maxBytes=RESPONSE_LOG_MAX_BYTES, backupCount=RESPONSE_LOG_BACKUPS
+    )
+    handler.setFormatter(logging.Formatter('[%(asctime)s.%(msecs)03d{}] %(message)s'.format(tz), datefmt='%Y-%m-%d %H:%M:%S'))
+    response_log.addHandler(handler)
+    response_log.setLevel(logging.DEBUG)
+    response_log.disabled = False
+
+
+def disable_response_log():
+    response_log.disabled = True
+    for handler in list(response_log.handlers):
+        if isinstance(handler, logging.handlers.RotatingFileHandler):
+            response_log.removeHandler(handler)
+            handler.close()
+
+
+def log_response(cmd, response):
+    log.debug("response: %s", CappedResponse(response))
+    if not response_log.disabled:
+        response_log.debug("cmd = %s\n%s", cmd, CappedResponse(response, cap=None))
+
+
 def _icurl_error_handler(imdata):
     if imdata and "error" in imdata[0]:
         if "not found in class" in imdata[0]['error']['attributes']['text']:
@@ -1661,7 +3799,7 @@ def _icurl(apitype, query, page=0, page_size=100000):
     cmd = ['icurl', '-gs', uri]
     log.info('cmd = ' + ' '.join(cmd))
     response = subprocess.check_output(cmd)
-    log.debug('response: ' + str(response))
+    log_response(' '.join(cmd), response)
     data = json.loads(response)
     _icurl_error_handler(data['imdata'])
     return data
@@ -1672,6 +3810,7 @@ def icurl(apitype, query, page_size=100000):
     total_cnt = 999999
     page = 0
     while total_cnt > len(total_imdata):
+        check_cancelled()
         data = _icurl(apitype, query, page, page_size)
         # API queries may return empty even when totalCount is > 0 and the given page number
         # should contain entries. This may happen when there are too many queries
@@ -1694,10 +3833,11 @@ def run_cmd(cmd, splitlines=True):
     """
     if isinstance(cmd, list):
         cmd = ' '.join(cmd)
+    check_cancelled()
     try:
         log.info('run_cmd = ' + cmd)
         response = subprocess.check_output(cmd, shell=True).decode('utf-8')
-        log.debug('response: ' + str(response))
+        log_response(cmd, response)
         if splitlines:
             return response.splitlines()
         return response
@@ -1823,11 +3963,7 @@ def get_current_versions(fabric_nodes, arg_cversion):
         prints(msg.format("Not Found! Join switches to the fabric then re-run this script.\n"))
         return apic_version, None
 
-    lowest_sw_ver = AciVersion(switch_versions.pop())
-    for sw_version in switch_versions:
-        sw_version = AciVersion(sw_version)
-        if lowest_sw_ver.newer_than(sw_version):
-            lowest_sw_ver = sw_version
+    lowest_sw_ver = min(AciVersion(sw_version) for sw_version in switch_versions)
     prints(msg.format(lowest_sw_ver) + "\n")
     return apic_version, lowest_sw_ver
 
@@ -1858,6 +3994,15 @@ def get_vpc_nodes():
     return vpc_nodes
 
 
+def get_access_policy():
+    """ Returns AccessPolicy with all access policies (infraInfra subtree) """
+    mo_classes = AciAccessPolicyParser.get_classes()
+    filter = '?query-target=subtree&target-subtree-class=' + ','.join(mo_classes)
+    infra_mos = compact_access_policy_mos(icurl('class', 'infraInfra.json' + filter))
+    port_data, vpool_per_dom = run_in_process(parse_access_policy, infra_mos)
+    return AccessPolicy(port_data, vpool_per_dom)
+
+
 def query_common_data(api_only=False, arg_cversion=None, arg_tversion=None, username=None, password=None):
     if api_only:
         username = None
@@ -1887,7 +4032,7 @@ def query_common_data(api_only=False, arg_cversion=None, arg_tversion=None, user
     }
 
 
-@check_wrapper(check_title="APIC Cluster Status")
+@check_wrapper(check_title="APIC Cluster Status", classes=["infraWiNode"])
 def apic_cluster_health_check(cversion, **kwargs):
     result = FAIL_UF
     msg = ''
@@ -1978,7 +4123,7 @@ def maintp_grp_crossing_4_0_check(cversion, tversion, **kwargs):
     return Result(result=result, msg=msg, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title="NTP Status")
+@check_wrapper(check_title="NTP Status", classes=["datetimeNtpq", "datetimeClkPol", "fabricNode"])
 def ntp_status_check(fabric_nodes, **kargs):
     result = FAIL_UF
     headers = ["Pod-ID", "Node-ID"]
@@ -2349,8 +4494,8 @@ def port_configured_as_l3_check(**kwargs):
     )
 
 
-@check_wrapper(check_title="L3Out Subnets (F0467 prefix-entry-already-in-use)")
-def prefix_already_in_use_check(**kwargs):
+@check_wrapper(check_title="L3Out Subnets (F0467 prefix-entry-already-in-use)", providers=["vrf_model"])
+def prefix_already_in_use_check(vrf_model, **kwargs):
     result = FAIL_O
     headers = ["VRF Name", "Prefix", "L3Out EPGs without F0467", "L3Out EPGs with F0467"]
     headers_old = ["Fault", "Failed L3Out EPG"]
@@ -2369,12 +4514,7 @@ def prefix_already_in_use_check(**kwargs):
     if not faultInsts:
         return Result(result=PASS)
 
-    vnid2vrf = {}
-    fvCtxs = icurl("class", "fvCtx.json")
-    for fvCtx in fvCtxs:
-        vrf_vnid = fvCtx["fvCtx"]["attributes"]["scope"]
-        vrf_dn = fvCtx["fvCtx"]["attributes"]["dn"]
-        vnid2vrf[vrf_vnid] = vrf_dn
+    vnid2vrf = vrf_model.vnid_to_vrf
 
     conflicts = defaultdict(dict)  # vrf -> prefix -> extepgs, faulted_extepgs
     for faultInst in faultInsts:
@@ -2419,33 +4559,17 @@ def prefix_already_in_use_check(**kwargs):
         )
 
     # Proceed further only for new versions with VRF/prefix data in faults
-    # Get L3Out DNs in the VRFs mentioned by the faults
-    l3out2vrf = {}
-    l3extRsEctxes = icurl("class", "l3extRsEctx.json")
-    for l3extRsEctx in l3extRsEctxes:
-        vrf_dn = l3extRsEctx["l3extRsEctx"]["attributes"]["tDn"]
-        if vrf_dn in conflicts:
-            # l3extRsEctx.dn is always L3Out DN + "/rsectx"
-            l3out_dn = l3extRsEctx["l3extRsEctx"]["attributes"]["dn"].split("/rsectx")[0]
-            l3out2vrf[l3out_dn] = vrf_dn
-
-    # Get conflicting l3extSubnets
-    l3extSubnets = icurl("class", "l3extSubnet.json")
-    for l3extSubnet in l3extSubnets:
-        l3extSubnet_attr = l3extSubnet["l3extSubnet"]["attributes"]
-        l3out_dn = l3extSubnet_attr["dn"].split("/instP-")[0]
-        vrf_dn = l3out2vrf.get(l3out_dn)
-        if not vrf_dn:
-            continue
-        # F0467 is only for import-security
-        if "import-security" not in l3extSubnet_attr["scope"]:
-            continue
-        prefix = l3extSubnet_attr["ip"]
-        if prefix not in conflicts[vrf_dn]:
-            continue
-        extepg_dn = l3extSubnet_attr["dn"].split("/extsubnet-")[0]
-        if extepg_dn not in conflicts[vrf_dn][prefix]["faulted_extepgs"]:
-            conflicts[vrf_dn][prefix]["extepgs"].add(extepg_dn)
+    # Get conflicting l3extSubnets in the VRFs mentioned by the faults
+    l3out_prefixes = vrf_model.l3out_prefixes
+    for vrf_dn in conflicts:
+        for prefix in conflicts[vrf_dn]:
+            for l3extSubnet_attr in l3out_prefixes.get(vrf_dn, {}).get(prefix, []):
+                # F0467 is only for import-security
+                if "import-security" not in l3extSubnet_attr["scope"]:
+                    continue
+                extepg_dn = l3extSubnet_attr["dn"].split("/extsubnet-")[0]
+                if extepg_dn not in conflicts[vrf_dn][prefix]["faulted_extepgs"]:
+                    conflicts[vrf_dn][prefix]["extepgs"].add(extepg_dn)
 
     for vrf_dn in conflicts:
         for prefix in conflicts[vrf_dn]:
@@ -2537,7 +4661,7 @@ def encap_already_in_use_check(**kwargs):
     )
 
 
-@check_wrapper(check_title="BD Subnets (F1425 subnet-overlap)")
+@check_wrapper(check_title="BD Subnets (F1425 subnet-overlap)", classes=["faultInst"])
 def bd_subnet_overlap_check(**kwargs):
     result = FAIL_O
     headers = ["Fault", "Pod", "Node", "VRF", "Interface", "Address"]
@@ -2572,7 +4696,7 @@ def bd_subnet_overlap_check(**kwargs):
     )
 
 
-@check_wrapper(check_title="BD Subnets (F0469 duplicate-subnets-within-ctx)")
+@check_wrapper(check_title="BD Subnets (F0469 duplicate-subnets-within-ctx)", classes=["faultInst"])
 def bd_duplicate_subnet_check(**kwargs):
     result = FAIL_O
     headers = ["Fault", "Pod", "Node", "Bridge Domain 1", "Bridge Domain 2"]
@@ -2606,7 +4730,7 @@ def bd_duplicate_subnet_check(**kwargs):
     )
 
 
-@check_wrapper(check_title="HW Programming Failure (F3544 L3Out Prefixes, F3545 Contracts, actrl-resource-unavailable)")
+@check_wrapper(check_title="HW Programming Failure (F3544 L3Out Prefixes, F3545 Contracts, actrl-resource-unavailable)", classes=["faultInst"])
 def hw_program_fail_check(cversion, **kwargs):
     result = FAIL_O
     headers = ["Fault", "Pod", "Node", "Fault Description", "Recommended Action"]
@@ -2839,7 +4963,11 @@ def apic_ssd_check(cversion, username, password, fabric_nodes, **kwargs):
             apic1_dn = apic1["fabricNode"]["attributes"]["dn"]
             apics = icurl("class", "{}/infraWiNode.json".format(apic1_dn))
 
-        report_other = False
+        def _grep_wearout(c):
+            c.cmd('grep -oE "SSD Wearout Indicator is [0-9]+"  /var/log/dme/log/svc_ifc_ae.bin.log | tail -1')
+            return c.output
+
+        apic_info = []
         for apic in apics:
             if apic.get("fabricNode"):
                 apic_id = apic["fabricNode"]["attributes"]["id"]
@@ -2849,24 +4977,17 @@ def apic_ssd_check(cversion, username, password, fabric_nodes, **kwargs):
                 apic_id = apic["infraWiNode"]["attributes"]["id"]
                 apic_name = apic["infraWiNode"]["attributes"]["nodeName"]
                 apic_addr = apic["infraWiNode"]["attributes"]["addr"]
-            try:
-                c = Connection(apic_addr)
-                c.username = username
-                c.password = password
-                c.log = LOG_FILE
-                c.connect()
-            except Exception as e:
-                data.append([apic_id, apic_name, '-', '-', str(e)])
-                has_error = True
-                continue
-            try:
-                c.cmd('grep -oE "SSD Wearout Indicator is [0-9]+"  /var/log/dme/log/svc_ifc_ae.bin.log | tail -1')
-            except Exception as e:
-                data.append([apic_id, apic_name, '-', '-', str(e)])
+            apic_info.append((apic_id, apic_name, apic_addr))
+
+        report_other = False
+        outputs = ssh_fanout([addr for _, _, addr in apic_info], _grep_wearout, username, password)
+        for (apic_id, apic_name, _), (output, error) in zip(apic_info, outputs):
+            if error is not None:
+                data.append([apic_id, apic_name, '-', '-', str(error)])
                 has_error = True
                 continue
 
-            wearout_ind = re.search(r'SSD Wearout Indicator is (?P<wearout>[0-9]+)', c.output)
+            wearout_ind = re.search(r'SSD Wearout Indicator is (?P<wearout>[0-9]+)', output)
             if wearout_ind is not None:
                 wearout = wearout_ind.group('wearout')
                 if int(wearout) < 5:
@@ -2922,29 +5043,12 @@ def port_configured_for_apic_check(**kwargs):
     )
 
 
-@check_wrapper(check_title="Overlapping VLAN Pools")
-def overlapping_vlan_pools_check(**kwargs):
-    result = PASS
-    headers = ['Tenant', 'AP', 'EPG', 'Node', 'Port', 'VLAN Scope', 'VLAN ID', 'VLAN Pools (Domains)', 'Impact']
-    data = []
-    recommended_action = """
-    Each node must have only one VLAN pool per VLAN ID across all the ports or across the ports with VLAN scope `portlocal` in the same EPG.'
-    When `Impact` shows `Outage`, you must resolve the overlapping VLAN pools.
-    When `Impact` shows `Flood Scope`, you should check whether it is ok that STP BPDUs, or any BUM traffic when using Flood-in-Encap, may not be flooded within the same VLAN ID across all the nodes/ports.
-    Note that only the nodes causing the overlap are shown above."""
-    doc_url = 'https://datacenter.github.io/ACI-Pre-Upgrade-Validation-Script/validations/#overlapping-vlan-pool'
-
-    infraSetPols = icurl('mo', 'uni/infra/settings.json')
-    if infraSetPols[0]['infraSetPol']['attributes'].get('validateOverlappingVlans') in ['true', 'yes']:
-        return Result(result=PASS, msg="`Enforce EPG VLAN Validation` is enabled. No need to check overlapping VLANs")
-
-    # Get VLAN pools and ports from access policy
-    mo_classes = AciAccessPolicyParser.get_classes()
-    filter = '?query-target=subtree&target-subtree-class=' + ','.join(mo_classes)
-    infra_mos = icurl('class', 'infraInfra.json' + filter)
-    mos = AciAccessPolicyParser(infra_mos)
+def get_ports_per_epg(conn_dns, port_data_per_key):
+    """Map fvIfConn DNs to the ports deployed per EPG (`tenant:ap:epg`)
 
-    # Get EPG port deployments
+    Used by `overlapping_vlan_pools_check`. This takes only DNs and plain dicts
+    so that it can be run in a worker process via `run_in_process()`.
+    """
     epg_regex = r'uni/tn-(?P<tenant>[^/]+)/ap-(?P<ap>[^/]+)/epg-(?P<epg>[^/]+)'
     conn_regex = (
         r"uni/epp/fv-\[" + epg_regex + r"]/"
@@ -2960,10 +5064,10 @@ def overlapping_vlan_pools_check(**kwargs):
     # uni/epp/fv-[{epgPKey}]/node-{id}/extstpathatt-[{pathName}]-extchid-{extChId}/conndef/conn-[{encap}]-[{addr}]
     # uni/epp/fv-[{epgPKey}]/node-{id}/dyatt-[{targetDn}]/conndef/conn-[{encap}]-[{addr}]
     # uni/epp/fv-[{epgPKey}]/node-{id}/attEntitypathatt-[{pathName}]/conndef/conn-[{encap}]-[{addr}]
+    conn_pattern = re.compile(conn_regex)
     ports_per_epg = defaultdict(list)
-    fvIfConns = icurl('class', 'fvIfConn.json')
-    for fvIfConn in fvIfConns:
-        dn = re.search(conn_regex, fvIfConn['fvIfConn']['attributes']['dn'])
+    for conn_dn in conn_dns:
+        dn = conn_pattern.search(conn_dn)
         if not dn:
             continue
         epg_key = ':'.join([dn.group('tenant'), dn.group('ap'), dn.group('epg')])
@@ -2976,11 +5080,11 @@ def overlapping_vlan_pools_check(**kwargs):
             else:
                 port_keys.append('/'.join([dn.group('node'), port]))
         else:
-            for port_key, port_data in iteritems(mos.port_data):
+            for port_key, port_data in iteritems(port_data_per_key):
                 if port_data.get('aep_name') == dn.group('aep') and port_data.get('node') == dn.group('node'):
                     port_keys.append(port_key)
         for port_key in port_keys:
-            port_data = mos.port_data.get(port_key)
+            port_data = port_data_per_key.get(port_key)
             if not port_data:
                 continue
             ports_per_epg[epg_key].append({
@@ -2996,6 +5100,31 @@ def overlapping_vlan_pools_check(**kwargs):
                 'pc_type': str(port_data.get('pc_type', '')),
                 'vlan_scope': str(port_data.get('vlan_scope', '')),
             })
+    return ports_per_epg
+
+
+# `memory` for fvIfConn of all EPG deployments in a large fabric
+@check_wrapper(check_title="Overlapping VLAN Pools", providers=["access_policy"], memory=200 * 1024 * 1024)
+def overlapping_vlan_pools_check(access_policy, **kwargs):
+    result = PASS
+    headers = ['Tenant', 'AP', 'EPG', 'Node', 'Port', 'VLAN Scope', 'VLAN ID', 'VLAN Pools (Domains)', 'Impact']
+    data = []
+    recommended_action = """
+    Each node must have only one VLAN pool per VLAN ID across all the ports or across the ports with VLAN scope `portlocal` in the same EPG.'
+    When `Impact` shows `Outage`, you must resolve the overlapping VLAN pools.
+    When `Impact` shows `Flood Scope`, you should check whether it is ok that STP BPDUs, or any BUM traffic when using Flood-in-Encap, may not be flooded within the same VLAN ID across all the nodes/ports.
+    Note that only the nodes causing the overlap are shown above."""
+    doc_url = 'https://datacenter.github.io/ACI-Pre-Upgrade-Validation-Script/validations/#overlapping-vlan-pool'
+
+    infraSetPols = icurl('mo', 'uni/infra/settings.json')
+    if infraSetPols[0]['infraSetPol']['attributes'].get('validateOverlappingVlans') in ['true', 'yes']:
+        return Result(result=PASS, msg="`Enforce EPG VLAN Validation` is enabled. No need to check overlapping VLANs")
+
+    # Get EPG port deployments
+    epg_regex = r'uni/tn-(?P<tenant>[^/]+)/ap-(?P<ap>[^/]+)/epg-(?P<epg>[^/]+)'
+    # Only DNs are sent to the worker process instead of the whole MOs
+    conn_dns = [mo['fvIfConn']['attributes']['dn'] for mo in icurl('class', 'fvIfConn.json')]
+    ports_per_epg = run_in_process(get_ports_per_epg, conn_dns, dict(access_policy.port_data))
 
     # Check overlapping VLAN pools per EPG
     epg_filter = '?rsp-subtree-include=required&rsp-subtree=children&rsp-subtree-class=fvRsDomAtt'
@@ -3010,8 +5139,8 @@ def overlapping_vlan_pools_check(**kwargs):
             for j in range(i + 1, len(rsDoms)):
                 i_dn = rsDoms[i]['fvRsDomAtt']['attributes']['tDn']
                 j_dn = rsDoms[j]['fvRsDomAtt']['attributes']['tDn']
-                i_vpool = mos.vpool_per_dom.get(i_dn)
-                j_vpool = mos.vpool_per_dom.get(j_dn)
+                i_vpool = access_policy.vpool_per_dom.get(i_dn)
+                j_vpool = access_policy.vpool_per_dom.get(j_dn)
                 # domains that do not have VLAN pools attached
                 if not i_vpool or not j_vpool:
                     continue
@@ -3038,7 +5167,7 @@ def overlapping_vlan_pools_check(**kwargs):
             # Also store domains for each VLAN pool for the final output
             inuse_vpools = defaultdict(list)
             for dom_dn in common_domain_dns:
-                vpool = mos.vpool_per_dom.get(dom_dn, {})
+                vpool = access_policy.vpool_per_dom.get(dom_dn, {})
                 if vlan_id not in vpool.get('vlan_ids', []):
                     continue
                 inuse_vpools[vpool['name']].append(vpool['dom_name'])
@@ -3104,7 +5233,7 @@ def overlapping_vlan_pools_check(**kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title="Scalability (faults related to Capacity Dashboard)")
+@check_wrapper(check_title="Scalability (faults related to Capacity Dashboard)", classes=["eqptcapacityEntity", "faultInst"])
 def scalability_faults_check(**kwargs):
     result = FAIL_O
     headers = ["Fault", "Pod", "Node", "Description"]
@@ -3198,7 +5327,7 @@ def apic_disk_space_faults_check(cversion, tversion, **kwargs):
     )
 
 
-@check_wrapper(check_title="L3Out Route Map import/export direction")
+@check_wrapper(check_title="L3Out Route Map import/export direction", classes=["l3extSubnet", "l3extRsSubnetToProfile"])
 def l3out_route_map_direction_check(**kwargs):
     """ Implementation change due to CSCvm75395 - 4.1(1) """
     result = FAIL_O
@@ -3275,11 +5404,35 @@ def l3out_route_map_missing_target_check(cversion, tversion, **kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
+def get_overlapping_loopbacks(vrfs):
+    """Return rows of loopback IPs overlapping with L3Out interface subnets
+
+    `vrfs` is `{vrf: {node: {'loopbacks': [...], 'interfaces': [...]}}}` built
+    by `l3out_overlapping_loopback_check`. Each item is `{'addr', 'config'}`.
+    """
+    data = []
+    for vrf in vrfs:
+        for node in vrfs[vrf]:
+            loopbacks = vrfs[vrf][node].get('loopbacks')
+            interfaces = vrfs[vrf][node].get('interfaces')
+            if not loopbacks or not interfaces:
+                continue
+            for interface in interfaces:
+                for loopback in loopbacks:
+                    if IPAddress.ip_in_subnet(loopback['addr'], interface['addr']):
+                        data.append([
+                            vrf,
+                            node,
+                            '{} ({})'.format(loopback['addr'], loopback['config']),
+                            '{} ({})'.format(interface['addr'], interface['config']),
+                        ])
+    return data
+
+
 @check_wrapper(check_title="L3Out Loopback IP Overlap With L3Out Interfaces")
 def l3out_overlapping_loopback_check(**kwargs):
     result = FAIL_O
     headers = ['Tenant:VRF', 'Node ID', 'Loopback IP (Tenant:L3Out:NodeP)', 'Interface IP (Tenant:L3Out:NodeP:IFP)']
-    data = []
     recommended_action = 'Change either the loopback or L3Out interface IP subnet to avoid overlap.'
     doc_url = 'https://datacenter.github.io/ACI-Pre-Upgrade-Validation-Script/validations/#l3out-loopback-ip-overlap-with-l3out-interfaces'
 
@@ -3378,22 +5531,7 @@ def l3out_overlapping_loopback_check(**kwargs):
                 vrfs[vrf][node] = {}
             vrfs[vrf][node]['interfaces'] = vrfs[vrf][node].get('interfaces', []) + interface_ips[node]
 
-    # Check overlaps
-    for vrf in vrfs:
-        for node in vrfs[vrf]:
-            loopbacks = vrfs[vrf][node].get('loopbacks')
-            interfaces = vrfs[vrf][node].get('interfaces')
-            if not loopbacks or not interfaces:
-                continue
-            for interface in interfaces:
-                for loopback in loopbacks:
-                    if IPAddress.ip_in_subnet(loopback['addr'], interface['addr']):
-                        data.append([
-                            vrf,
-                            node,
-                            '{} ({})'.format(loopback['addr'], loopback['config']),
-                            '{} ({})'.format(interface['addr'], interface['config']),
-                        ])
+    data = run_in_process(get_overlapping_loopbacks, dict(vrfs))
     if not data:
         result = PASS
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
@@ -3439,7 +5577,7 @@ def bgp_peer_loopback_check(**kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title="Different infra VLAN via LLDP (F0454 infra-vlan-mismatch)")
+@check_wrapper(check_title="Different infra VLAN via LLDP (F0454 infra-vlan-mismatch)", classes=["faultInst"])
 def lldp_with_infra_vlan_mismatch_check(**kwargs):
     result = FAIL_O
     headers = ["Fault", "Pod", "Node", "Port"]
@@ -3509,7 +5647,35 @@ def apic_version_md5_check(tversion, username, password, fabric_nodes, **kwargs)
         apic1_dn = apic1["fabricNode"]["attributes"]["dn"]
         apics = icurl("class", "{}/infraWiNode.json".format(apic1_dn))
 
-    has_error = False
+    def _read_md5sum(c):
+        """Returns (md5sum, None, False) or (None, [Firmware, md5sum, Failure], is_error)"""
+        # Both in one round trip. `cat` just fails when the image is not found.
+        try:
+            (ls_output, ls_rc), (cat_output, cat_rc) = c.run_batch([
+                "ls -aslh /firmware/fwrepos/fwrepo/aci-apic-dk9.%s.bin" % tversion.dot_version,
+                "cat /firmware/fwrepos/fwrepo/md5sum/aci-apic-dk9.%s.bin" % tversion.dot_version,
+            ])
+        except Exception as e:
+            return None, ['-', '-', 'ls command via ssh failed due to:{}'.format(str(e))], True
+        if ls_rc is None:
+            return None, ['-', '-', 'ls command via ssh failed due to:{}'.format(c.last_match)], True
+        if "No such file or directory" in ls_output:
+            return None, [str(tversion), '-', 'image not found'], False
+
+        if cat_rc is None:
+            return None, [str(tversion), '-', 'failed to check md5sum via ssh due to:{}'.format(c.last_match)], True
+        if "No such file or directory" in cat_output:
+            return None, [str(tversion), '-', 'md5sum file not found'], False
+        for line in cat_output.split("\n"):
+            words = line.split()
+            if (
+                    len(words) == 2 and
+                    words[1].startswith("/var/run/mgmt/fwrepos/fwrepo/aci-apic")
+            ):
+                return words[0], None, False
+        return None, [str(tversion), '-', 'unexpected output when checking md5sum file'], True
+
+    apic_info = []
     for apic in apics:
         if apic.get("fabricNode"):
             apic_id = apic["fabricNode"]["attributes"]["id"]
@@ -3519,53 +5685,22 @@ def apic_version_md5_check(tversion, username, password, fabric_nodes, **kwargs)
             apic_id = apic["infraWiNode"]["attributes"]["id"]
             apic_name = apic["infraWiNode"]["attributes"]["nodeName"]
             apic_addr = apic["infraWiNode"]["attributes"]["addr"]
-        try:
-            c = Connection(apic_addr)
-            c.username = username
-            c.password = password
-            c.log = LOG_FILE
-            c.connect()
-        except Exception as e:
-            data.append([apic_id, apic_name, '-', '-', str(e)])
-            has_error = True
-            continue
-
-        try:
-            c.cmd("ls -aslh /firmware/fwrepos/fwrepo/aci-apic-dk9.%s.bin" %
-                  tversion.dot_version)
-        except Exception as e:
-            data.append([apic_id, apic_name, '-', '-',
-                         'ls command via ssh failed due to:{}'.format(str(e))])
-            has_error = True
-            continue
-        if "No such file or directory" in c.output:
-            data.append([apic_id, apic_name, str(tversion), '-', 'image not found'])
-            continue
+        apic_info.append((apic_id, apic_name, apic_addr))
 
-        try:
-            c.cmd("cat /firmware/fwrepos/fwrepo/md5sum/aci-apic-dk9.%s.bin" %
-                  tversion.dot_version)
-        except Exception as e:
-            data.append([apic_id, apic_name, str(tversion), '-',
-                         'failed to check md5sum via ssh due to:{}'.format(str(e))])
+    has_error = False
+    outputs = ssh_fanout([addr for _, _, addr in apic_info], _read_md5sum, username, password)
+    for (apic_id, apic_name, _), (output, error) in zip(apic_info, outputs):
+        if error is not None:
+            data.append([apic_id, apic_name, '-', '-', str(error)])
             has_error = True
             continue
-        if "No such file or directory" in c.output:
-            data.append([apic_id, apic_name, str(tversion), '-', 'md5sum file not found'])
-            continue
-        for line in c.output.split("\n"):
-            words = line.split()
-            if (
-                    len(words) == 2 and
-                    words[1].startswith("/var/run/mgmt/fwrepos/fwrepo/aci-apic")
-            ):
-                md5s.append(words[0])
-                md5_names.append([apic_id, apic_name])
-                break
-        else:
-            data.append([apic_id, apic_name, str(tversion), '-', 'unexpected output when checking md5sum file'])
-            has_error = True
+        md5, failure, is_error = output
+        if failure:
+            data.append([apic_id, apic_name] + failure)
+            has_error = has_error or is_error
             continue
+        md5s.append(md5)
+        md5_names.append([apic_id, apic_name])
 
     if len(set(md5s)) > 1:
         for id_name, md5 in zip(md5_names, md5s):
@@ -3597,23 +5732,25 @@ def standby_apic_disk_space_check(**kwargs):
             continue
         checked_stby.append(stb['addr'])
         try:
-            c = Connection(stb['addr'])
-            c.username = "rescue-user"
-            c.log = LOG_FILE
-            c.connect()
+            c = ssh_pool.acquire(stb['addr'], "rescue-user")
         except Exception as e:
             data.append([stb['mbSn'], stb['oobIpAddr'], '-', '-', str(e)])
             has_error = True
             continue
 
+        broken = True
         try:
             c.cmd("df -h")
+            output = c.output
+            broken = False
         except Exception as e:
             data.append([stb['mbSn'], stb['oobIpAddr'], '-', '-', str(e)])
             has_error = True
             continue
+        finally:
+            ssh_pool.release(c, broken=broken)
 
-        for line in c.output.split("\n"):
+        for line in output.split("\n"):
             if "Filesystem" not in line and "df" not in line:
                 fs_regex = r'([^\s]+) +([^\s]+) +([^\s]+) +([^\s]+) +([^\s]+)%'
                 fs = re.search(fs_regex, line)
@@ -3702,7 +5839,7 @@ def ep_announce_check(cversion, tversion, **kwargs):
     return Result(result=result, headers=headers, data=data)
 
 
-@check_wrapper(check_title="VMM Domain Controller Status")
+@check_wrapper(check_title="VMM Domain Controller Status", classes=["compCtrlr"])
 def vmm_controller_status_check(**kwargs):
     result = PASS
     headers = ['VMM Domain', 'vCenter IP or Hostname', 'Current State']
@@ -3722,7 +5859,7 @@ def vmm_controller_status_check(**kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title="VMM Domain LLDP/CDP Adjacency Status")
+@check_wrapper(check_title="VMM Domain LLDP/CDP Adjacency Status", classes=["faultInst"])
 def vmm_controller_adj_check(**kwargs):
     result = PASS
     msg = ''
@@ -3921,7 +6058,7 @@ def isis_redis_metric_mpod_msite_check(**kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title="BGP route target type for GOLF over L2EVPN")
+@check_wrapper(check_title="BGP route target type for GOLF over L2EVPN", classes=["fvCtx", "l3extGlobalCtxName", "bgpRtTarget"])
 def bgp_golf_route_target_type_check(cversion, tversion, **kwargs):
     result = FAIL_O
     headers = ["VRF DN", "Global Name", "Route Target"]
@@ -3953,7 +6090,9 @@ def bgp_golf_route_target_type_check(cversion, tversion, **kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title="APIC Container Bridge IP Overlap with APIC TEP")
+# AppCenter was deprecated in 6.1.2.
+# Due to a bug the deprecated object returns totalCount:1 with empty data instead of totalCount:0.
+@check_wrapper(check_title="APIC Container Bridge IP Overlap with APIC TEP", affected_versions={"cversion": "<=6.1(2a)"})
 def docker0_subnet_overlap_check(cversion, **kwargs):
     result = PASS
     headers = ["Container Bridge IP", "APIC TEP"]
@@ -3961,11 +6100,6 @@ def docker0_subnet_overlap_check(cversion, **kwargs):
     recommended_action = 'Change the container bridge IP via "Apps > Settings" on the APIC GUI'
     doc_url = "https://datacenter.github.io/ACI-Pre-Upgrade-Validation-Script/validations/#apic-container-bridge-ip-overlap-with-apic-tep"
 
-    # AppCenter was deprecated in 6.1.2.
-    # Due to a bug the deprecated object returns totalCount:1 with empty data instead of totalCount:0.
-    if cversion.newer_than("6.1(2a)"):
-        return Result(result=NA, msg=VER_NOT_AFFECTED)
-
     containerPols = icurl('mo', 'pluginPolContr/ContainerPol.json')
     if not containerPols:
         bip = "172.17.0.1/16"
@@ -4180,7 +6314,7 @@ def llfc_susceptibility_check(cversion, tversion, vpc_node_ids, **kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title="telemetryStatsServerP Object")
+@check_wrapper(check_title="telemetryStatsServerP Object", classes=["telemetryStatsServerP"])
 def telemetryStatsServerP_object_check(sw_cversion, tversion, **kwargs):
     result = PASS
     headers = ["Current version", "Target Version", "Warning"]
@@ -4418,7 +6552,7 @@ def sup_hwrev_check(cversion, tversion, **kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title="Per-Leaf Fabric Uplink Limit")
+@check_wrapper(check_title="Per-Leaf Fabric Uplink Limit", classes=["eqptPortP"])
 def uplink_limit_check(cversion, tversion, **kwargs):
     result = PASS
     headers = ["Node", "Uplink Count"]
@@ -4692,7 +6826,7 @@ def post_upgrade_cb_check(cversion, tversion, **kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title="EECDH SSL Cipher")
+@check_wrapper(check_title="EECDH SSL Cipher", classes=["commCipher"])
 def eecdh_cipher_check(cversion, **kwargs):
     result = FAIL_UF
     headers = ["DN", "Cipher", "State", "Failure Reason"]
@@ -4835,58 +6969,48 @@ def n9k_c93108tc_fx3p_interface_down_check(tversion, fabric_nodes, **kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title='BD and EPG Subnet Scope Consistency')
-def subnet_scope_check(cversion, **kwargs):
+@check_wrapper(
+    check_title='BD and EPG Subnet Scope Consistency',
+    affected_versions={"cversion": ["<4.2(6d)", ">=5.0(1a), <5.1(1h)"]},
+    providers=["vrf_model"],
+)
+def subnet_scope_check(vrf_model, **kwargs):
     result = PASS
     headers = ["BD DN", "BD Scope", "EPG DN", "EPG Scope"]
     data = []
     recommended_action = 'Configure the same Scope for the identified subnet pairings'
     doc_url = 'https://datacenter.github.io/ACI-Pre-Upgrade-Validation-Script/validations#bd-and-epg-subnet-scope-consistency'
 
-    if cversion.older_than("4.2(6d)") or (cversion.major1 == "5" and cversion.older_than("5.1(1h)")):
-        epg_api = 'fvAEPg.json?'
-        epg_api += 'rsp-subtree=children&rsp-subtree-class=fvSubnet&rsp-subtree-include=required'
-
-        fvAEPg = icurl('class', epg_api)
-        if not fvAEPg:
-            return Result(result=NA, msg="No EPG Subnets found. Skipping.")
-
-        bd_api = 'fvBD.json'
-        bd_api += '?rsp-subtree=children&rsp-subtree-class=fvSubnet&rsp-subtree-include=required'
-
-        fvBD = icurl('class', bd_api)
-        fvRsBd = icurl('class', 'fvRsBd.json')
-
-        epg_to_subnets = {}
-        # EPG subnets *tend* to be fewer, build out lookup dict by EPG first
-        # {"epg_dn": {subnet1: scope, subnet2: scope},...}
-        for epg in fvAEPg:
-            subnet_scopes = {}
-            for subnet in epg['fvAEPg']['children']:
-                subnet_scopes[subnet["fvSubnet"]["attributes"]["ip"]] = subnet["fvSubnet"]["attributes"]["scope"]
-            epg_to_subnets[epg['fvAEPg']['attributes']['dn']] = subnet_scopes
-
-        bd_to_epg = {}
-        # Build out BD to epg lookup, if EPG has a subnet (entry in epg_to_subnets)
-        # {bd_tdn: [epg1, epg2, epg3...]}
-        for reln in fvRsBd:
-            epg_dn = reln["fvRsBd"]["attributes"]["dn"].replace('/rsbd', '')
-            bd_tdn = reln["fvRsBd"]["attributes"]["tDn"]
-            if epg_to_subnets.get(epg_dn):
-                bd_to_epg.setdefault(bd_tdn, []).append(epg_dn)
-
-        # walk through BDs and lookup EPG subnets to check scope
-        for bd in fvBD:
-            bd_dn = bd["fvBD"]["attributes"]["dn"]
-            epgs_to_check = bd_to_epg.get(bd_dn)
-            if epgs_to_check:
-                for fvSubnet in bd['fvBD']['children']:
-                    bd_subnet = fvSubnet["fvSubnet"]["attributes"]["ip"]
-                    bd_scope = fvSubnet["fvSubnet"]["attributes"]["scope"]
-                    for epg_dn in epgs_to_check:
-                        epg_scope = epg_to_subnets[epg_dn].get(bd_subnet)
-                        if bd_scope != epg_scope:
-                            data.append([bd_dn, bd_scope, epg_dn, epg_scope])
+    epg_to_subnets = vrf_model.epg_to_subnets
+    if not epg_to_subnets:
+        return Result(result=NA, msg="No EPG Subnets found. Skipping.")
+
+    bd_to_subnets = vrf_model.bd_to_subnets
+    epg_to_bd = vrf_model.epg_to_bd
+
+    # {"epg_dn": {subnet1: scope, subnet2: scope},...}
+    epg_scopes = dict(
+        (epg_dn, dict((subnet["ip"], subnet["scope"]) for subnet in subnets))
+        for epg_dn, subnets in iteritems(epg_to_subnets)
+    )
+    # Build out BD to epg lookup, if EPG has a subnet
+    # {bd_tdn: [epg1, epg2, epg3...]}
+    bd_to_epg = {}
+    for epg_dn, bd_tdn in iteritems(epg_to_bd):
+        if epg_dn in epg_scopes:
+            bd_to_epg.setdefault(bd_tdn, []).append(epg_dn)
+
+    # walk through BDs and lookup EPG subnets to check scope
+    for bd_dn, bd_subnets in iteritems(bd_to_subnets):
+        epgs_to_check = bd_to_epg.get(bd_dn)
+        if not epgs_to_check:
+            continue
+        for bd_subnet in bd_subnets:
+            bd_scope = bd_subnet["scope"]
+            for epg_dn in epgs_to_check:
+                epg_scope = epg_scopes[epg_dn].get(bd_subnet["ip"])
+                if bd_scope != epg_scope:
+                    data.append([bd_dn, bd_scope, epg_dn, epg_scope])
 
     if data:
         result = FAIL_O
@@ -5088,68 +7212,58 @@ def unsupported_fec_configuration_ex_check(sw_cversion, tversion, **kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title='L3out /32 Static Route and BD Subnet Overlap')
-def static_route_overlap_check(cversion, tversion, **kwargs):
+@check_wrapper(
+    check_title='L3out /32 Static Route and BD Subnet Overlap',
+    affected_versions={"cversion": "<5.2(6e)", "tversion": ">5.0(1a), <5.2(6e)"},
+    providers=["vrf_model"],
+)
+def static_route_overlap_check(cversion, tversion, vrf_model, **kwargs):
     result = PASS
     headers = ['L3out', '/32 Static Route', 'BD', 'BD Subnet']
     data = []
     recommended_action = 'Change /32 static route design or target a fixed version'
     doc_url = 'https://datacenter.github.io/ACI-Pre-Upgrade-Validation-Script/validations/#l3out-32-overlap-with-bd-subnet'
     iproute_regex = r'uni/tn-(?P<tenant>[^/]+)/out-(?P<l3out>[^/]+)/lnodep-(?P<nodeprofile>[^/]+)/rsnodeL3OutAtt-\[topology/pod-(?P<pod>[^/]+)/node-(?P<node>\d{3,4})\]/rt-\[(?P<addr>[^/]+)/(?P<netmask>\d{1,2})\]'
-    bd_subnet_regex = r'uni/tn-(?P<tenant>[^/]+)/BD-(?P<bd>[^/]+)/subnet-\[(?P<subnet>[^/]+/\d{2})\]'
+    bd_subnet_regex = r'[^/]+/\d{2}$'
 
     if not tversion:
         return Result(result=MANUAL, msg=TVER_MISSING)
 
-    if (cversion.older_than("5.2(6e)") and tversion.newer_than("5.0(1a)") and tversion.older_than("5.2(6e)")):
-        slash32filter = 'ipRouteP.json?query-target-filter=and(wcard(ipRouteP.dn,"/32"))'
-        staticRoutes = icurl('class', slash32filter)
-        if staticRoutes:
-            staticroute_vrf = icurl('class', 'l3extRsEctx.json')
-            staticR_to_vrf = {}
-            for staticRoute in staticRoutes:
-                staticroute_array = re.search(iproute_regex, staticRoute['ipRouteP']['attributes']['dn'])
-                l3out_dn = 'uni/tn-' + staticroute_array.group("tenant") + '/out-' + staticroute_array.group("l3out") + '/rsectx'
-
-                for l3outCtx in staticroute_vrf:
-                    l3outCtx_Vrf = {}
-                    if l3outCtx['l3extRsEctx']['attributes']['dn'] == l3out_dn:
-                        l3outCtx_Vrf['vrf'] = l3outCtx['l3extRsEctx']['attributes']['tDn']
-                        l3outCtx_Vrf['l3out'] = l3outCtx['l3extRsEctx']['attributes']['dn'].replace('/rsectx', '')
-                        staticR_to_vrf[staticroute_array.group("addr")] = l3outCtx_Vrf
-
-            bds_in_vrf = icurl('class', 'fvRsCtx.json')
-            vrf_to_bd = {}
-            for bd_ref in bds_in_vrf:
-                vrf_name = bd_ref['fvRsCtx']['attributes']['tDn']
-                bd_list = vrf_to_bd.get(vrf_name, [])
-                bd_name = bd_ref['fvRsCtx']['attributes']['dn'].replace('/rsctx', '')
-                bd_list.append(bd_name)
-                vrf_to_bd[vrf_name] = bd_list
-
-            subnets_in_bd = icurl('class', 'fvSubnet.json')
-            bd_to_subnet = {}
-            for subnet in subnets_in_bd:
-                bd_subnet_re = re.search(bd_subnet_regex, subnet['fvSubnet']['attributes']['dn'])
-                if bd_subnet_re:
-                    bd_dn = 'uni/tn-' + bd_subnet_re.group("tenant") + '/BD-' + bd_subnet_re.group("bd")
-                    subnet_list = bd_to_subnet.get(bd_dn, [])
-                    subnet_list.append(bd_subnet_re.group("subnet"))
-                    bd_to_subnet[bd_dn] = subnet_list
-
-            for static_route, info in staticR_to_vrf.items():
-                for bd in vrf_to_bd[info['vrf']]:
-                    for subnet in bd_to_subnet[bd]:
-                        if IPAddress.ip_in_subnet(static_route, subnet):
-                            data.append([info['l3out'], static_route, bd, subnet])
+    slash32filter = 'ipRouteP.json?query-target-filter=and(wcard(ipRouteP.dn,"/32"))'
+    staticRoutes = icurl('class', slash32filter)
+    if staticRoutes:
+        l3out_to_vrf = vrf_model.l3out_to_vrf
+        # The same static route on multiple nodes of the same L3Out is checked only once,
+        # and once for each L3Out that has it
+        l3out_routes = set()
+        for staticRoute in staticRoutes:
+            staticroute_array = re.search(iproute_regex, staticRoute['ipRouteP']['attributes']['dn'])
+            if not staticroute_array:
+                continue
+            l3out_dn = 'uni/tn-' + staticroute_array.group("tenant") + '/out-' + staticroute_array.group("l3out")
+            l3out_routes.add((l3out_dn, staticroute_array.group("addr")))
+
+        vrf_to_bds = vrf_model.vrf_to_bds
+        bd_to_subnets = vrf_model.bd_to_subnets
+        for l3out_dn, static_route in sorted(l3out_routes):
+            vrf_dn = l3out_to_vrf.get(l3out_dn)
+            for bd in vrf_to_bds.get(vrf_dn, []):
+                for subnet in bd_to_subnets.get(bd, []):
+                    if not re.match(bd_subnet_regex, subnet["ip"]):
+                        continue
+                    if IPAddress.ip_in_subnet(static_route, subnet["ip"]):
+                        data.append([l3out_dn, static_route, bd, subnet["ip"]])
 
-        if data:
-            result = FAIL_O
+    if data:
+        result = FAIL_O
 
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title='vzAny-to-vzAny Service Graph when crossing 5.0 release')
+@check_wrapper(
+    check_title='vzAny-to-vzAny Service Graph when crossing 5.0 release',
+    affected_versions={"cversion": "<5.0(1a)", "tversion": ">5.0(1a)"},
+)
 def vzany_vzany_service_epg_check(cversion, tversion, **kwargs):
     result = PASS
     headers = ["VRF (Tn:VRF)", "Contract (Tn:Contract)", "Service Graph (Tn:SG)"]
@@ -5160,9 +7274,6 @@ def vzany_vzany_service_epg_check(cversion, tversion, **kwargs):
     if not tversion:
         return Result(result=MANUAL, msg=TVER_MISSING)
 
-    if not (cversion.older_than("5.0(1a)") and tversion.newer_than("5.0(1a)")):
-        return Result(result=NA, msg=VER_NOT_AFFECTED)
-
     tn_regex = r"uni/tn-(?P<tn>[^/]+)"
     vrf_regex = tn_regex + r"/ctx-(?P<vrf>[^/]+)"
     brc_regex = tn_regex + r"/brc-(?P<brc>[^/]+)"
@@ -5215,8 +7326,8 @@ def vzany_vzany_service_epg_check(cversion, tversion, **kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title="Shared Services with vzAny Consumers")
-def consumer_vzany_shared_services_check(cversion, tversion, **kwargs):
+@check_wrapper(check_title="Shared Services with vzAny Consumers", affected_versions={"tversion": ">=5.3(2d)"}, providers=["vrf_model"])
+def consumer_vzany_shared_services_check(cversion, tversion, vrf_model, **kwargs):
     headers = ["Contract(Tn:Contract)", "Consumer VRF(Tn:VRF)", "Provider VRF(Tn:VRF)", "Provider DN", "Provider Type"]
     data = []
     recommended_action = (
@@ -5230,11 +7341,8 @@ def consumer_vzany_shared_services_check(cversion, tversion, **kwargs):
     )
     doc_url = "https://datacenter.github.io/ACI-Pre-Upgrade-Validation-Script/validations/#shared-service-with-vzany-consumer"
 
-    # Ignore if target version is missing or older than 5.3(2d)
     if not tversion:
         return Result(result=MANUAL, msg=TVER_MISSING)
-    if tversion.older_than("5.3(2d)"):
-        return Result(result=NA, msg=VER_NOT_AFFECTED)
 
     # Check if we cross any version lines where additional rule expansion may happen
     should_check_epg_expansion = False
@@ -5343,25 +7451,16 @@ def consumer_vzany_shared_services_check(cversion, tversion, **kwargs):
     def is_contract_pbr_enabled(contract_dn):
         return contract_dn in _pbr_enabled_contracts
 
-    # Gather all VRF VNIDs and look for vzAny consumers
-    all_vrfs = icurl("class", "fvCtx.json?rsp-subtree=full&rsp-subtree-class=vzRsAnyToCons") or []
-    vnid_to_vrf_dn = {}
+    # Look for vzAny consumers and their VRF VNIDs
+    vnid_to_vrf_dn = vrf_model.vnid_to_vrf
+    vrf_dn_to_vnid = vrf_model.vrf_to_vnid
     contract_to_vzany_cons_vnids = defaultdict(list)
-    for vrf_entry in all_vrfs:
-        fvctx = vrf_entry.get("fvCtx", {})
-        attr = fvctx.get("attributes", {})
-        vrf_dn = attr.get("dn")
-        vrf_vnid = attr.get("scope")
-        if vrf_dn and vrf_vnid:
-            vnid_to_vrf_dn[vrf_vnid] = vrf_dn
-        for child in fvctx.get("children", []) or []:
-            vzany = child.get("vzAny")
-            if not vzany:
-                continue
-            for vzany_child in vzany.get("children", []) or []:
-                if vzany_child.get("vzRsAnyToCons"):
-                    contract_dn = vzany_child["vzRsAnyToCons"]["attributes"]["tDn"]
-                    contract_to_vzany_cons_vnids[contract_dn].append(vrf_vnid)
+    for vzany_rs in icurl("class", "vzRsAnyToCons.json") or []:
+        attr = vzany_rs["vzRsAnyToCons"]["attributes"]
+        # vzRsAnyToCons.dn is always VRF DN + "/any/rsanyToCons-<contract>"
+        vrf_vnid = vrf_dn_to_vnid.get(attr["dn"].split("/any/")[0])
+        if vrf_vnid:
+            contract_to_vzany_cons_vnids[attr["tDn"]].append(vrf_vnid)
 
     # Return if there are no vzAny consumers
     if not contract_to_vzany_cons_vnids:
@@ -5815,17 +7914,14 @@ def pbr_high_scale_check(tversion, **kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title='HTTPS Request Throttle Rate')
+# Applicable only when crossing 6.1(2) as upgrade instead of downgrade.
+@check_wrapper(check_title='HTTPS Request Throttle Rate', affected_versions={"cversion": "<=6.1(2a)"})
 def https_throttle_rate_check(cversion, tversion, **kwargs):
     result = PASS
     headers = ["Mgmt Access Policy", "HTTPS Throttle Rate"]
     data = []
     recommended_action = "Reduce the throttle rate to 40 (req/sec), 2400 (req/min) or lower."
     doc_url = "https://datacenter.github.io/ACI-Pre-Upgrade-Validation-Script/validations/#https-request-throttle-rate"
-
-    # Applicable only when crossing 6.1(2) as upgrade instead of downgrade.
-    if cversion.newer_than("6.1(2a)"):
-        return Result(result=NA, msg=VER_NOT_AFFECTED)
     if not tversion:
         return Result(result=MANUAL, msg=TVER_MISSING)
 
@@ -5975,7 +8071,10 @@ def aes_encryption_check(tversion, **kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title='Service Graph BD Forceful Routing')
+@check_wrapper(
+    check_title='Service Graph BD Forceful Routing',
+    affected_versions={"cversion": "<6.0(2a)", "tversion": ">6.0(2a)"},
+)
 def service_bd_forceful_routing_check(cversion, tversion, **kwargs):
     result = PASS
     headers = ["Bridge Domain (Tenant:BD)", "Service Graph Device (Tenant:Device)"]
@@ -5991,9 +8090,6 @@ def service_bd_forceful_routing_check(cversion, tversion, **kwargs):
     if not tversion:
         return Result(result=MANUAL, msg=TVER_MISSING)
 
-    if not (cversion.older_than("6.0(2a)") and tversion.newer_than("6.0(2a)")):
-        return Result(result=NA, msg=VER_NOT_AFFECTED)
-
     dn_regex = r"uni/tn-(?P<bd_tn>[^/]+)/BD-(?P<bd>[^/]+)/"
     dn_regex += r"rtvnsEPpInfoToBD-\[uni/tn-(?P<sg_tn>[^/])+/LDevInst-\[uni/tn-(?P<ldev_tn>[^/]+)/lDevVip-(?P<ldev>[^\]]+)\].*\]"
 
@@ -6040,7 +8136,17 @@ def observer_db_size_check(username, password, fabric_nodes, **kwargs):
         apic1_dn = apic1["fabricNode"]["attributes"]["dn"]
         apics = icurl("class", "{}/infraWiNode.json".format(apic1_dn))
 
-    has_error = False
+    observer_gig_regex = r"(?P<size>\d{1,3}(?:\.\d)?G)\s(?P<file>observer_\d{1,3}.db)"
+
+    def _list_dbstats(c):
+        """Returns the tail of the output and [(size, file name)] of DB files in GB"""
+        cmd = r"ls -lh /data2/dbstats | awk '{print $5, $9}'"
+        # The listing can be long. Only GB files are kept while reading it.
+        size_matches = []
+        c.cmd(cmd, line_regex=observer_gig_regex, on_line=size_matches.append)
+        return c.output, [(m.group("size"), m.group("file")) for m in size_matches]
+
+    apic_info = []
     for apic in apics:
         if apic.get("fabricNode"):
             apic_id = apic["fabricNode"]["attributes"]["id"]
@@ -6050,35 +8156,22 @@ def observer_db_size_check(username, password, fabric_nodes, **kwargs):
             apic_id = apic["infraWiNode"]["attributes"]["id"]
             apic_name = apic["infraWiNode"]["attributes"]["nodeName"]
             apic_addr = apic["infraWiNode"]["attributes"]["addr"]
-        try:
-            c = Connection(apic_addr)
-            c.username = username
-            c.password = password
-            c.log = LOG_FILE
-            c.connect()
-        except Exception as e:
-            data.append([apic_id, apic_name, "-", str(e)])
+        apic_info.append((apic_id, apic_name, apic_addr))
+
+    has_error = False
+    outputs = ssh_fanout([addr for _, _, addr in apic_info], _list_dbstats, username, password)
+    for (apic_id, apic_name, _), (output, error) in zip(apic_info, outputs):
+        if error is not None:
+            data.append([apic_id, apic_name, "-", str(error)])
             has_error = True
             continue
-        try:
-            cmd = r"ls -lh /data2/dbstats | awk '{print $5, $9}'"
-            c.cmd(cmd)
-            if "No such file or directory" in c.output:
-                data.append([apic_id, apic_name, '/data2/dbstats/ not found', "Check user permissions or retry as 'apic#fallback\\\\admin'"])
-                has_error = True
-                continue
-            dbstats = c.output.split("\n")
-            for line in dbstats:
-                observer_gig_regex = r"(?P<size>\d{1,3}(?:\.\d)?G)\s(?P<file>observer_\d{1,3}.db)"
-                size_match = re.match(observer_gig_regex, line)
-                if size_match:
-                    file_size = size_match.group("size")
-                    file_name = "/data2/dbstats/" + size_match.group("file")
-                    data.append([apic_id, apic_name, file_name, file_size])
-        except Exception as e:
-            data.append([apic_id, apic_name, "-", str(e)])
+        output, large_files = output
+        if "No such file or directory" in output:
+            data.append([apic_id, apic_name, '/data2/dbstats/ not found', "Check user permissions or retry as 'apic#fallback\\\\admin'"])
             has_error = True
             continue
+        for file_size, file_name in large_files:
+            data.append([apic_id, apic_name, "/data2/dbstats/" + file_name, file_size])
     if has_error:
         result = ERROR
     elif data:
@@ -6111,7 +8204,7 @@ def ave_eol_check(tversion, **kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title='ISIS DTEPs Byte Size')
+@check_wrapper(check_title='ISIS DTEPs Byte Size', affected_versions={"tversion": ">6.1(1a), <6.1(3g)"})
 def isis_database_byte_check(tversion, **kwargs):
     result = PASS
     headers = ["ISIS DTEPs Byte Size", "ISIS DTEPs"]
@@ -6122,34 +8215,31 @@ def isis_database_byte_check(tversion, **kwargs):
     if not tversion:
         return Result(result=MANUAL, msg=TVER_MISSING)
 
-    if tversion.newer_than("6.1(1a)") and tversion.older_than("6.1(3g)"):
-        isisDTEp_api = 'isisDTEp.json'
-        isisDTEp_api += '?query-target-filter=eq(isisDTEp.role,"spine")'
+    isisDTEp_api = 'isisDTEp.json'
+    isisDTEp_api += '?query-target-filter=eq(isisDTEp.role,"spine")'
 
-        isisDTEps = icurl('class', isisDTEp_api)
+    isisDTEps = icurl('class', isisDTEp_api)
 
-        physical_ids = set()
-        proxy_acast_ids = set()
+    physical_ids = set()
+    proxy_acast_ids = set()
 
-        for entry in isisDTEps:
-            dtep_type = entry['isisDTEp']['attributes']['type']
-            dtep_id = entry['isisDTEp']['attributes']['id']
+    for entry in isisDTEps:
+        dtep_type = entry['isisDTEp']['attributes']['type']
+        dtep_id = entry['isisDTEp']['attributes']['id']
 
-            if dtep_type == "physical":
-                physical_ids.add(dtep_id)
-            elif "physical,proxy-acast" in dtep_type:
-                proxy_acast_ids.add(dtep_id)
+        if dtep_type == "physical":
+            physical_ids.add(dtep_id)
+        elif "physical,proxy-acast" in dtep_type:
+            proxy_acast_ids.add(dtep_id)
 
-        for physical_id in physical_ids:
-            combined_dteps = ",".join([physical_id] + list(proxy_acast_ids))
-            total_bytes = len(combined_dteps)
+    for physical_id in physical_ids:
+        combined_dteps = ",".join([physical_id] + list(proxy_acast_ids))
+        total_bytes = len(combined_dteps)
 
-            if total_bytes > 57:
-                result = FAIL_O
-                data.append([total_bytes, combined_dteps])
-                break
-    else:
-        return Result(result=NA, msg=VER_NOT_AFFECTED)
+        if total_bytes > 57:
+            result = FAIL_O
+            data.append([total_bytes, combined_dteps])
+            break
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
@@ -6342,7 +8432,7 @@ def configpush_shard_check(tversion, **kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title='APIC VMM inventory sync fault (F0132)')
+@check_wrapper(check_title='APIC VMM inventory sync fault (F0132)', classes=["faultInst"])
 def apic_vmm_inventory_sync_faults_check(**kwargs):
     result = PASS
     headers = ['Fault', 'VMM Domain', 'Controller']
@@ -6397,7 +8487,13 @@ def apic_downgrade_compat_warning_check(cversion, tversion, **kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title='Auto Firmware Update on Switch Discovery')
+@check_wrapper(
+    check_title='Auto Firmware Update on Switch Discovery',
+    affected_versions={
+        "cversion": ["<=5.2(8a)", ">=6.0(0a), <=6.0(3a)"],
+        "tversion": ">=6.0(3a)",
+    },
+)
 def auto_firmware_update_on_switch_check(cversion, tversion, **kwargs):
     result = PASS
     headers = ["Auto Firmware Update Status", "Default Firmware Version", "Upgrade Target Version"]
@@ -6408,11 +8504,6 @@ def auto_firmware_update_on_switch_check(cversion, tversion, **kwargs):
     if not tversion or not cversion:
         return Result(result=MANUAL, msg=TVER_MISSING)
 
-    if tversion.older_than("6.0(3a)") or (
-        cversion.newer_than("6.0(3a)") or (cversion.major1 == "5" and cversion.newer_than("5.2(8a)"))
-    ):
-        return Result(result=NA, msg=VER_NOT_AFFECTED)
-
     fwrepop = icurl("mo", "uni/fabric/fwrepop.json")
     if fwrepop and fwrepop[0]["firmwareRepoP"]["attributes"]["enforceBootscriptVersionValidation"] == "yes":
         data.append(["Enabled", fwrepop[0]["firmwareRepoP"]["attributes"]["defaultSwitchVersion"], str(tversion)])
@@ -6478,7 +8569,10 @@ def rogue_ep_coop_exception_mac_check(cversion, tversion, **kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title='N9K-C9408 with more than 5 N9K-X9400-16W LEMs')
+@check_wrapper(
+    check_title='N9K-C9408 with more than 5 N9K-X9400-16W LEMs',
+    affected_versions={"tversion": [">=6.1(2f), <=6.1(5e)", "==6.2(1g)"]},
+)
 def n9k_c9408_model_lem_count_check(tversion, fabric_nodes, **kwargs):
     result = PASS
     headers = ["Node ID", "Switch Model", "LEM Model", "LEM Count"]
@@ -6491,9 +8585,6 @@ def n9k_c9408_model_lem_count_check(tversion, fabric_nodes, **kwargs):
     if not tversion:
         return Result(result=MANUAL, msg=TVER_MISSING)
 
-    if tversion.older_than("6.1(2f)") or (tversion.newer_than("6.1(5e)") and not tversion.same_as("6.2(1g)")):
-        return Result(result=NA, msg=VER_NOT_AFFECTED)
-
     affected_nodes = {}
     for node in fabric_nodes:
         node_id = node['fabricNode']['attributes']['id']
@@ -6614,7 +8705,7 @@ def rtc_battery_voltage_low_check(**kwargs):
 
 
 # Connection Based Check
-@check_wrapper(check_title="Multi-Pod Modular Spine Bootscript File")
+@check_wrapper(check_title="Multi-Pod Modular Spine Bootscript File", affected_versions={"tversion": "==6.1(4h)"})
 def multipod_modular_spine_bootscript_check(tversion, fabric_nodes, username, password, **kwargs):
     result = PASS
     headers = ["Pod ID", "Node ID", "Node Name", "Model", "Bootscript Present"]
@@ -6628,9 +8719,6 @@ def multipod_modular_spine_bootscript_check(tversion, fabric_nodes, username, pa
     if not tversion:
         return Result(result=MANUAL, msg=TVER_MISSING)
 
-    if not tversion.same_as("6.1(4h)"):
-        return Result(result=NA, msg=VER_NOT_AFFECTED)
-
     pod_count_resp = icurl('class', 'fabricSetupP.json?rsp-subtree-include=count')
     if (int(pod_count_resp[0]['moCount']['attributes']['count'])) < 2:
         return Result(result=PASS, msg="Not MultiPod Fabric.")
@@ -6645,30 +8733,30 @@ def multipod_modular_spine_bootscript_check(tversion, fabric_nodes, username, pa
     if not modular_spines:
         return Result(result=PASS, msg="No modular spine found in fabric.")
 
+    def _list_bootscript(c):
+        c.cmd("ls -l /bootflash/ | grep boots")
+        return c.output
+
     has_error = False
-    for node in modular_spines:
+    outputs = ssh_fanout(
+        [node["fabricNode"]["attributes"].get("address") for node in modular_spines],
+        _list_bootscript, username, password,
+    )
+    for node, (output, error) in zip(modular_spines, outputs):
         attr = node["fabricNode"]["attributes"]
         node_id = attr.get("id")
         node_name = attr.get("name")
         dn = re.search(node_regex, attr.get("dn", ""))
         pod_id = dn.group("pod") if dn else "Unknown"
-        tep_ip = attr.get("address")
         model = attr.get("model")
 
-        c = Connection(tep_ip)
-        c.username = username
-        c.password = password
-        c.log = LOG_FILE
-        try:
-            c.connect()
-            c.cmd("ls -l /bootflash/ | grep boots")
-            if "bootscript" not in c.output:
-                data.append([pod_id, node_id, node_name, model, "No"])
-        except Exception as e:
-            ssh_error = "SSH ERROR: {}".format(e)
+        if error is not None:
+            ssh_error = "SSH ERROR: {}".format(error)
             data.append([pod_id, node_id, node_name, model, ssh_error])
             has_error = True
             continue
+        if "bootscript" not in output:
+            data.append([pod_id, node_id, node_name, model, "No"])
 
     if has_error:
         result = ERROR
@@ -6678,7 +8766,10 @@ def multipod_modular_spine_bootscript_check(tversion, fabric_nodes, username, pa
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
   
-@check_wrapper(check_title="Inband Management Policy Misconfiguration")
+@check_wrapper(
+    check_title="Inband Management Policy Misconfiguration",
+    affected_versions={"cversion": "<5.2(8d)", "tversion": ">=6.0(4c)"},
+)
 def inband_management_policy_misconfig_check(cversion, tversion, **kwargs):
     result = PASS
     headers = ["Node_ID", "Address", "Gateway"]
@@ -6689,17 +8780,14 @@ def inband_management_policy_misconfig_check(cversion, tversion, **kwargs):
     if not tversion or not cversion:
         return Result(result=MANUAL, msg=TVER_MISSING)
     
-    if (cversion.older_than("5.2(8d)")) and (tversion.newer_than("6.0(4c)") or tversion.same_as("6.0(4c)")):
-        mgmtRsInBStNodes = icurl('class', 'mgmtRsInBStNode.json?query-target-filter=and(or(eq(mgmtRsInBStNode.addr,"0.0.0.0"),eq(mgmtRsInBStNode.gw,"0.0.0.0")),or(eq(mgmtRsInBStNode.v6Addr,"::"),eq(mgmtRsInBStNode.v6Gw,"::")))')
-        for mgmtRsInBStNode in mgmtRsInBStNodes:
-            attrs = mgmtRsInBStNode["mgmtRsInBStNode"]["attributes"]
-            addr = attrs['addr']
-            gw = attrs['gw']
-            node_match = re.search(node_regex, attrs['dn'])
-            node_id = node_match.group("node")
-            data.append([node_id, addr, gw])
-    else:
-        return Result(result=NA, msg=VER_NOT_AFFECTED)
+    mgmtRsInBStNodes = icurl('class', 'mgmtRsInBStNode.json?query-target-filter=and(or(eq(mgmtRsInBStNode.addr,"0.0.0.0"),eq(mgmtRsInBStNode.gw,"0.0.0.0")),or(eq(mgmtRsInBStNode.v6Addr,"::"),eq(mgmtRsInBStNode.v6Gw,"::")))')
+    for mgmtRsInBStNode in mgmtRsInBStNodes:
+        attrs = mgmtRsInBStNode["mgmtRsInBStNode"]["attributes"]
+        addr = attrs['addr']
+        gw = attrs['gw']
+        node_match = re.search(node_regex, attrs['dn'])
+        node_id = node_match.group("node")
+        data.append([node_id, addr, gw])
     if data:
         result = FAIL_O
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
@@ -6773,7 +8861,10 @@ def bgpProto_timer_policy_already_existing_check(tversion, cversion, **kwargs):
     return Result(result=result, headers=headers, data=data, unformatted_headers=unformatted_headers, unformatted_data=unformatted_data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title="WRED with Affected FM Models")
+@check_wrapper(
+    check_title="WRED with Affected FM Models",
+    affected_versions={"tversion": [">=6.1(0a), <=6.1(5e)", ">=6.2(0a), <6.2(2e)"]},
+)
 def wred_affected_model_check(tversion, fabric_nodes, **kwargs):
     result = PASS
     headers = ["Node ID", "Node Name", "Model"]
@@ -6784,13 +8875,6 @@ def wred_affected_model_check(tversion, fabric_nodes, **kwargs):
     if not tversion:
         return Result(result=MANUAL, msg=TVER_MISSING)
 
-    version_affected = (
-        (tversion.major1 == "6" and tversion.major2 == "1" and (tversion.older_than("6.1(5e)") or tversion.same_as("6.1(5e)")))
-        or (tversion.major1 == "6" and tversion.major2 == "2" and tversion.older_than("6.2(2e)"))
-    )
-    if not version_affected:
-        return Result(result=NA, msg=VER_NOT_AFFECTED)
-
     affected_models = {"N9K-C9504-FM-E", "N9K-C9508-FM-E", "N9K-C9516-FM-E"}
 
     node_name_map = {
@@ -6915,7 +8999,10 @@ def stale_dbgacEpgSummaryTask_check(tversion, **kwargs):
     return Result(result=result, headers=headers, data=data, recommended_action=recommended_action, doc_url=doc_url)
 
 
-@check_wrapper(check_title="InfraVLAN Overlap in Access Policy VLAN Pools")
+@check_wrapper(
+    check_title="InfraVLAN Overlap in Access Policy VLAN Pools",
+    affected_versions={"tversion": [">=6.1(3f), <=6.1(5e)", "==6.2(1g)"]},
+)
 def infravlan_overlap_access_policy_check(tversion, **kwargs):
     result = FAIL_UF
     msg = ""
@@ -6931,11 +9018,6 @@ def infravlan_overlap_access_policy_check(tversion, **kwargs):
     if not tversion:
         return Result(result=MANUAL, msg=TVER_MISSING)
 
-    if not (tversion.same_as("6.2(1g)") or (
-        not tversion.older_than("6.1(3f)") and not tversion.newer_than("6.1(5e)")
-    )):
-        return Result(result=NA, msg=VER_NOT_AFFECTED)
-
     dn_regex1 = r'uni/infra/vlanns-\[.+\]-(static|dynamic)/from-\[vlan-\d+\]-to-\[vlan-\d+\]'
 
     dn_regex2 = r'uni/vmmp-[^/]+/dom-[^/]+/.+/from-\[vlan-\d+\]-to-\[vlan-\d+\]'
@@ -6993,6 +9075,25 @@ def infravlan_overlap_access_policy_check(tversion, **kwargs):
 # ---- Script Execution ----
 
 
+def check_timeout_type(value):
+    """ `--check-timeout` in the form of `SEC` (all checks) or `CHECK=SEC` (one check) """
+    check_id, _, sec = value.rpartition("=")
+    try:
+        sec = int(sec)
+    except ValueError:
+        sec = 0
+    if sec <= 0:
+        raise ArgumentTypeError("invalid value '{}'. Use SEC or CHECK=SEC with SEC > 0".format(value))
+    return (check_id or None, sec)
+
+
+def rerun_from_type(value):
+    """ `--rerun-from` with an existing result bundle or summary.json """
+    if not os.path.isfile(value):
+        raise ArgumentTypeError("'{}' is not a result bundle or summary.json of a previous run".format(value))
+    return value
+
+
 def parse_args(args):
     parser = ArgumentParser(description="ACI Pre-Upgrade Validation Script - %s" % SCRIPT_VERSION)
     parser.add_argument("-u", "--username", action="store", type=str, help="Username used for SSH. If not provied it will prompt for")
@@ -7006,28 +9107,47 @@ def parse_args(args):
     parser.add_argument("--total-checks", action="store_true", help="Only show the total number of checks, then end.")
     parser.add_argument("--timeout", action="store", nargs="?", type=int, const=-1, default=DEFAULT_TIMEOUT, help="Show default script timeout (sec) or overwrite it when a number is provided (e.g. --timeout 1200).")
     parser.add_argument("--max-threads", action="store", type=int, default=None, help="Maximum number of check threads to run concurrently. Defaults to unlimited.")
+    parser.add_argument("--workers", action="store", nargs="?", type=int, const=0, default=None, help="Run checks with a fixed pool of worker threads instead of one thread per check. The number of workers is chosen from CPUs and available memory unless a number is provided (e.g. --workers 8).")
+    parser.add_argument("--check-timeout", action="append", type=check_timeout_type, default=[], metavar="[CHECK=]SEC", help="Time budget (sec) of each check, or of a specific check with CHECK=SEC. Overrides the budget of the check itself. Can be repeated (e.g. --check-timeout 300 --check-timeout apic_database_size_check=600).")
+    parser.add_argument("--ssh-control-master", action="store_true", help="Use one OpenSSH ControlMaster per host and run each SSH command as a non-interactive exec over it.")
+    parser.add_argument("--processes", action="store", nargs="?", type=int, const=0, default=None, help="Run CPU heavy analysis in checks with worker processes instead of check threads. The number of processes is the number of CPUs minus one, up to 4, unless a number is provided (e.g. --processes 2).")
+    parser.add_argument("--log-responses", action="store_true", help="Dump full API and command responses to a separate rotating log. Responses in the debug log are always capped. Enabled with --debug-function as well.")
+    parser.add_argument("--json-results", action="store", choices=["sync", "live", "end"], default="live", help="When to write the JSON result file of each check from the result journal. `sync` writes at every state change, `live` at every progress update and `end` only once checks are done. Defaults to live.")
+    parser.add_argument("--columnar-rows", action="store", type=int, default=None, metavar="ROWS", help="For the PUV integration supporting it. Write failure details with more rows than this as compact header and row arrays (failureDetails version 2). Defaults to the dict per row format always.")
+    parser.add_argument("--bundle-compression", action="store", type=int, choices=range(0, 10), default=6, metavar="LEVEL", help="gzip compression level of the result bundle, 0-9 (0 = uncompressed tar, the fastest). Defaults to 6.")
+    parser.add_argument("--rerun-from", action="store", type=rerun_from_type, default=None, metavar="BUNDLE_OR_SUMMARY", help="Re-run checks that did not pass in a previous run, given its result bundle or summary.json, or whose input changed since then. Only passed results of checks with known input classes are carried forward.")
+    parser.add_argument("--resume", action="store_true", help="Resume an interrupted run from its checkpoint. Finished checks are not run again. Files of the interrupted run are kept.")
     parsed_args = parser.parse_args(args)
     return parsed_args
 
 
-def init_system():
+def init_system(resume=False):
     """
     Initialize the script environment, create necessary directories and set up log.
     Not required for some options such as `--version` or `--total-checks`.
+    With `resume`, files of the interrupted run are kept.
     """
-    if os.path.isdir(DIR):
+    # Not to keep writing in a removed result file
+    output_sink.close()
+    if os.path.isdir(DIR) and not resume:
         log.info("Cleaning up previous run files in %s", DIR)
         shutil.rmtree(DIR)
     log.info("Creating directories %s and %s", DIR, JSON_DIR)
-    os.mkdir(DIR)
-    os.mkdir(JSON_DIR)
+    for dirpath in (DIR, JSON_DIR):
+        if not os.path.isdir(dirpath):
+            os.mkdir(dirpath)
     fmt = '[%(asctime)s.%(msecs)03d{} %(levelname)-8s %(funcName)s:%(lineno)-4d(%(threadName)s)] %(message)s'.format(tz)
     logging.basicConfig(level=logging.DEBUG, filename=LOG_FILE, format=fmt, datefmt='%Y-%m-%d %H:%M:%S')
 
 
 def wrapup_system(no_cleanup):
-    subprocess.check_output(['tar', '-czf', BUNDLE_NAME, DIR])
-    bundle_loc = '/'.join([os.getcwd(), BUNDLE_NAME])
+    ssh_pool.close_all()
+    disable_response_log()
+    output_sink.flush()
+    if not result_bundle.is_open:
+        result_bundle.open(BUNDLE_NAME)
+    result_bundle.close(DIR)
+    bundle_loc = '/'.join([os.getcwd(), result_bundle.filepath])
     prints("""
     Pre-Upgrade Check Complete.
     Next Steps: Address all checks flagged as FAIL, ERROR or MANUAL CHECK REQUIRED
@@ -7038,6 +9158,7 @@ def wrapup_system(no_cleanup):
       Result Bundle: {bundle}
 """.format(bundle=bundle_loc))
     prints('==== Script Version %s FIN ====' % (SCRIPT_VERSION))
+    output_sink.close()
 
     # puv integration needs to keep reading files from `JSON_DIR` under `DIR`.
     if not no_cleanup and os.path.isdir(DIR):
@@ -7045,6 +9166,30 @@ def wrapup_system(no_cleanup):
         shutil.rmtree(DIR)
 
 
+class SharedDataProvider(object):
+    """Data shared by multiple checks, built once by `builder` in its own thread.
+
+    Checks declare the names of providers they need with
+    `check_wrapper(providers=[...])` and receive `data` as a keyword argument
+    of the same name. When the builder failed, `error` is set instead.
+    """
+    def __init__(self, name, builder):
+        self.__name__ = name
+        self.builder = builder
+        self.data = None
+        self.error = None
+        self.done = False
+
+    def __call__(self):
+        log.info("({}) Preparing shared data.".format(self.__name__))
+        try:
+            self.data = self.builder()
+        except Exception as e:
+            log.error("({}) Failed to prepare shared data.".format(self.__name__), exc_info=True)
+            self.error = e
+        self.done = True
+
+
 class CheckManager:
     """Central managing point of all checks.
     Highlevel flows:
@@ -7055,6 +9200,8 @@ class CheckManager:
             2. write empty `AciResult` of each check into a JSON result file.
             which is automatically done via decorator `check_wrapper`.
         2. Run checks in thread
+            Shared data providers required by checks start first. Each check
+            starts when the providers it declared are ready.
             Monitor the progress with timeout
         3. Finalize check results
             When checks completed within the time limit (`self.monitor_timeout`),
@@ -7189,17 +9336,51 @@ class CheckManager:
         apic_ca_cert_validation,
     ]
 
-    def __init__(self, api_only=False, debug_function="", timeout=600, monitor_interval=0.5, max_threads=None):
+    # {name: builder} of shared data that checks can declare via `check_wrapper(providers=[...])`
+    shared_data_builders = {
+        "access_policy": get_access_policy,
+        "vrf_model": VrfModel,
+    }
+
+    def __init__(self, api_only=False, debug_function="", timeout=600, max_threads=None, workers=None, stats_file=None, check_timeouts=None, processes=None, json_results="sync", result_journal=None, columnar_rows=None, bundle=None, fingerprint_file=None, previous_run=None, checkpoint=None):
         self.api_only = api_only
         self.debug_function = debug_function
-        self.monitor_interval = monitor_interval  # sec
         self.monitor_timeout = timeout  # sec
         self.max_threads = max_threads
+        # None: one thread per check, 0: worker pool with the default size
+        if workers == 0:
+            workers = max_threads if max_threads and max_threads > 0 else get_default_worker_count()
+        self.workers = workers
+        # Check stats from previous runs. Saved only when `stats_file` is given.
+        self.stats = CheckStats(stats_file)
+        # Time budget overrides {check_id: sec}. `None` as check_id for all checks.
+        self.check_timeouts = dict(check_timeouts or {})
+        # Worker processes for CPU heavy analysis. None or 0: run in check threads
+        self.processes = processes
+        # sync: JSON result files at each state change,
+        # live: JSON result files from `result_journal` at each progress update,
+        # end: JSON result files from `result_journal` only at the end
+        self.json_results = json_results
+        # Fingerprints of classes declared by checks are saved here for a later `--rerun-from`
+        self.fingerprint_file = fingerprint_file
+        # `PreviousRun` to carry forward results from
+        self.previous_run = previous_run
+        self.reused_results = OrderedDict()  # {check_id: Result}
+        self.fingerprints = None  # {class: fingerprint} when taken for `previous_run`
+        # `Checkpoint` to save finished checks to, and to resume from when loaded
+        self.checkpoint = checkpoint
+        self.resumed_shared_data = {}  # {name: data} from the checkpoint
+        self.checkpoint_threads = []  # threads saving shared data in the checkpoint
         self.timeout_event = None
 
         self.check_funcs = self.get_check_funcs()
 
-        self.rm = ResultManager()
+        self.rm = ResultManager(
+            json_files="sync" if json_results == "sync" else "deferred",
+            journal_file=result_journal,
+            columnar_rows=columnar_rows,
+            bundle=bundle,
+        )
 
     @property
     def total_checks(self):
@@ -7243,36 +9424,269 @@ class CheckManager:
             raise TypeError("The result of {} is not a `Result` object".format(check_id))
             return None
         self.rm.update_result(check_id, result_obj)
+        if self.checkpoint is not None:
+            self.checkpoint.add_result(check_id, result_obj)
 
     def finalize_check_on_thread_failure(self, check_id):
         """Update the result of a check that couldn't start as ERROR"""
         r = Result(result=ERROR, msg="Skipped due to a failure in starting a thread for this check.")
         self.rm.update_result(check_id, r)
 
+    def finalize_check_on_version_not_affected(self, check_id):
+        """Update the result of a check that is not applicable to the current/target versions as N/A"""
+        r = Result(result=NA, msg=VER_NOT_AFFECTED)
+        self.rm.update_result(check_id, r)
+
+    def get_affected_check_funcs(self, common_data):
+        """Finalize checks whose `affected_versions` do not match the versions as N/A.
+
+        Returns:
+            list: Check functions that need to run.
+        """
+        check_funcs = []
+        for check_func in self.check_funcs:
+            if check_func.__name__ in self.reused_results:
+                continue
+            version_gate = getattr(check_func, "affected_versions", None)
+            if version_gate and version_gate.is_affected(common_data) is False:
+                log.info("({}) Version not affected. Skipping.".format(check_func.__name__))
+                self.finalize_check_on_version_not_affected(check_func.__name__)
+                continue
+            check_funcs.append(check_func)
+        return check_funcs
+
+    def finalize_check_on_provider_failure(self, check_id, provider):
+        """Update the result of a check whose shared data couldn't be prepared as ERROR"""
+        msg = "Skipped due to a failure in preparing shared data `{}`".format(provider.__name__)
+        if provider.error is not None:
+            msg += ": {}".format(provider.error)
+        self.finalize_check(check_id, Result(result=ERROR, msg=msg))
+
+    def get_providers(self, check_funcs):
+        """Returns SharedDataProvider per name required by `check_funcs`"""
+        providers = OrderedDict()
+        for check_func in check_funcs:
+            for name in getattr(check_func, "providers", ()):
+                if name in providers:
+                    continue
+                if name not in self.shared_data_builders:
+                    raise ValueError("Unknown shared data provider `{}` in {}".format(name, check_func.__name__))
+                builder = self.shared_data_builders[name]
+                if name in self.resumed_shared_data:
+                    log.info("({}) Using shared data from the checkpoint.".format(name))
+                    builder = functools.partial(lambda data: data, self.resumed_shared_data[name])
+                elif self.checkpoint is not None:
+                    builder = self._checkpointed_builder(name, builder)
+                providers[name] = SharedDataProvider(name, builder)
+        return providers
+
+    def _checkpointed_builder(self, name, builder):
+        """Save the data of `builder` in the checkpoint in the background so that
+        the checks waiting for it do not wait for the disk I/O.
+        """
+        def _builder():
+            data = builder()
+            thread = CustomThread(
+                target=self.checkpoint.save, kwargs={"shared_data": {name: data}}, name="checkpoint-" + name
+            )
+            thread.daemon = True
+            thread.start()
+            self.checkpoint_threads.append(thread)
+            return data
+        return _builder
+
+    def with_shared_data(self, check_func, providers):
+        """Wrap a check to pass the data of its providers, or to finalize it as ERROR
+        when any of them failed.
+        """
+        def _check_func(**kwargs):
+            for name in check_func.providers:
+                provider = providers[name]
+                if not provider.done or provider.error is not None:
+                    log.error("({}) Shared data `{}` is not available.".format(check_func.__name__, name))
+                    self.finalize_check_on_provider_failure(check_func.__name__, provider)
+                    return None
+                kwargs[name] = provider.data
+            return check_func(**kwargs)
+        _check_func.__name__ = check_func.__name__
+        _check_func.providers = check_func.providers
+        return _check_func
+
+    def get_check_timeouts(self, check_funcs):
+        """Returns the time budget of each check. Overrides first, then `check_wrapper(timeout=...)`"""
+        default = self.check_timeouts.get(None)
+        timeouts = {}
+        for check_func in check_funcs:
+            timeout = self.check_timeouts.get(check_func.__name__, default) or getattr(check_func, "timeout", None)
+            if timeout:
+                timeouts[check_func.__name__] = timeout
+        return timeouts
+
+    def get_memory_estimates(self, check_funcs):
+        """Returns the memory declared with `check_wrapper(memory=...)` for each check"""
+        return dict(
+            (check_func.__name__, check_func.memory)
+            for check_func in check_funcs
+            if getattr(check_func, "memory", None)
+        )
+
     def finalize_check_on_thread_timeout(self, check_id):
         """Update the result of a check that couldn't finish in time as ERROR"""
         msg = "Timeout. Unable to finish in time ({} sec).".format(self.monitor_timeout)
         r = Result(result=ERROR, msg=msg)
         self.rm.update_result(check_id, r)
 
+    def get_declared_classes(self):
+        """Returns classes declared by checks with `check_wrapper(classes=...)`"""
+        return sorted(set(chain.from_iterable(
+            getattr(check_func, "classes", None) or () for check_func in self.check_funcs
+        )))
+
+    def select_reused_results(self, common_data):
+        """Select results of the previous run to carry forward instead of running the checks.
+        Fingerprints are taken here before any check starts only with a previous run.
+
+        Returns:
+            list: IDs of the reused checks.
+        """
+        if not self.previous_run:
+            return []
+        if not self.previous_run.is_same_environment(common_data):
+            log.info("Versions differ from the previous run. Running all checks.")
+            return []
+        self.fingerprints = get_class_fingerprints(self.get_declared_classes())
+        for check_func in self.check_funcs:
+            result_obj = self.previous_run.get_reusable_result(check_func, self.fingerprints)
+            if result_obj is not None:
+                log.info("({}) Reusing the result of the previous run.".format(check_func.__name__))
+                self.reused_results[check_func.__name__] = result_obj
+        return list(self.reused_results)
+
+    def start_fingerprints(self):
+        """Save fingerprints to `fingerprint_file` for a later `--rerun-from`.
+
+        Fingerprints already taken for `previous_run` are saved as is. Otherwise,
+        they are taken in a background thread alongside the checks so that no
+        check waits for them.
+
+        Returns:
+            CustomThread or None: The thread to join before the results are bundled.
+        """
+        if not self.fingerprint_file:
+            return None
+        if self.fingerprints is not None:
+            write_jsonfile(self.fingerprint_file, self.fingerprints)
+            return None
+        classes = self.get_declared_classes()
+
+        def _save_fingerprints():
+            write_jsonfile(self.fingerprint_file, get_class_fingerprints(classes))
+
+        thread = CustomThread(target=_save_fingerprints, name="fingerprints")
+        thread.daemon = True
+        try:
+            thread.start()
+        except Exception:
+            log.error("Failed to start the thread for fingerprints.", exc_info=True)
+            return None
+        return thread
+
+    def select_resumed_results(self, common_data):
+        """Carry forward results of finished checks in the checkpoint loaded for `--resume`.
+        The checkpoint is restarted for this run either way.
+
+        Returns:
+            list: IDs of the resumed checks.
+        """
+        if self.checkpoint is None:
+            return []
+        resumed = []
+        if self.checkpoint.results and self.checkpoint.matches(common_data):
+            for check_func in self.check_funcs:
+                check_id = check_func.__name__
+                if check_id in self.checkpoint.results and check_id not in self.reused_results:
+                    self.reused_results[check_id] = self.checkpoint.results[check_id]
+                    resumed.append(check_id)
+            self.resumed_shared_data = dict(self.checkpoint.shared_data)
+        elif self.checkpoint.results:
+            log.info("Versions differ from the checkpoint. Running all checks.")
+            self.checkpoint.results.clear()
+            self.checkpoint.shared_data.clear()
+        self.checkpoint.start(common_data)
+        return resumed
+
     def initialize_checks(self):
         for check_func in self.check_funcs:
             check_func(initialize_check=self.initialize_check)
+        if self.json_results == "live":
+            self.rm.flush_json_files()
 
     def run_checks(self, common_data):
+        common_kwargs = {"finalize_check": self.finalize_check}
+        common_kwargs.update(common_data)
+        for check_id, result_obj in self.reused_results.items():
+            self.rm.update_result(check_id, result_obj)
+            if self.checkpoint is not None:
+                self.checkpoint.add_result(check_id, result_obj)
+        check_funcs = self.get_affected_check_funcs(common_data)
+        skipped_count = len(self.check_funcs) - len(check_funcs)
+        providers = self.get_providers(check_funcs)
+        check_timeouts = self.get_check_timeouts(check_funcs)
+        memory_estimates = self.get_memory_estimates(check_funcs)
+        check_funcs = [
+            self.with_shared_data(check_func, providers) if getattr(check_func, "providers", ()) else check_func
+            for check_func in check_funcs
+        ]
+
+        def _print_progress(done, total):
+            print_progress(done + skipped_count, total + skipped_count)
+            if self.json_results == "live":
+                self.rm.flush_json_files()
+            if self.checkpoint is not None:
+                self.checkpoint.save_if_due()
+
         tm = ThreadManager(
-            funcs=self.check_funcs,
-            common_kwargs=dict({"finalize_check": self.finalize_check}, **common_data),
-            monitor_interval=self.monitor_interval,
+            funcs=check_funcs,
+            common_kwargs=common_kwargs,
             monitor_timeout=self.monitor_timeout,
             max_threads=self.max_threads,
-            callback_on_monitoring=print_progress,
+            workers=self.workers,
+            providers=list(providers.values()),
+            stats=self.stats,
+            check_timeouts=check_timeouts,
+            memory_estimates=memory_estimates,
+            callback_on_monitoring=_print_progress,
             callback_on_start_failure=self.finalize_check_on_thread_failure,
             callback_on_timeout=self.finalize_check_on_thread_timeout,
         )
         self.timeout_event = tm.timeout_event
-        tm.start()
-        tm.join()
+        # Fork workers before any check thread starts
+        process_pool.start(self.processes)
+        fingerprint_thread = None
+        interrupted = True
+        try:
+            fingerprint_thread = self.start_fingerprints()
+            tm.start()
+            tm.join()
+            interrupted = tm.timeout_event.is_set()
+        finally:
+            process_pool.close()
+            if fingerprint_thread is not None:
+                fingerprint_thread.join(FINGERPRINT_JOIN_TIMEOUT)
+                if fingerprint_thread.is_alive():
+                    log.warning("Fingerprints are not saved in time. `--rerun-from` this run will run all checks.")
+            self.rm.close()
+            if self.checkpoint is not None:
+                for thread in self.checkpoint_threads:
+                    thread.join()
+                # The checkpoint is removed after a complete run. Save it only to resume from.
+                if interrupted:
+                    # Shared data may have been extended by checks (e.g. `VrfModel` indexes)
+                    self.checkpoint.save(shared_data=dict(
+                        (name, p.data) for name, p in providers.items() if p.done and p.error is None
+                    ))
+        if self.stats.filepath:
+            self.stats.save()
 
 
 def main(_args=None):
@@ -7285,13 +9699,27 @@ def main(_args=None):
         print("Timeout(sec): {}".format(DEFAULT_TIMEOUT))
         return
 
-    cm = CheckManager(args.api_only, args.debug_function, args.timeout, max_threads=args.max_threads)
+    # None: no worker process, 0: worker processes with the default count
+    processes = get_default_process_count() if args.processes == 0 else args.processes
+    # Loaded before `init_system()` removes the files of the previous run
+    previous_run = PreviousRun.load(args.rerun_from) if args.rerun_from else None
+    checkpoint = Checkpoint(CHECKPOINT_FILE, CHECKPOINT_DATA_FILE)
+    if args.resume and not checkpoint.load():
+        print("No checkpoint to resume from. Running all checks.")
+    cm = CheckManager(args.api_only, args.debug_function, args.timeout, max_threads=args.max_threads, workers=args.workers, stats_file=STATS_FILE, check_timeouts=args.check_timeout, processes=processes, json_results=args.json_results, result_journal=RESULT_JOURNAL, columnar_rows=args.columnar_rows, bundle=result_bundle, fingerprint_file=FINGERPRINT_FILE, previous_run=previous_run, checkpoint=checkpoint)
 
     if args.total_checks:
         print("Total Number of Checks: {}".format(cm.total_checks))
         return
 
-    init_system()
+    init_system(resume=args.resume)
+    # Results are added to the bundle as they come
+    bundle_name = BUNDLE_NAME if args.bundle_compression else re.sub(r'\.tgz$', '.tar', BUNDLE_NAME)
+    result_bundle.open(bundle_name, args.bundle_compression)
+    if args.ssh_control_master:
+        ssh_pool.control_dir = SSH_CONTROL_DIR
+    if args.debug_function or args.log_responses:
+        enable_response_log()
 
     # Initialize checks with empty results
     cm.initialize_checks()
@@ -7300,7 +9728,14 @@ def main(_args=None):
     prints('!!!! Check https://github.com/datacenter/ACI-Pre-Upgrade-Validation-Script for Latest Release !!!!\n')
 
     common_data = query_common_data(args.api_only, args.cversion, args.tversion, args.username, args.password)
-    write_script_metadata(args.api_only, args.timeout, cm.total_checks, common_data)
+    reused_checks = cm.select_reused_results(common_data)
+    if args.rerun_from:
+        prints("Reusing passed results of {} checks from {}\n".format(len(reused_checks), args.rerun_from))
+    resumed_checks = cm.select_resumed_results(common_data)
+    if args.resume:
+        prints("Resuming with results of {} finished checks from the checkpoint\n".format(len(resumed_checks)))
+    write_script_metadata(args.api_only, args.timeout, cm.total_checks, common_data, args.rerun_from, reused_checks,
+                          resumed_checks if args.resume else None)
 
     cm.run_checks(common_data)
 
@@ -7317,7 +9752,8 @@ def main(_args=None):
         if not result_obj or result_obj.result in (NA, PASS):
             continue
         check_title = cm.get_check_title(check_id)
-        print_result(index + 1, cm.total_checks, check_title, **result_obj.as_dict())
+        table_file = os.path.join(TABLE_DIR, check_id + '.txt')
+        print_result(index + 1, cm.total_checks, check_title, table_file=table_file, **result_obj.as_dict())
 
     # Print summary
     summary = cm.get_result_summary()
@@ -7328,8 +9764,13 @@ def main(_args=None):
         prints('{:{}} : {:2}'.format(key, max_header_len, summary[key]))
 
     write_jsonfile(SUMMARY_FILE, summary)
+    # Keep the checkpoint only when the run was interrupted by the timeout
+    interrupted = cm.timeout_event.is_set()
+    if not interrupted:
+        checkpoint.remove()
 
-    wrapup_system(args.no_cleanup)
+    # The checkpoint is under DIR. Keep it to resume from.
+    wrapup_system(args.no_cleanup or interrupted)
 
 
 if __name__ == "__main__":
@@ -7339,4 +9780,5 @@ if __name__ == "__main__":
         msg = "Abort due to unexpected error - {}".format(e)
         prints(msg)
         log.error(msg, exc_info=True)
+        result_bundle.abort()
         sys.exit(1)
@@ -785,3 +785,26 @@ def test_basic():
             ),
         ]
     )
+
+
+def test_get_access_policy(monkeypatch):
+    data_str = tmpl.render(params)
+    infra_mos = yaml.safe_load(data_str)
+    for mo in infra_mos:
+        # Attributes not used by the parser are not sent to the worker process
+        list(mo.values())[0]["attributes"]["modTs"] = "2024-01-01T00:00:00.000+00:00"
+    monkeypatch.setattr(script, "icurl", lambda apitype, query: infra_mos)
+    sent = []
+
+    def fake_run_in_process(func, mos):
+        sent.extend(mos)
+        return func(mos)
+
+    monkeypatch.setattr(script, "run_in_process", fake_run_in_process)
+
+    access_policy = script.get_access_policy()
+    a = script.AciAccessPolicyParser(infra_mos)
+    assert access_policy.port_data == dict(a.port_data)
+    assert access_policy.vpool_per_dom == dict(a.vpool_per_dom)
+    assert len(sent) == len(infra_mos)
+    assert all("modTs" not in list(mo.values())[0]["attributes"] for mo in sent)
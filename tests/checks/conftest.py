@@ -1,3 +1,4 @@
+import re
 import pytest
 import logging
 import importlib
@@ -12,7 +13,7 @@ log = logging.getLogger()
 def run_check(request):
     def _run_check(**kwargs):
         test_function = getattr(request.module, "test_function")
-        cm = script.CheckManager(debug_function=test_function, monitor_interval=0.01)
+        cm = script.CheckManager(debug_function=test_function)
         cm.initialize_checks()
 
         err = "Unable to find test_function ({}) in CheckManager".format(test_function)
@@ -82,17 +83,49 @@ class MockConnection(script.Connection):
                 if conn_cmd["exception"]:
                     raise conn_cmd["exception"]
                 self.output = conn_cmd["output"]
+                # Lines are handed over to `on_line` while reading in the stream mode
+                on_line = kargs.get("on_line")
+                line_regex = kargs.get("line_regex")
+                for line in self.output.splitlines():
+                    if line_regex is not None:
+                        line = re.match(line_regex, line)
+                        if line is None:
+                            continue
+                    if on_line is not None:
+                        on_line(line)
                 break
         else:
             log.error("Command `%s` not found in test data `conn_cmds`", command)
             raise Exception("FAILURE IN PYTEST")
 
+    def run_batch(self, commands, **kargs):
+        """
+        `Connection.run_batch()` sends all commands at once. An exception at the first
+        command is raised as it is (i.e. login failure). An exception at a later command
+        is handled as the command not completing, with the exception as `last_match`.
+        """
+        results = []
+        for i, command in enumerate(commands):
+            try:
+                self.cmd(command)
+            except Exception as e:
+                if i == 0:
+                    raise
+                self.last_match = str(e)
+                return results + [("", None)] * (len(commands) - i)
+            results.append((self.output, 0))
+        return results
+
 
 @pytest.fixture
 def mock_conn(monkeypatch, conn_failure, conn_cmds):
     MockConnection.conn_failure = conn_failure
     MockConnection.conn_cmds = conn_cmds
     monkeypatch.setattr(script, "Connection", MockConnection)
+    # Sessions are pooled across checks. Do not carry them over to other tests.
+    script.ssh_pool.close_all()
+    yield
+    script.ssh_pool.close_all()
 
 
 @pytest.fixture
@@ -12,7 +12,8 @@ dir = os.path.dirname(os.path.abspath(__file__))
 test_function = "consumer_vzany_shared_services_check"
 
 # icurl queries
-fvCtx_query = "fvCtx.json?rsp-subtree=full&rsp-subtree-class=vzRsAnyToCons"
+fvCtx_query = "fvCtx.json"
+vzany_cons_query = "vzRsAnyToCons.json"
 esg_query = "fvESg.json"
 aepg_query = "fvAEPg.json"
 l3instp_query = "l3extInstP.json"
@@ -34,7 +35,8 @@ graph_query = (
         # Target version missing -> MANUAL (TVER_MISSING)
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_shared.json"),
             },
             "5.2(8f)",
@@ -44,7 +46,8 @@ graph_query = (
         # Target version below 5.3(2d) -> NA
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_shared.json"),
             },
             "4.2(8f)",
@@ -54,7 +57,8 @@ graph_query = (
         # 5.2(8f) -> 6.0(2h) (no new rule expansion versions hit) -> NA
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_shared.json"),
                 aepg_query: read_data(dir, "epg_epg2_unmatched.json"),
                 l3instp_query: read_data(dir, "instp_l3instp2.json"),
@@ -66,7 +70,8 @@ graph_query = (
         # 5.3(2g) -> 6.0(9h) (no new rule expansion versions hit) -> NA
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_shared.json"),
                 aepg_query: read_data(dir, "epg_epg2_unmatched.json"),
                 l3instp_query: read_data(dir, "instp_l3instp2.json"),
@@ -78,7 +83,8 @@ graph_query = (
         # 6.1(2g) -> 6.1(4h) (no new expansion; already past ESG threshold) -> NA
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_shared.json"),
                 aepg_query: read_data(dir, "epg_epg2_unmatched.json"),
                 l3instp_query: read_data(dir, "instp_l3instp2.json"),
@@ -91,7 +97,8 @@ graph_query = (
         # 5.2(8f) -> 5.3(3a) (EPG expansion boundary crossed, but only ESG providers present) -> PASS
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_esg_only.json"),
                 esg_query: read_data(dir, "esg_esg2.json"),
                 graph_query: read_data(dir, "vnsGraphInst_redirect.json"),
@@ -103,7 +110,8 @@ graph_query = (
         # 5.2(8f) -> 6.0(5a) (EPG expansion boundary crossed, but only ESG providers present) -> PASS
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_esg_only.json"),
                 esg_query: read_data(dir, "esg_esg2.json"),
                 graph_query: read_data(dir, "vnsGraphInst_redirect.json"),
@@ -115,7 +123,8 @@ graph_query = (
         # 6.0(2h) -> 6.0(5a) (EPG expansion boundary crossed, but only ESG providers present) -> PASS
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_esg_only.json"),
                 esg_query: read_data(dir, "esg_esg2.json"),
                 graph_query: read_data(dir, "vnsGraphInst_redirect.json"),
@@ -127,7 +136,8 @@ graph_query = (
         # 5.3(2g) -> 6.1(2g) (ESG expansion boundary crossed, but only EPG/InstP providers present) -> PASS
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_epg_only.json"),
                 aepg_query: read_data(dir, "epg_epg2_unmatched.json"),
                 l3instp_query: read_data(dir, "instp_l3instp2.json"),
@@ -140,7 +150,8 @@ graph_query = (
         # 6.0(5a) -> 6.1(2g) (ESG expansion boundary crossed, but only EPG/InstP providers present) -> PASS
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_epg_only.json"),
                 aepg_query: read_data(dir, "epg_epg2_unmatched.json"),
                 l3instp_query: read_data(dir, "instp_l3instp2.json"),
@@ -153,7 +164,8 @@ graph_query = (
         # 5.2(8f) -> 5.3(3a) (EPG expansion boundary crossed with relevant providers present) -> MANUAL
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_shared.json"),
                 aepg_query: read_data(dir, "epg_epg2_unmatched.json"),
                 l3instp_query: read_data(dir, "instp_l3instp2.json"),
@@ -166,7 +178,8 @@ graph_query = (
         # 5.2(8f) -> 6.0(5a) (EPG expansion boundary crossed with relevant providers present) -> MANUAL
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_shared.json"),
                 aepg_query: read_data(dir, "epg_epg2_unmatched.json"),
                 l3instp_query: read_data(dir, "instp_l3instp2.json"),
@@ -179,7 +192,8 @@ graph_query = (
         # 6.0(2h) -> 6.0(5a) (EPG expansion boundary crossed with relevant providers present) -> MANUAL
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_shared.json"),
                 aepg_query: read_data(dir, "epg_epg2_unmatched.json"),
                 l3instp_query: read_data(dir, "instp_l3instp2.json"),
@@ -192,7 +206,8 @@ graph_query = (
         # 5.3(2g) -> 6.1(2g) (ESG expansion boundary crossed with relevant providers present) -> MANUAL
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_shared.json"),
                 graph_query: read_data(dir, "vnsGraphInst_redirect.json"),
                 esg_query: read_data(dir, "esg_esg2.json"),
@@ -204,7 +219,8 @@ graph_query = (
         # 6.0(9h) -> 6.1(2g) (ESG expansion boundary crossed with relevant providers present) -> MANUAL
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_shared.json"),
                 graph_query: read_data(dir, "vnsGraphInst_redirect.json"),
                 esg_query: read_data(dir, "esg_esg2.json"),
@@ -216,7 +232,8 @@ graph_query = (
         # Shared service crossing 6.1(4) version line (EPG/InstP/ESG) -> MANUAL without PBR warning
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: read_data(dir, "global_contracts_shared.json"),
                 graph_query: read_data(dir, "vnsGraphInst_redirect.json"),
                 aepg_query: read_data(dir, "epg_epg2_unmatched.json"),
@@ -230,7 +247,8 @@ graph_query = (
         # No vzAny consumers -> PASS
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_no_consumers.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_no_consumers.json"),
                 global_contract_query: read_data(dir, "global_contracts_shared.json"),
             },
             "5.2(8f)",
@@ -240,7 +258,8 @@ graph_query = (
         # No global contracts (vzAny consumer exists) -> PASS
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_shared.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_shared.json"),
                 global_contract_query: [],
             },
             "5.2(8f)",
@@ -250,7 +269,8 @@ graph_query = (
         # Provider VRF same as consumer (no shared service) -> PASS
         (
             {
-                fvCtx_query: read_data(dir, "fvCtx_consumer_same_vrf.json"),
+                fvCtx_query: read_data(dir, "fvCtx.json"),
+                vzany_cons_query: read_data(dir, "vzRsAnyToCons_consumer_same_vrf.json"),
                 global_contract_query: read_data(dir, "global_contracts_same_vrf.json"),
                 aepg_query: read_data(dir, "epg_epg2_unmatched.json"),
                 l3instp_query: read_data(dir, "instp_l3instp2.json"),
@@ -0,0 +1,586 @@
+import random
+import importlib
+from collections import OrderedDict, defaultdict
+
+script = importlib.import_module("aci-preupgrade-validation-script")
+
+# Close to the largest fabrics the script runs against
+LARGE_FABRIC = {
+    "pods": 4,
+    "spines": 16,
+    "leaves": 500,
+    "tenants": 100,
+    "vrfs": 1000,
+    "bds": 15000,
+    "bd_subnets": 30000,
+    "epgs": 15000,
+    "vlan_pools": 100,
+    "vlan_blocks": 12000,
+    "aeps": 200,
+    "ports_per_leaf": 48,
+    "epg_deployments": 80000,
+    "l3outs": 1000,
+    "faults": 5000,
+}
+
+ACCESS_POLICY_QUERY = (
+    "infraInfra.json?query-target=subtree&target-subtree-class="
+    + ",".join(script.AciAccessPolicyParser.get_classes())
+)
+EPG_DOMAIN_QUERY = "fvAEPg.json?rsp-subtree-include=required&rsp-subtree=children&rsp-subtree-class=fvRsDomAtt"
+VPC_QUERY = "fabricExplicitGEp.json?rsp-subtree=children&rsp-subtree-class=fabricNodePEp"
+INFRA_SETTINGS_QUERY = "uni/infra/settings.json"
+
+
+class _Random(random.Random):
+    """random.Random with choice() and randint() giving the same values on python2 and python3"""
+
+    def randint(self, a, b):
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+
+class SyntheticFabric(object):
+    """Synthetic but consistent ACI MIT for scale tests of checks.
+
+    Every relation points to an object that exists. Leaf ports are deployed
+    only with VLANs from the pool of a domain that is attached to both the
+    EPG and the AEP of the port, just like APIC would accept it. The same seed
+    gives the same fabric on python2 and python3.
+
+    All sizes are totals across the fabric. `epg_deployments` is the number
+    of static path bindings (fvRsPathAtt). vPC bindings show up as one
+    fvIfConn per node.
+
+    Example)
+        fabric = SyntheticFabric(seed=1, **LARGE_FABRIC)
+
+        @pytest.fixture
+        def icurl_outputs():
+            outputs = fabric.icurl_outputs(page_size=50000)
+            outputs['faultInst.json?query-target-filter=wcard(faultInst.changeSet,"subnet-overlap")'] = (
+                fabric.response("faultInst", page_size=50000, predicate=lambda f: f["changeSet"] == "subnet-overlap")
+            )
+            return outputs
+    """
+
+    FAULTS = ["F1425", "F0467", "F0532"]
+
+    def __init__(
+        self,
+        seed=0,
+        pods=1,
+        spines=2,
+        leaves=4,
+        apics=3,
+        tenants=2,
+        vrfs=4,
+        bds=16,
+        bd_subnets=16,
+        epgs=32,
+        vlan_pools=4,
+        vlan_blocks=16,
+        aeps=4,
+        ports_per_leaf=16,
+        vpc_ports=2,
+        epg_deployments=64,
+        l3outs=4,
+        faults=8,
+        version="6.0(5h)",
+        sw_version="n9000-16.0(5h)",
+    ):
+        self.rng = _Random(seed)
+        self.version = version
+        self.sw_version = sw_version
+        # {classname: [attributes, ...]} in the order of creation
+        self.mos = OrderedDict()
+        # {child DN: parent DN} for `rsp-subtree=children` queries
+        self.parents = {}
+
+        self._add_nodes(pods, spines, leaves, apics)
+        self._add_vlan_pools(vlan_pools, vlan_blocks)
+        self._add_aeps(aeps)
+        self._add_leaf_ports(ports_per_leaf, vpc_ports)
+        self._add_tenants(tenants, vrfs, bds, bd_subnets, epgs)
+        self._add_deployments(epg_deployments)
+        self._add_l3outs(l3outs)
+        self._add_faults(faults)
+
+    def add(self, classname, parent_dn=None, **attributes):
+        self.mos.setdefault(classname, []).append(attributes)
+        if parent_dn:
+            self.parents[attributes["dn"]] = parent_dn
+        return attributes
+
+    def get(self, classname):
+        return self.mos.get(classname, [])
+
+    def _add_nodes(self, pods, spines, leaves, apics):
+        self.leaf_pods = OrderedDict()
+        self.vpc_pairs = []
+
+        def add_node(node_id, pod, role, name, model, version):
+            dn = "topology/pod-{}/node-{}".format(pod, node_id)
+            address = "10.{}.{}.{}".format(pod, node_id // 256, node_id % 256)
+            self.add(
+                "fabricNode",
+                dn=dn,
+                id=str(node_id),
+                name=name,
+                role=role,
+                model=model,
+                version=version,
+                address=address,
+                fabricSt="commissioned" if role == "controller" else "active",
+                nodeType="unspecified",
+                monPolDn="uni/fabric/monfab-default",
+            )
+            self.add(
+                "topSystem",
+                dn=dn + "/sys",
+                id=str(node_id),
+                name=name,
+                role=role,
+                version=version,
+                address=address,
+                podId=str(pod),
+                state="in-service",
+            )
+
+        for idx in range(apics):
+            node_id = idx + 1
+            add_node(node_id, idx % pods + 1, "controller", "apic%d" % node_id, "APIC-SERVER-L2", self.version)
+        spine_base = 1001 if leaves <= 900 else 101 + leaves
+        for idx in range(spines):
+            node_id = spine_base + idx
+            add_node(node_id, idx % pods + 1, "spine", "spine%d" % node_id, "N9K-C9504", self.sw_version)
+        for idx in range(leaves):
+            node_id = 101 + idx
+            # Consecutive leaves share a pod so that they can be vPC pairs
+            pod = idx * pods // leaves + 1
+            add_node(node_id, pod, "leaf", "leaf%d" % node_id, "N9K-C93180YC-FX", self.sw_version)
+            self.leaf_pods[node_id] = pod
+
+        leaf_ids = list(self.leaf_pods)
+        for node_a, node_b in zip(leaf_ids[::2], leaf_ids[1::2]):
+            pod = self.leaf_pods[node_a]
+            if pod != self.leaf_pods[node_b]:
+                continue
+            self.vpc_pairs.append((node_a, node_b))
+            gep = self.add(
+                "fabricExplicitGEp",
+                dn="uni/fabric/protpol/expgep-{}-{}".format(node_a, node_b),
+                id=str(len(self.vpc_pairs)),
+                name="{}-{}".format(node_a, node_b),
+            )
+            for node_id in (node_a, node_b):
+                self.add(
+                    "fabricNodePEp",
+                    parent_dn=gep["dn"],
+                    dn="{}/nodepep-{}".format(gep["dn"], node_id),
+                    id=str(node_id),
+                    podId=str(pod),
+                )
+
+    def _add_vlan_pools(self, vlan_pools, vlan_blocks):
+        # {domain DN: [(from, to), ...]}
+        self.vlans_per_dom = OrderedDict()
+        blocks_per_pool = [vlan_blocks // vlan_pools + (idx < vlan_blocks % vlan_pools) for idx in range(vlan_pools)]
+        for idx, num_blocks in enumerate(blocks_per_pool):
+            pool_dn = "uni/infra/vlanns-[VLANPOOL{}]-static".format(idx)
+            self.add("fvnsVlanInstP", dn=pool_dn, name="VLANPOOL%d" % idx, allocMode="static")
+            # Blocks in one pool never overlap. Blocks in different pools may.
+            num_blocks = min(num_blocks, 4094)
+            segment = 4094 // num_blocks if num_blocks else 0
+            blocks = []
+            for blk_idx in range(num_blocks):
+                low = 1 + blk_idx * segment
+                high = low + segment - 1
+                vlan_from = self.rng.randint(low, high)
+                vlan_to = self.rng.randint(vlan_from, min(high, vlan_from + 15))
+                blocks.append((vlan_from, vlan_to))
+                self.add(
+                    "fvnsEncapBlk",
+                    dn="{}/from-[vlan-{}]-to-[vlan-{}]".format(pool_dn, vlan_from, vlan_to),
+                    allocMode="inherit",
+                    role="external",
+                    name="",
+                    descr="",
+                    **{"from": "vlan-%d" % vlan_from, "to": "vlan-%d" % vlan_to}
+                )
+            dom_dn = "uni/phys-PHYS%d" % idx
+            self.add(
+                "fvnsRtVlanNs",
+                dn="{}/rtinfraVlanNs-[{}]".format(pool_dn, dom_dn),
+                tCl="physDomP",
+                tDn=dom_dn,
+            )
+            self.vlans_per_dom[dom_dn] = blocks
+
+    def _add_aeps(self, aeps):
+        self.doms_per_aep = OrderedDict()
+        dom_dns = list(self.vlans_per_dom)
+        for name, scope in [("default", "global"), ("VLAN_SCOPE_LOCAL", "portlocal")]:
+            self.add(
+                "l2IfPol",
+                dn="uni/infra/l2IfP-" + name,
+                name=name,
+                qinq="disabled",
+                vepa="disabled",
+                vlanScope=scope,
+            )
+        for idx in range(aeps):
+            aep_dn = "uni/infra/attentp-AEP%d" % idx
+            self.add("infraAttEntityP", dn=aep_dn, name="AEP%d" % idx)
+            doms = set([dom_dns[idx % len(dom_dns)]] if dom_dns else [])
+            if dom_dns and self.rng.random() < 0.5:
+                doms.add(self.rng.choice(dom_dns))
+            self.doms_per_aep[aep_dn] = sorted(doms)
+            for dom_dn in self.doms_per_aep[aep_dn]:
+                self.add(
+                    "infraRsDomP",
+                    dn="{}/rsdomP-[{}]".format(aep_dn, dom_dn),
+                    tCl="physDomP",
+                    tDn=dom_dn,
+                )
+            # Access port policy groups with the global and the port local VLAN scope
+            for suffix, l2if in [("", "default"), ("_local", "VLAN_SCOPE_LOCAL")]:
+                self._add_ifpg("infraAccPortGrp", "IFPG_AEP%d%s" % (idx, suffix), aep_dn, l2if)
+
+    def _add_ifpg(self, classname, name, aep_dn, l2if="default", lagT=None):
+        if classname == "infraAccPortGrp":
+            dn = "uni/infra/funcprof/accportgrp-" + name
+            self.add(classname, dn=dn, name=name)
+        else:
+            dn = "uni/infra/funcprof/accbundle-" + name
+            self.add(classname, dn=dn, name=name, lagT=lagT)
+        self.add("infraRsAttEntP", dn=dn + "/rsattEntP", tCl="infraAttEntityP", tDn=aep_dn)
+        self.add(
+            "l2RtL2IfPol",
+            dn="uni/infra/l2IfP-{}/rtinfraL2IfPol-[{}]".format(l2if, dn),
+            tCl=classname,
+            tDn=dn,
+        )
+        return dn
+
+    def _add_profiles(self, name, node_ids):
+        swp_dn = "uni/infra/nprof-" + name
+        ifp_dn = "uni/infra/accportprof-" + name
+        swsel_dn = "{}/leaves-{}-typ-range".format(swp_dn, name)
+        self.add("infraNodeP", dn=swp_dn, name=name)
+        self.add(
+            "infraRsAccPortP",
+            dn="{}/rsaccPortP-[{}]".format(swp_dn, ifp_dn),
+            tCl="infraAccPortP",
+            tDn=ifp_dn,
+        )
+        self.add("infraLeafS", dn=swsel_dn, name=name, type="range")
+        self.add(
+            "infraNodeBlk",
+            dn="{}/nodeblk-{}".format(swsel_dn, node_ids[0]),
+            name=str(node_ids[0]),
+            from_=str(node_ids[0]),
+            to_=str(node_ids[-1]),
+        )
+        self.add("infraAccPortP", dn=ifp_dn, name=name, nodeId="0")
+        return ifp_dn
+
+    def _add_port_selector(self, ifp_dn, port_id, ifpg_class, ifpg_dn):
+        name = "ETH1-%d" % port_id
+        ifsel_dn = "{}/hports-{}-typ-range".format(ifp_dn, name)
+        self.add("infraHPortS", dn=ifsel_dn, name=name, type="range", descr="")
+        self.add(
+            "infraPortBlk",
+            dn="{}/portblk-{}".format(ifsel_dn, name),
+            name=name,
+            descr="",
+            fromCard="1",
+            toCard="1",
+            fromPort=str(port_id),
+            toPort=str(port_id),
+        )
+        self.add(
+            "infraRsAccBaseGrp",
+            dn=ifsel_dn + "/rsaccBaseGrp",
+            fexId="101",
+            tCl=ifpg_class,
+            tDn=ifpg_dn,
+        )
+
+    def _add_leaf_ports(self, ports_per_leaf, vpc_ports):
+        # {domain DN: [(pod, (node ID, ...), port), ...]}
+        self.ports_per_dom = defaultdict(list)
+        ifpgs = [
+            (mo["tDn"], mo["dn"][:-len("/rsattEntP")])
+            for mo in self.get("infraRsAttEntP")
+        ]
+        for node_id, pod in self.leaf_pods.items():
+            ifp_dn = self._add_profiles("L%d" % node_id, [node_id])
+            for port_id in range(1, ports_per_leaf + 1):
+                aep_dn, ifpg_dn = self.rng.choice(ifpgs)
+                self._add_port_selector(ifp_dn, port_id, "infraAccPortGrp", ifpg_dn)
+                for dom_dn in self.doms_per_aep[aep_dn]:
+                    self.ports_per_dom[dom_dn].append((pod, (node_id,), "eth1/%d" % port_id))
+
+        aep_dns = list(self.doms_per_aep)
+        for node_a, node_b in self.vpc_pairs:
+            ifp_dn = self._add_profiles("L%d-%d" % (node_a, node_b), [node_a, node_b])
+            for idx in range(vpc_ports):
+                aep_dn = self.rng.choice(aep_dns)
+                name = "VPC_%d_%d_%d" % (node_a, node_b, idx)
+                ifpg_dn = self._add_ifpg("infraAccBndlGrp", name, aep_dn, lagT="node")
+                self._add_port_selector(ifp_dn, ports_per_leaf + idx + 1, "infraAccBndlGrp", ifpg_dn)
+                for dom_dn in self.doms_per_aep[aep_dn]:
+                    self.ports_per_dom[dom_dn].append((self.leaf_pods[node_a], (node_a, node_b), name))
+
+    def _add_tenants(self, tenants, vrfs, bds, bd_subnets, epgs):
+        self.vrf_vnids = OrderedDict()
+        self.bd_vrfs = OrderedDict()
+        ap_dns = set()
+        self.epg_doms = OrderedDict()
+        dom_dns = list(self.vlans_per_dom)
+        tenant_dns = []
+        for idx in range(tenants):
+            tenant_dns.append("uni/tn-TN%d" % idx)
+            self.add("fvTenant", dn=tenant_dns[-1], name="TN%d" % idx)
+        for idx in range(vrfs):
+            vrf_dn = "{}/ctx-VRF{}".format(tenant_dns[idx % tenants], idx)
+            vnid = str(2097152 + idx * 16)
+            self.add("fvCtx", dn=vrf_dn, name="VRF%d" % idx, scope=vnid, pcEnfPref="enforced")
+            self.vrf_vnids[vrf_dn] = vnid
+        vrf_dns = list(self.vrf_vnids)
+        for idx in range(bds):
+            vrf_dn = vrf_dns[idx % vrfs]
+            bd_dn = "{}/BD-BD{}".format(vrf_dn.split("/ctx-")[0], idx)
+            self.add("fvBD", dn=bd_dn, name="BD%d" % idx, unicastRoute="yes", unkMacUcastAct="proxy", arpFlood="no")
+            self.add(
+                "fvRsCtx",
+                dn=bd_dn + "/rsctx",
+                tDn=vrf_dn,
+                tnFvCtxName=vrf_dn.split("/ctx-")[1],
+            )
+            self.bd_vrfs[bd_dn] = vrf_dn
+        bd_dns = list(self.bd_vrfs.items())
+        for idx in range(bd_subnets):
+            bd_dn = bd_dns[idx % bds][0]
+            # 10.0.0.1/24, 10.0.1.1/24, ..., 10.255.255.1/24, 11.0.0.1/24, ...
+            address = (10 << 24) + (idx << 8) + 1
+            ip = "{}.{}.{}.{}/24".format(address >> 24, (address >> 16) & 255, (address >> 8) & 255, address & 255)
+            self.add(
+                "fvSubnet",
+                dn="{}/subnet-[{}]".format(bd_dn, ip),
+                ip=ip,
+                scope=self.rng.choice(["private", "public", "public,shared"]),
+            )
+        for idx in range(epgs):
+            bd_dn, vrf_dn = bd_dns[idx % bds]
+            tenant_dn = bd_dn.split("/BD-")[0]
+            ap_dn = "{}/ap-AP{}".format(tenant_dn, idx // 100)
+            if ap_dn not in ap_dns:
+                self.add("fvAp", dn=ap_dn, name="AP%d" % (idx // 100))
+                ap_dns.add(ap_dn)
+            epg_dn = "{}/epg-EPG{}".format(ap_dn, idx)
+            self.add(
+                "fvAEPg",
+                dn=epg_dn,
+                name="EPG%d" % idx,
+                pcTag=str(16386 + idx),
+                scope=self.vrf_vnids[vrf_dn],
+                floodOnEncap="disabled",
+                shutdown="no",
+            )
+            self.add("fvRsBd", dn=epg_dn + "/rsbd", tDn=bd_dn, tnFvBDName=bd_dn.split("/BD-")[1])
+            doms = set([self.rng.choice(dom_dns)])
+            # Some EPGs use two domains which may have overlapping VLAN pools
+            if self.rng.random() < 0.1:
+                doms.add(self.rng.choice(dom_dns))
+            self.epg_doms[epg_dn] = sorted(doms)
+            for dom_dn in self.epg_doms[epg_dn]:
+                self.add(
+                    "fvRsDomAtt",
+                    parent_dn=epg_dn,
+                    dn="{}/rsdomAtt-[{}]".format(epg_dn, dom_dn),
+                    tDn=dom_dn,
+                    tCl="physDomP",
+                )
+
+    def _add_deployments(self, epg_deployments):
+        epg_dns = list(self.epg_doms)
+        deployed = set()
+        used_encaps = set()
+        attempts = 0
+        while len(deployed) < epg_deployments and attempts < epg_deployments * 10:
+            attempts += 1
+            epg_dn = self.rng.choice(epg_dns)
+            dom_dn = self.rng.choice(self.epg_doms[epg_dn])
+            ports = self.ports_per_dom.get(dom_dn)
+            blocks = self.vlans_per_dom[dom_dn]
+            if not ports or not blocks:
+                continue
+            pod, node_ids, port = self.rng.choice(ports)
+            vlan_from, vlan_to = self.rng.choice(blocks)
+            vlan = self.rng.randint(vlan_from, vlan_to)
+            # One encap per EPG on a port and one EPG per encap on a port
+            if (epg_dn, node_ids, port) in deployed or (node_ids, port, vlan) in used_encaps:
+                continue
+            deployed.add((epg_dn, node_ids, port))
+            used_encaps.add((node_ids, port, vlan))
+
+            if len(node_ids) > 1:
+                path = "topology/pod-{}/protpaths-{}/pathep-[{}]".format(pod, "-".join(map(str, node_ids)), port)
+            else:
+                path = "topology/pod-{}/paths-{}/pathep-[{}]".format(pod, node_ids[0], port)
+            encap = "vlan-%d" % vlan
+            self.add(
+                "fvRsPathAtt",
+                dn="{}/rspathAtt-[{}]".format(epg_dn, path),
+                tDn=path,
+                encap=encap,
+                mode="regular",
+                instrImedcy="lazy",
+            )
+            for node_id in node_ids:
+                self.add(
+                    "fvIfConn",
+                    dn="uni/epp/fv-[{}]/node-{}/stpathatt-[{}]/conndef/conn-[{}]-[0.0.0.0]".format(
+                        epg_dn, node_id, port, encap
+                    ),
+                    encap=encap,
+                )
+
+    def _add_l3outs(self, l3outs):
+        vrf_dns = list(self.vrf_vnids)
+        leaf_ids = list(self.leaf_pods)
+        for idx in range(l3outs):
+            vrf_dn = vrf_dns[idx % len(vrf_dns)]
+            l3out_dn = "{}/out-L3OUT{}".format(vrf_dn.split("/ctx-")[0], idx)
+            self.add("l3extOut", dn=l3out_dn, name="L3OUT%d" % idx)
+            self.add(
+                "l3extRsEctx",
+                dn=l3out_dn + "/rsectx",
+                tDn=vrf_dn,
+                tnFvCtxName=vrf_dn.split("/ctx-")[1],
+            )
+            node_id = self.rng.choice(leaf_ids)
+            node_dn = "topology/pod-{}/node-{}".format(self.leaf_pods[node_id], node_id)
+            self.add(
+                "l3extRsNodeL3OutAtt",
+                dn="{}/lnodep-NP/rsnodeL3OutAtt-[{}]".format(l3out_dn, node_dn),
+                tDn=node_dn,
+                rtrId="192.0.{}.{}".format(node_id // 256, node_id % 256),
+            )
+            instp_dn = l3out_dn + "/instP-EXT"
+            self.add("l3extInstP", dn=instp_dn, name="EXT", pcTag=str(49153 + idx))
+            subnets = [("0.0.0.0/0", "import-security")]
+            subnets.append(("172.{}.{}.0/24".format(16 + idx // 65536 % 16, idx // 256 % 256), "import-security,export-rtctrl"))
+            for ip, scope in subnets:
+                self.add("l3extSubnet", dn="{}/extsubnet-[{}]".format(instp_dn, ip), ip=ip, scope=scope)
+
+    def _add_faults(self, faults):
+        bd_subnets = self.get("fvSubnet")
+        deployments = self.get("fvIfConn")
+        leaf_ids = list(self.leaf_pods)
+        for idx in range(faults):
+            code = self.FAULTS[idx % len(self.FAULTS)]
+            node_id = self.rng.choice(leaf_ids)
+            node_dn = "topology/pod-{}/node-{}".format(self.leaf_pods[node_id], node_id)
+            if code == "F1425" and bd_subnets:
+                subnet = self.rng.choice(bd_subnets)
+                vrf_dn = self.bd_vrfs[subnet["dn"].split("/subnet-[")[0]]
+                vrf = vrf_dn[len("uni/tn-"):].replace("/ctx-", ":")
+                dn = "{}/sys/ipv4/inst/dom-{}/if-[vlan{}]/addr-[{}]/fault-F1425".format(
+                    node_dn, vrf, idx % 4094 + 1, subnet["ip"]
+                )
+                descr = "IPv4 address({}) is operationally down, reason:Subnet overlap on node {} fabric hardware".format(
+                    subnet["ip"], node_id
+                )
+                change_set = "subnet-overlap"
+            elif code == "F0467" and deployments:
+                conn = self.rng.choice(deployments)
+                epg_dn = conn["dn"].split("fv-[")[1].split("]/node-")[0]
+                node_id = conn["dn"].split("/node-")[1].split("/")[0]
+                port = conn["dn"].split("stpathatt-[")[1].split("]")[0]
+                dn = "uni/epp/fv-[{}]/node-{}/stpathatt-[{}]/nwissues/fault-F0467".format(epg_dn, node_id, port)
+                descr = (
+                    "Configuration failed for {} node {} {} due to Encap Already Used in Another EPG, "
+                    "debug message: encap-already-in-use: Encap ({}) is already in use by TN0:AP0:EPG0;"
+                ).format(epg_dn, node_id, port, conn["encap"])
+                change_set = "configQual:encap-already-in-use, configSt:failed-to-apply"
+            else:
+                code = "F0532"
+                port_id = self.rng.randint(1, 48)
+                dn = "{}/sys/phys-[eth1/{}]/phys/fault-F0532".format(node_dn, port_id)
+                descr = "Port is down, reason:sfpAbsent(connected), used by:EPG"
+                change_set = "operSt (New: down)"
+            self.add(
+                "faultInst",
+                dn=dn,
+                code=code,
+                descr=descr,
+                changeSet=change_set,
+                severity="major" if code != "F0532" else "warning",
+                lc="raised",
+                type="config",
+                created="2024-01-01T00:00:00.000+00:00",
+            )
+
+    def mo_list(self, classname, predicate=None, children=None):
+        """Returns MOs in the format of `imdata`. Attributes are copied so that
+        a check modifying them does not change the fabric.
+
+        children: Child class to include under each MO as `rsp-subtree=children`
+                  with `rsp-subtree-include=required` does.
+        """
+        children_per_parent = defaultdict(list)
+        if children:
+            for child in self.get(children):
+                children_per_parent[self.parents[child["dn"]]].append({children: {"attributes": dict(child)}})
+        mos = []
+        for attributes in self.get(classname):
+            if predicate and not predicate(attributes):
+                continue
+            mo = {classname: {"attributes": dict(attributes)}}
+            if children:
+                if not children_per_parent[attributes["dn"]]:
+                    continue
+                mo[classname]["children"] = children_per_parent[attributes["dn"]]
+            mos.append(mo)
+        return mos
+
+    def response(self, classname, page_size=None, predicate=None, children=None):
+        """Returns test data for one query of `icurl_outputs` in `tests/conftest.py`.
+
+        Without page_size, the whole `imdata` (option 1). With page_size, one
+        response per page with the `totalCount` of all pages (option 3).
+        """
+        mos = self.mo_list(classname, predicate=predicate, children=children)
+        return self.paginate(mos, page_size)
+
+    @staticmethod
+    def paginate(mos, page_size=None):
+        if not page_size:
+            return mos
+        total = str(len(mos))
+        pages = [{"totalCount": total, "imdata": mos[i:i + page_size]} for i in range(0, len(mos), page_size)]
+        return pages or [{"totalCount": "0", "imdata": []}]
+
+    def icurl_outputs(self, page_size=None):
+        """Returns `icurl_outputs` with `<class>.json` for every generated class
+        and the queries used to build shared data such as access policies.
+        Queries with a filter are added by tests with `response(predicate=)`.
+        """
+        outputs = {}
+        for classname in self.mos:
+            outputs[classname + ".json"] = self.response(classname, page_size)
+        infra_mos = []
+        for classname in script.AciAccessPolicyParser.get_classes():
+            infra_mos += self.mo_list(classname)
+        outputs[ACCESS_POLICY_QUERY] = self.paginate(infra_mos, page_size)
+        outputs[EPG_DOMAIN_QUERY] = self.response("fvAEPg", page_size, children="fvRsDomAtt")
+        outputs[VPC_QUERY] = self.response("fabricExplicitGEp", page_size, children="fabricNodePEp")
+        outputs[INFRA_SETTINGS_QUERY] = [
+            {"infraSetPol": {"attributes": {"dn": "uni/infra/settings", "validateOverlappingVlans": "false"}}}
+        ]
+        return outputs
@@ -69,7 +69,7 @@ subnets_in_bd = "fvSubnet.json"
             "5.2(4d)",
             script.PASS,
         ),
-        # PASS = NON-AFFECTED VERSION + AFFECTED MO
+        # NA = NON-AFFECTED VERSION + AFFECTED MO
         (
             {
                 staticRoutes: read_data(dir, "ipRouteP_pos.json"),
@@ -79,7 +79,7 @@ subnets_in_bd = "fvSubnet.json"
             },
             "4.2(7f)",
             "5.2(6e)",
-            script.PASS,
+            script.NA,
         ),
     ],
 )
@@ -89,3 +89,51 @@ def test_logic(run_check, mock_icurl, cversion, tversion, expected_result):
         tversion=script.AciVersion(tversion),
     )
     assert result.result == expected_result
+
+
+def _route(l3out, node, addr):
+    dn = "uni/tn-t1/out-{}/lnodep-np/rsnodeL3OutAtt-[topology/pod-1/node-{}]/rt-[{}/32]".format(l3out, node, addr)
+    return {"ipRouteP": {"attributes": {"dn": dn, "ip": addr + "/32"}}}
+
+
+def _mo(classname, **attributes):
+    return {classname: {"attributes": attributes}}
+
+
+@pytest.mark.parametrize(
+    "icurl_outputs",
+    [
+        {
+            staticRoutes: [
+                _route("l3out1", 101, "10.1.1.1"),
+                _route("l3out1", 102, "10.1.1.1"),
+                _route("l3out2", 101, "10.1.1.1"),
+            ],
+            staticroute_vrf: [
+                _mo("l3extRsEctx", dn="uni/tn-t1/out-l3out1/rsectx", tDn="uni/tn-t1/ctx-v1"),
+                _mo("l3extRsEctx", dn="uni/tn-t1/out-l3out2/rsectx", tDn="uni/tn-t1/ctx-v2"),
+            ],
+            bds_in_vrf: [
+                _mo("fvRsCtx", dn="uni/tn-t1/BD-bd1/rsctx", tDn="uni/tn-t1/ctx-v1"),
+                _mo("fvRsCtx", dn="uni/tn-t1/BD-bd2/rsctx", tDn="uni/tn-t1/ctx-v2"),
+            ],
+            subnets_in_bd: [
+                _mo("fvSubnet", dn="uni/tn-t1/BD-bd1/subnet-[10.1.1.254/24]", ip="10.1.1.254/24"),
+                # Only BD subnets with a 2-digit netmask are checked
+                _mo("fvSubnet", dn="uni/tn-t1/BD-bd1/subnet-[10.0.0.254/8]", ip="10.0.0.254/8"),
+                _mo("fvSubnet", dn="uni/tn-t1/BD-bd2/subnet-[10.1.0.254/16]", ip="10.1.0.254/16"),
+            ],
+        }
+    ],
+)
+def test_data(run_check, mock_icurl):
+    result = run_check(
+        cversion=script.AciVersion("4.2(7f)"),
+        tversion=script.AciVersion("5.2(4d)"),
+    )
+    assert result.result == script.FAIL_O
+    # One row per L3Out with the route, not per node
+    assert result.data == [
+        ["uni/tn-t1/out-l3out1", "10.1.1.1", "uni/tn-t1/BD-bd1", "10.1.1.254/24"],
+        ["uni/tn-t1/out-l3out2", "10.1.1.1", "uni/tn-t1/BD-bd2", "10.1.0.254/16"],
+    ]
@@ -12,63 +12,119 @@ dir = os.path.dirname(os.path.abspath(__file__))
 test_function = "subnet_scope_check"
 
 # icurl queries
-bd_api = "fvBD.json"
-bd_api += "?rsp-subtree=children&rsp-subtree-class=fvSubnet&rsp-subtree-include=required"
+fvSubnet = "fvSubnet.json"
+fvRsBd = "fvRsBd.json"
 
-epg_api = "fvAEPg.json?"
-epg_api += "rsp-subtree=children&rsp-subtree-class=fvSubnet&rsp-subtree-include=required"
+
+def subnets(*filenames):
+    """fvSubnet class query output from fvBD/fvAEPg with fvSubnet children"""
+    data = []
+    for filename in filenames:
+        for mo in read_data(dir, filename):
+            parent = list(mo.values())[0]
+            for child in parent.get("children", []):
+                attr = dict(child["fvSubnet"]["attributes"])
+                attr["dn"] = "{}/subnet-[{}]".format(parent["attributes"]["dn"], attr["ip"])
+                data.append({"fvSubnet": {"attributes": attr}})
+    return data
 
 
 @pytest.mark.parametrize(
-    "icurl_outputs, cversion, expected_result",
+    "icurl_outputs, cversion, expected_result, expected_data",
     [
         (
             {
-                bd_api: read_data(dir, "fvBD.json"),
-                epg_api: read_data(dir, "fvAEPg_empty.json"),
-                "fvRsBd.json": read_data(dir, "fvRsBd.json"),
+                fvSubnet: subnets("fvBD.json", "fvAEPg_empty.json"),
+                fvRsBd: read_data(dir, "fvRsBd.json"),
             },
             "4.2(6a)",
             script.NA,
+            [],
         ),
         (
             {
-                bd_api: read_data(dir, "fvBD.json"),
-                epg_api: read_data(dir, "fvAEPg_pos.json"),
-                "fvRsBd.json": read_data(dir, "fvRsBd.json"),
+                fvSubnet: subnets("fvBD.json", "fvAEPg_pos.json"),
+                fvRsBd: read_data(dir, "fvRsBd.json"),
             },
             "4.2(6a)",
             script.FAIL_O,
+            [
+                ["uni/tn-common/BD-myBd2", "public", "uni/tn-test/ap-testApp/epg-testepg", "shared"],
+                ["uni/tn-test3/BD-myBd3", "public", "uni/tn-test3/ap-testApp/epg-testepg", "shared"],
+            ],
         ),
         (
             {
-                bd_api: read_data(dir, "fvBD.json"),
-                epg_api: read_data(dir, "fvAEPg_pos.json"),
-                "fvRsBd.json": read_data(dir, "fvRsBd.json"),
+                fvSubnet: subnets("fvBD.json", "fvAEPg_pos.json"),
+                fvRsBd: read_data(dir, "fvRsBd.json"),
             },
             "5.1(1a)",
             script.FAIL_O,
+            [
+                ["uni/tn-common/BD-myBd2", "public", "uni/tn-test/ap-testApp/epg-testepg", "shared"],
+                ["uni/tn-test3/BD-myBd3", "public", "uni/tn-test3/ap-testApp/epg-testepg", "shared"],
+            ],
         ),
         (
             {
-                bd_api: read_data(dir, "fvBD.json"),
-                epg_api: read_data(dir, "fvAEPg_neg.json"),
-                "fvRsBd.json": read_data(dir, "fvRsBd.json"),
+                fvSubnet: subnets("fvBD.json", "fvAEPg_neg.json"),
+                fvRsBd: read_data(dir, "fvRsBd.json"),
             },
             "5.1(1a)",
             script.PASS,
+            [],
         ),
         (
             {
-                bd_api: read_data(dir, "fvBD.json"),
-                epg_api: read_data(dir, "fvAEPg_neg.json"),
-                "fvRsBd.json": read_data(dir, "fvRsBd.json"),
+                fvSubnet: subnets("fvBD.json", "fvAEPg_neg.json"),
+                fvRsBd: read_data(dir, "fvRsBd.json"),
             },
             "5.2(8h)",
-            script.PASS,
+            script.NA,
+            [],
         ),
     ],
 )
-def test_logic(run_check, mock_icurl, cversion, expected_result):
+def test_logic(run_check, mock_icurl, cversion, expected_result, expected_data):
     result = run_check(cversion=script.AciVersion(cversion))
     assert result.result == expected_result
+    assert result.data == expected_data
+
+
+def _subnet(parent_dn, ip, scope):
+    dn = "{}/subnet-[{}]".format(parent_dn, ip)
+    return {"fvSubnet": {"attributes": {"dn": dn, "ip": ip, "scope": scope}}}
+
+
+def _rsbd(epg_dn, bd_dn):
+    return {"fvRsBd": {"attributes": {"dn": epg_dn + "/rsbd", "tDn": bd_dn}}}
+
+
+@pytest.mark.parametrize(
+    "icurl_outputs",
+    [
+        {
+            fvSubnet: [
+                _subnet("uni/tn-t1/ap-ap1/epg-e1", "10.0.1.1/24", "private"),
+                _subnet("uni/tn-t1/ap-ap1/epg-e1", "10.0.2.1/24", "private"),
+                _subnet("uni/tn-t1/ap-ap1/epg-e2", "10.0.1.1/24", "private"),
+                _subnet("uni/tn-t1/BD-bd1", "10.0.1.1/24", "public"),
+                _subnet("uni/tn-t1/BD-bd1", "10.0.2.1/24", "public"),
+            ],
+            fvRsBd: [
+                _rsbd("uni/tn-t1/ap-ap1/epg-e1", "uni/tn-t1/BD-bd1"),
+                _rsbd("uni/tn-t1/ap-ap1/epg-e2", "uni/tn-t1/BD-bd1"),
+            ],
+        }
+    ],
+)
+def test_row_order(run_check, mock_icurl):
+    # Rows are listed per BD subnet, then per EPG in the BD
+    result = run_check(cversion=script.AciVersion("5.1(1a)"))
+    assert result.result == script.FAIL_O
+    assert result.data == [
+        ["uni/tn-t1/BD-bd1", "public", "uni/tn-t1/ap-ap1/epg-e1", "private"],
+        ["uni/tn-t1/BD-bd1", "public", "uni/tn-t1/ap-ap1/epg-e2", "private"],
+        ["uni/tn-t1/BD-bd1", "public", "uni/tn-t1/ap-ap1/epg-e1", "private"],
+        ["uni/tn-t1/BD-bd1", "public", "uni/tn-t1/ap-ap1/epg-e2", "None"],
+    ]
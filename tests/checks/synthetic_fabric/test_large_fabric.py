@@ -0,0 +1,29 @@
+import os
+import pytest
+import importlib
+from helpers.synthetic_fabric import SyntheticFabric, LARGE_FABRIC
+
+script = importlib.import_module("aci-preupgrade-validation-script")
+
+# Opt-in since building and checking LARGE_FABRIC takes a while
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("RUN_LARGE_FABRIC"), reason="Set RUN_LARGE_FABRIC=1 to run checks against LARGE_FABRIC"
+)
+
+test_function = "overlapping_vlan_pools_check"
+
+
+@pytest.fixture(scope="module")
+def fabric():
+    return SyntheticFabric(seed=1, **LARGE_FABRIC)
+
+
+@pytest.fixture
+def icurl_outputs(fabric):
+    return fabric.icurl_outputs(page_size=50000)
+
+
+def test_overlapping_vlan_pools_check(run_check, mock_icurl):
+    result = run_check()
+    assert result.result == script.MANUAL
+    assert len(result.data) == 4
@@ -0,0 +1,109 @@
+import pytest
+import importlib
+from helpers.synthetic_fabric import SyntheticFabric, ACCESS_POLICY_QUERY
+
+script = importlib.import_module("aci-preupgrade-validation-script")
+
+test_function = "overlapping_vlan_pools_check"
+
+sizes = {
+    "pods": 2,
+    "leaves": 20,
+    "tenants": 4,
+    "vrfs": 10,
+    "bds": 50,
+    "bd_subnets": 120,
+    "epgs": 200,
+    "vlan_pools": 6,
+    "vlan_blocks": 300,
+    "aeps": 6,
+    "epg_deployments": 1500,
+    "l3outs": 10,
+    "faults": 30,
+}
+fabric = SyntheticFabric(seed=1, **sizes)
+subnet_overlap_query = 'faultInst.json?query-target-filter=wcard(faultInst.changeSet,"subnet-overlap")'
+
+
+@pytest.fixture
+def icurl_outputs():
+    outputs = fabric.icurl_outputs(page_size=100)
+    outputs[subnet_overlap_query] = fabric.response(
+        "faultInst", page_size=100, predicate=lambda f: f["changeSet"] == "subnet-overlap"
+    )
+    return outputs
+
+
+def test_seed():
+    assert SyntheticFabric(seed=1, **sizes).mos == fabric.mos
+    assert SyntheticFabric(seed=2, **sizes).mos != fabric.mos
+
+
+def test_sizes():
+    roles = [node["role"] for node in fabric.get("fabricNode")]
+    assert roles.count("leaf") == 20
+    assert roles.count("controller") == 3
+    assert len(fabric.get("fvnsEncapBlk")) == 300
+    assert len(fabric.get("fvSubnet")) == 120
+    assert len(fabric.get("fvAEPg")) == 200
+    assert len(fabric.get("fvRsPathAtt")) == 1500
+    assert len(fabric.get("fvIfConn")) > 1500
+    assert len(fabric.get("l3extOut")) == 10
+    assert len(fabric.get("faultInst")) == 30
+
+
+def test_relations():
+    dns = set(mo["dn"] for mos in fabric.mos.values() for mo in mos)
+    for classname in ["fvRsCtx", "fvRsBd", "fvRsDomAtt", "l3extRsEctx", "infraRsAccBaseGrp", "infraRsAttEntP",
+                      "infraRsAccPortP", "l2RtL2IfPol", "infraRsDomP"]:
+        for mo in fabric.get(classname):
+            if classname in ["fvRsDomAtt", "infraRsDomP"]:
+                # Domains are only referred by the VLAN pools
+                assert mo["tDn"] in fabric.vlans_per_dom
+            else:
+                assert mo["tDn"] in dns, "{} has no target".format(mo["dn"])
+
+
+def test_pages(mock_icurl):
+    pages = fabric.icurl_outputs(page_size=100)["fvIfConn.json"]
+    assert len(pages) > 1
+    assert all(page["totalCount"] == str(len(fabric.get("fvIfConn"))) for page in pages)
+    assert script.icurl("class", "fvIfConn.json") == fabric.mo_list("fvIfConn")
+
+    faults = script.icurl("class", subnet_overlap_query)
+    assert faults
+    assert all(f["faultInst"]["attributes"]["code"] == "F1425" for f in faults)
+
+
+def test_access_policy(mock_icurl):
+    access_policy = script.AciAccessPolicyParser(script.icurl("class", ACCESS_POLICY_QUERY))
+    assert sorted(access_policy.vpool_per_dom) == sorted(fabric.vlans_per_dom)
+
+    conn_dns = [mo["dn"] for mo in fabric.get("fvIfConn")]
+    ports_per_epg = script.get_ports_per_epg(conn_dns, dict(access_policy.port_data))
+    ports = [port for ports in ports_per_epg.values() for port in ports]
+    # Every deployment is on a port with a domain that has the VLAN in its pool
+    assert len(ports) == len(conn_dns)
+    for port in ports:
+        vlan_ids = set()
+        for dom_dn in port["domain_dns"]:
+            vlan_ids.update(access_policy.vpool_per_dom[dom_dn]["vlan_ids"])
+        assert int(port["vlan"]) in vlan_ids
+
+
+def test_VrfModel(mock_icurl):
+    vrf_model = script.VrfModel()
+    assert vrf_model.bd_to_vrf == dict(fabric.bd_vrfs)
+    assert sum(len(subnets) for subnets in vrf_model.bd_to_subnets.values()) == 120
+
+
+def test_overlapping_vlan_pools_check(run_check, mock_icurl):
+    result = run_check()
+    assert result.result == script.MANUAL
+    assert len(result.data) == 1
+    row = result.data[0]
+    assert row[:7] == ["TN2", "AP0", "EPG82", "102", "eth1/2", "global", "1389"]
+    # Pools are not in a fixed order
+    assert sorted(row[7].split(", ")) == ["VLANPOOL2(PHYS2)", "VLANPOOL4(PHYS4)"]
+    assert row[8] == "Flood Scope"
+
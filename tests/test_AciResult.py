@@ -240,3 +240,33 @@ def test_mismatched_lengths(headers, data):
             column=headers,
             rows=data,
         )
+
+
+@pytest.mark.parametrize(
+    "columnar_rows, expected_version",
+    [
+        (None, None),
+        (2, None),
+        (1, AciResult.DETAILS_V2),
+    ],
+)
+def test_columnar_failure_details(columnar_rows, expected_version):
+    result_obj = Result(
+        result=script.FAIL_O,
+        headers=["col1", "col2"],
+        data=[["row1", 1], ["row2", 2]],
+    )
+    synth = AciResult("func_name", "Check Title", result_obj, columnar_rows)
+    assert synth.failureDetails.get("version") == expected_version
+    if expected_version == AciResult.DETAILS_V2:
+        assert synth.failureDetails["data"] == [["row1", "1"], ["row2", "2"]]
+    else:
+        assert synth.failureDetails["data"] == [
+            {"col1": "row1", "col2": "1"},
+            {"col1": "row2", "col2": "2"},
+        ]
+
+
+def test_columnar_mismatched_lengths():
+    with pytest.raises(ValueError):
+        AciResult.convert_data_columnar(["col1", "col2"], [["row1"]])
@@ -1,5 +1,6 @@
 import pytest
 import importlib
+import sys
 
 script = importlib.import_module("aci-preupgrade-validation-script")
 
@@ -103,3 +104,46 @@ def test_invalid_version():
 
     with pytest.raises(ValueError):
         script.AciVersion("5.2(7)")
+
+
+def test_cached_instance():
+    assert script.AciVersion("5.2(7f)") is script.AciVersion("5.2(7f)")
+    # Different strings for the same version are different cache entries, but equal.
+    v1 = script.AciVersion("5.2(7f)")
+    v2 = script.AciVersion("aci-apic-dk9.5.2.7f.bin")
+    assert v1 is not v2
+    assert v1 == v2
+    assert hash(v1) == hash(v2)
+    assert len({v1, v2}) == 1
+
+
+def test_sort_and_min():
+    versions = ["6.0(2h)", "5.2(7.123a)", "5.2(7f)", "5.2(7.123)", "4.2(7l)", "5.2(10f)"]
+    sorted_versions = sorted(script.AciVersion(v) for v in versions)
+    assert [str(v) for v in sorted_versions] == [
+        "4.2(7l)", "5.2(7f)", "5.2(7.123)", "5.2(7.123a)", "5.2(10f)", "6.0(2h)"
+    ]
+    assert str(min(script.AciVersion(v) for v in versions)) == "4.2(7l)"
+
+
+def test_rich_comparison():
+    v = script.AciVersion("5.2(7f)")
+    assert v < script.AciVersion("5.2(7g)")
+    assert v <= "5.2(7f)"
+    assert v > "5.2(1a)"
+    assert v >= script.AciVersion("5.2(7f)")
+    assert v == "5.2.7f"
+    assert v != "5.2(7g)"
+    # Non-version values are never equal to a version
+    assert v != "invalid_version"
+    assert v != None  # noqa: E711
+    # python2 falls back to the default ordering instead of TypeError
+    if sys.version_info[0] >= 3:
+        with pytest.raises(TypeError):
+            v < "invalid_version"
+
+
+def test_pickle():
+    import pickle
+    v = script.AciVersion("5.2(7.123a)")
+    assert pickle.loads(pickle.dumps(v, protocol=2)) == v
@@ -0,0 +1,68 @@
+import time
+import pytest
+import importlib
+
+script = importlib.import_module("aci-preupgrade-validation-script")
+CancelToken = script.CancelToken
+CheckCancelled = script.CheckCancelled
+
+
+@pytest.fixture
+def token():
+    def _token(timeout=None):
+        t = CancelToken(timeout)
+        CancelToken.set_current(t)
+        return t
+    yield _token
+    CancelToken.set_current(None)
+
+
+def test_no_budget():
+    t = CancelToken()
+    assert t.remaining() is None
+    assert not t.is_cancelled()
+    t.raise_if_cancelled()
+
+
+def test_budget():
+    t = CancelToken(0.1)
+    assert 0 < t.remaining() <= 0.1
+    time.sleep(0.15)
+    assert t.remaining() == 0
+    assert t.is_cancelled()
+    with pytest.raises(CheckCancelled, match=r"Timeout. Unable to finish in time \(0.1 sec\)."):
+        t.raise_if_cancelled()
+
+
+def test_cancel():
+    t = CancelToken(600)
+    t.cancel()
+    assert t.is_cancelled()
+    with pytest.raises(CheckCancelled, match="Cancelled due to the script timeout."):
+        t.raise_if_cancelled()
+
+
+def test_io_boundaries(token, mock_icurl):
+    # Not cancelled. I/O goes through.
+    token()
+    assert script.run_cmd("echo hello") == ["hello"]
+
+    token().cancel()
+    with pytest.raises(CheckCancelled):
+        script.icurl("class", "fabricNode.json")
+    with pytest.raises(CheckCancelled):
+        script.run_cmd("echo hello")
+    with pytest.raises(CheckCancelled):
+        script.Connection("10.0.0.1").cmd("show version")
+
+
+def test_current_is_per_thread(token):
+    import threading
+
+    t = token()
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(CancelToken.current()))
+    thread.start()
+    thread.join()
+    assert CancelToken.current() is t
+    assert seen == [None]
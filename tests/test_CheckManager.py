@@ -418,6 +418,176 @@ def test_monitor_timeout():
     )
 
 
+def test_workers():
+    @check_wrapper(check_title="Good Check")
+    def good_check(**kwargs):
+        return Result(result=script.PASS)
+
+    @check_wrapper(check_title="Bad Check With Bad Finalizer")
+    def bad_check_with_bad_finalizer(**kwargs):
+        raise Exception("Bad check to test finalize_check failure")
+
+    @check_wrapper(check_title="Timeout Check")
+    def timeout_check(**kwargs):
+        time.sleep(60)
+
+    cm = CheckManager(timeout=1, workers=1)
+    cm.check_funcs = [good_check, timeout_check]
+    cm.initialize_checks()
+    cm.run_checks({"fake_common_data": True})
+    assert cm.get_check_result("good_check").result == script.PASS
+    assert_aci_result_file_with_error(
+        cm, "timeout_check", "Timeout Check", "Timeout. Unable to finish in time (1 sec)."
+    )
+
+    # Exception that escaped from a check is re-raised after all checks completed
+    cm = CheckManager(workers=2)
+    cm.check_funcs = [bad_check_with_bad_finalizer, good_check]
+    cm.initialize_checks()
+    finalize_check = cm.finalize_check
+    cm.finalize_check = lambda x, y: 1 / 0 if x == "bad_check_with_bad_finalizer" else finalize_check(x, y)
+    with pytest.raises(ZeroDivisionError):
+        cm.run_checks({"fake_common_data": True})
+    assert cm.get_check_result("good_check").result == script.PASS
+
+
+@pytest.mark.parametrize(
+    "max_threads, expected_result",
+    [
+        (None, 3),
+        (2, 2),
+    ],
+)
+def test_default_workers(monkeypatch, max_threads, expected_result):
+    monkeypatch.setattr(script, "get_default_worker_count", lambda: 3)
+    assert CheckManager(max_threads=max_threads, workers=0).workers == expected_result
+    assert CheckManager(max_threads=max_threads, workers=5).workers == 5
+    assert CheckManager(max_threads=max_threads).workers is None
+
+
+def test_providers(monkeypatch):
+    @check_wrapper(check_title="Good Provider Check", providers=["good_data"])
+    def good_provider_check(good_data, **kwargs):
+        return Result(result=script.PASS, msg=good_data)
+
+    @check_wrapper(check_title="Bad Provider Check", providers=["good_data", "bad_data"])
+    def bad_provider_check(**kwargs):
+        return Result(result=script.PASS)
+
+    @check_wrapper(check_title="No Provider Check")
+    def no_provider_check(**kwargs):
+        assert "good_data" not in kwargs
+        return Result(result=script.PASS)
+
+    def bad_data():
+        raise Exception("API response timeout")
+
+    monkeypatch.setattr(
+        CheckManager,
+        "shared_data_builders",
+        {"good_data": lambda: "shared data", "bad_data": bad_data, "unused_data": lambda: 1 / 0},
+    )
+    cm = CheckManager()
+    cm.check_funcs = [good_provider_check, bad_provider_check, no_provider_check]
+    cm.initialize_checks()
+
+    assert list(cm.get_providers(cm.check_funcs)) == ["good_data", "bad_data"]
+
+    cm.run_checks({"fake_common_data": True})
+    assert cm.get_check_result("good_provider_check").result == script.PASS
+    assert cm.get_check_result("good_provider_check").msg == "shared data"
+    assert cm.get_check_result("no_provider_check").result == script.PASS
+    assert_aci_result_file_with_error(
+        cm,
+        "bad_provider_check",
+        "Bad Provider Check",
+        "Skipped due to a failure in preparing shared data `bad_data`: API response timeout",
+    )
+
+
+def test_unknown_provider():
+    @check_wrapper(check_title="Unknown Provider Check", providers=["no_such_data"])
+    def unknown_provider_check(**kwargs):
+        return Result(result=script.PASS)
+
+    with pytest.raises(ValueError):
+        CheckManager().get_providers([unknown_provider_check])
+
+    # All providers used by the actual checks must be available
+    cm = CheckManager()
+    cm.get_providers(cm.check_funcs)
+
+
+def test_check_timeout(monkeypatch):
+    queries = []
+
+    def _mock_icurl(apitype, query, page=0, page_size=100000):
+        queries.append(query)
+        time.sleep(0.1)
+        return {"totalCount": "1", "imdata": [{}]}
+
+    monkeypatch.setattr(script, "_icurl", _mock_icurl)
+
+    @check_wrapper(check_title="Runaway Check", timeout=1)
+    def runaway_check(**kwargs):
+        while True:
+            script.icurl("class", "fabricNode.json")
+
+    @check_wrapper(check_title="Good Check")
+    def good_check(**kwargs):
+        return Result(result=script.PASS)
+
+    cm = CheckManager(check_timeouts={"good_check": 5})
+    cm.check_funcs = [runaway_check, good_check]
+    assert cm.get_check_timeouts(cm.check_funcs) == {"runaway_check": 1, "good_check": 5}
+    cm.initialize_checks()
+    cm.run_checks({"fake_common_data": True})
+
+    # The runaway check stopped issuing queries at its own deadline
+    assert not cm.timeout_event.is_set()
+    assert 5 <= len(queries) <= 11
+    assert cm.get_check_result("good_check").result == script.PASS
+    assert_aci_result_file_with_error(
+        cm, "runaway_check", "Runaway Check", "Timeout. Unable to finish in time (1 sec)."
+    )
+
+    # CLI overrides
+    assert CheckManager(check_timeouts={None: 300}).get_check_timeouts(cm.check_funcs) == {
+        "runaway_check": 300, "good_check": 300
+    }
+    assert CheckManager(check_timeouts={None: 300, "runaway_check": 10}).get_check_timeouts(cm.check_funcs) == {
+        "runaway_check": 10, "good_check": 300
+    }
+
+
+def test_monitor_timeout_cancels_checks(monkeypatch):
+    queries = []
+
+    def _mock_icurl(apitype, query, page=0, page_size=100000):
+        queries.append(query)
+        time.sleep(0.1)
+        return {"totalCount": "1", "imdata": [{}]}
+
+    monkeypatch.setattr(script, "_icurl", _mock_icurl)
+
+    @check_wrapper(check_title="Runaway Check")
+    def runaway_check(**kwargs):
+        while True:
+            script.icurl("class", "fabricNode.json")
+
+    cm = CheckManager(timeout=1)
+    cm.check_funcs = [runaway_check]
+    cm.initialize_checks()
+    cm.run_checks({"fake_common_data": True})
+    assert cm.timeout_event.is_set()
+
+    # No more queries after the script timeout
+    time.sleep(0.3)
+    count = len(queries)
+    time.sleep(0.3)
+    assert len(queries) == count
+
+
 def test_exception_in_finalize_check_on_thread_timeout():
     """Exception in failure callback. Should not catch the exception and let the script fail"""
     @check_wrapper(check_title="Timeout Check")
@@ -432,3 +602,192 @@ def test_exception_in_finalize_check_on_thread_timeout():
     with pytest.raises(ZeroDivisionError):
         cm.run_checks({"fake_common_data": True})
     assert cm.timeout_event.is_set()
+
+
+@pytest.mark.parametrize(
+    "affected_versions, versions, expected",
+    [
+        ({"cversion": "<6.0(2a)", "tversion": ">6.0(2a)"}, {"cversion": "5.2(8f)", "tversion": "6.0(3d)"}, True),
+        ({"cversion": "<6.0(2a)", "tversion": ">6.0(2a)"}, {"cversion": "6.0(2a)", "tversion": "6.0(3d)"}, False),
+        ({"cversion": "<6.0(2a)", "tversion": ">6.0(2a)"}, {"cversion": "5.2(8f)", "tversion": "6.0(2a)"}, False),
+        # Unknown version in the spec. The check should decide by itself.
+        ({"cversion": "<6.0(2a)", "tversion": ">6.0(2a)"}, {"cversion": "7.0(1a)", "tversion": None}, None),
+        ({"tversion": [">=6.1(2f), <=6.1(5e)", "==6.2(1g)"]}, {"tversion": "6.1(2f)"}, True),
+        ({"tversion": [">=6.1(2f), <=6.1(5e)", "==6.2(1g)"]}, {"tversion": "6.1(5e)"}, True),
+        ({"tversion": [">=6.1(2f), <=6.1(5e)", "==6.2(1g)"]}, {"tversion": "6.2(1g)"}, True),
+        ({"tversion": [">=6.1(2f), <=6.1(5e)", "==6.2(1g)"]}, {"tversion": "6.1(5f)"}, False),
+        ({"tversion": [">=6.1(2f), <=6.1(5e)", "==6.2(1g)"]}, {"tversion": "6.2(2a)"}, False),
+        ({"sw_cversion": "<16.0(1a)"}, {"sw_cversion": "15.2(8h)"}, True),
+    ],
+)
+def test_affected_versions(affected_versions, versions, expected):
+    versions = {key: AciVersion(v) if v else None for key, v in versions.items()}
+    assert script.AffectedVersions(affected_versions).is_affected(versions) is expected
+
+
+@pytest.mark.parametrize(
+    "affected_versions",
+    [
+        {"cversion": "6.0(2a)"},  # no operator
+        {"cversion": "<6.0(2a), =<6.1(1a)"},  # invalid operator
+        {"version": "<6.0(2a)"},  # unknown version key
+    ],
+)
+def test_affected_versions_invalid(affected_versions):
+    with pytest.raises(ValueError):
+        script.AffectedVersions(affected_versions)
+
+
+def test_version_not_affected_check():
+    executed = []
+
+    @check_wrapper(check_title="Version Gated Check", affected_versions={"tversion": ">=6.1(1a)"})
+    def version_gated_check(**kwargs):
+        executed.append(True)
+        return Result(result=script.FAIL_O)
+
+    cm = CheckManager()
+    cm.check_funcs = [version_gated_check]
+    cm.initialize_checks()
+
+    # Not affected -> N/A without running the check
+    assert cm.get_affected_check_funcs({"tversion": AciVersion("6.0(9d)")}) == []
+    cm.run_checks({"tversion": AciVersion("6.0(9d)")})
+    assert not executed
+    result = cm.get_check_result("version_gated_check")
+    assert result.result == script.NA
+    assert result.msg == script.VER_NOT_AFFECTED
+
+    # Affected -> the check runs
+    cm.run_checks({"tversion": AciVersion("6.1(1a)")})
+    assert executed
+    assert cm.get_check_result("version_gated_check").result == script.FAIL_O
+
+
+def test_processes():
+    pids = []
+
+    @check_wrapper(check_title="Process Check")
+    def process_check(**kwargs):
+        pids.append(script.run_in_process(os.getpid))
+        return Result(result=script.PASS)
+
+    cm = CheckManager(processes=2)
+    cm.check_funcs = [process_check]
+    cm.initialize_checks()
+    cm.run_checks({"fake_common_data": True})
+    assert cm.get_check_result("process_check").result == script.PASS
+    assert pids and pids[0] != os.getpid()
+    # The pool is closed with the checks
+    assert script.process_pool.processes == 0
+
+
+def test_memory_estimates(monkeypatch):
+    monkeypatch.setattr(script, "get_available_memory", lambda: 0)
+
+    @check_wrapper(check_title="Heavy Check", memory=1024 ** 3)
+    def heavy_check(**kwargs):
+        return Result(result=script.PASS)
+
+    @check_wrapper(check_title="Good Check")
+    def good_check(**kwargs):
+        return Result(result=script.PASS)
+
+    cm = CheckManager()
+    cm.check_funcs = [heavy_check, good_check]
+    assert cm.get_memory_estimates(cm.check_funcs) == {"heavy_check": 1024 ** 3}
+    cm.initialize_checks()
+    cm.run_checks({"fake_common_data": True})
+    assert cm.get_check_result("heavy_check").result == script.PASS
+    assert cm.get_check_result("good_check").result == script.PASS
+
+
+@pytest.mark.parametrize("json_results", ["live", "end"])
+def test_json_results_from_journal(tmp_path, json_results):
+    @check_wrapper(check_title="Journal Check")
+    def journal_check(**kwargs):
+        return Result(result=script.FAIL_O, msg="test reason")
+
+    journal_file = str(tmp_path / "results.jsonl")
+    cm = CheckManager(json_results=json_results, result_journal=journal_file)
+    cm.check_funcs = [journal_check]
+    cm.initialize_checks()
+    cm.run_checks({"fake_common_data": True})
+
+    with open(cm.rm.get_result_filepath("journal_check"), "r") as f:
+        assert json.load(f)["ruleStatus"] == AciResult.FAIL
+    states = script.ResultJournal.replay(journal_file)
+    assert states["journal_check"]["ruleStatus"] == AciResult.FAIL
+
+
+def test_rerun_from_previous_run(monkeypatch, tmp_path):
+    monkeypatch.setattr(script, "get_class_fingerprint", lambda class_name: [1, "ts-" + class_name])
+    ran = []
+
+    def fake_check_factory(check_id, classes=None):
+        @check_wrapper(check_title=check_id, classes=classes)
+        def fake_check(**kwargs):
+            ran.append(check_id)
+            return Result(result=script.PASS)
+        fake_check.__name__ = check_id
+        return fake_check
+
+    check_funcs = [
+        fake_check_factory("rerun_pass_check"),
+        fake_check_factory("rerun_fail_check"),
+        fake_check_factory("rerun_same_input_check", ["fvBD"]),
+        fake_check_factory("rerun_changed_input_check", ["fvAEPg"]),
+    ]
+    common_data = {"cversion": "5.2(8g)", "tversion": "6.0(5h)", "sw_cversion": "15.2(8g)"}
+    previous_run = script.PreviousRun(
+        "bundle.tgz",
+        results={
+            "rerun_pass_check": AciResult("rerun_pass_check", "t", Result(result=script.PASS)).as_dict(),
+            "rerun_fail_check": AciResult("rerun_fail_check", "t", Result(result=script.FAIL_O)).as_dict(),
+            "rerun_same_input_check": AciResult("rerun_same_input_check", "t", Result(result=script.NA)).as_dict(),
+            "rerun_changed_input_check": AciResult("rerun_changed_input_check", "t", Result(result=script.PASS)).as_dict(),
+        },
+        metadata=dict(common_data, script_version=script.SCRIPT_VERSION),
+        fingerprints={"fvBD": [1, "ts-fvBD"], "fvAEPg": [0, ""]},
+    )
+    fingerprint_file = str(tmp_path / "fingerprints.json")
+    cm = CheckManager(fingerprint_file=fingerprint_file, previous_run=previous_run)
+    cm.check_funcs = check_funcs
+    cm.initialize_checks()
+    reused = cm.select_reused_results(common_data)
+    cm.run_checks(common_data)
+
+    # A check without declared classes runs again even when it passed
+    assert reused == ["rerun_same_input_check"]
+    assert sorted(ran) == ["rerun_changed_input_check", "rerun_fail_check", "rerun_pass_check"]
+    assert cm.get_check_result("rerun_pass_check").result == script.PASS
+    assert cm.get_check_result("rerun_same_input_check").result == script.NA
+    with open(fingerprint_file, "r") as f:
+        assert json.load(f) == {"fvAEPg": [1, "ts-fvAEPg"], "fvBD": [1, "ts-fvBD"]}
+
+
+def test_fingerprints_without_previous_run(monkeypatch, tmp_path):
+    queried = []
+
+    def fake_get_class_fingerprint(class_name):
+        queried.append(class_name)
+        return [1, "ts-" + class_name]
+
+    monkeypatch.setattr(script, "get_class_fingerprint", fake_get_class_fingerprint)
+
+    @check_wrapper(check_title="Fingerprint Check", classes=["fvBD"])
+    def fingerprint_check(**kwargs):
+        return Result(result=script.PASS)
+
+    fingerprint_file = str(tmp_path / "fingerprints.json")
+    cm = CheckManager(fingerprint_file=fingerprint_file)
+    cm.check_funcs = [fingerprint_check]
+    cm.initialize_checks()
+    # No query before checks start without a previous run
+    assert cm.select_reused_results({}) == []
+    assert not queried
+    cm.run_checks({"fake_common_data": True})
+
+    assert queried == ["fvBD"]
+    with open(fingerprint_file, "r") as f:
+        assert json.load(f) == {"fvBD": [1, "ts-fvBD"]}
@@ -0,0 +1,77 @@
+import json
+import importlib
+
+script = importlib.import_module("aci-preupgrade-validation-script")
+CheckStats = script.CheckStats
+
+
+def check_a():
+    pass
+
+
+def check_b():
+    pass
+
+
+def check_c():
+    pass
+
+
+def test_record():
+    stats = CheckStats()
+    stats.record("check_a", 10.0, 100)
+    assert stats.checks["check_a"] == {"duration": 10.0, "memory": 100, "runs": 1}
+    stats.record("check_a", 20.0, 300)
+    assert stats.checks["check_a"] == {"duration": 15.0, "memory": 200, "runs": 2}
+    assert stats.expected_duration("check_a") == 15.0
+    assert stats.expected_duration("check_b") is None
+
+
+def test_record_without_memory():
+    stats = CheckStats()
+    # Not measured while other checks were running
+    stats.record("check_a", 10.0)
+    assert stats.checks["check_a"] == {"duration": 10.0, "memory": None, "runs": 1}
+    assert stats.expected_memory("check_a") is None
+    assert not stats.is_memory_heavy("check_a")
+    stats.record("check_a", 20.0, 300)
+    assert stats.checks["check_a"] == {"duration": 15.0, "memory": 300, "runs": 2}
+    stats.record("check_a", 30.0)
+    assert stats.checks["check_a"] == {"duration": 22.5, "memory": 300, "runs": 3}
+
+
+def test_is_memory_heavy():
+    stats = CheckStats()
+    stats.record("check_a", 1.0, CheckStats.heavy_memory)
+    stats.record("check_b", 1.0, CheckStats.heavy_memory - 1)
+    assert stats.is_memory_heavy("check_a")
+    assert not stats.is_memory_heavy("check_b")
+    assert not stats.is_memory_heavy("check_c")
+
+
+def test_sort():
+    stats = CheckStats()
+    stats.record("check_a", 1.0, 0)
+    stats.record("check_c", 5.0, 0)
+    # Unknown first, then the longest first
+    assert stats.sort([check_a, check_b, check_c]) == [check_b, check_c, check_a]
+
+
+def test_save_and_load(tmp_path):
+    filepath = str(tmp_path / "stats.json")
+    stats = CheckStats(filepath)
+    assert stats.checks == {}
+    stats.record("check_a", 2.5, 1024)
+    stats.save()
+
+    with open(filepath) as f:
+        assert json.load(f)["version"] == CheckStats.version
+    assert CheckStats(filepath).checks == {"check_a": {"duration": 2.5, "memory": 1024, "runs": 1}}
+
+
+def test_load_invalid_file(tmp_path):
+    filepath = tmp_path / "stats.json"
+    filepath.write_text(u"not json")
+    assert CheckStats(str(filepath)).checks == {}
+    filepath.write_text(u'{"version": 0, "checks": {"check_a": {}}}')
+    assert CheckStats(str(filepath)).checks == {}
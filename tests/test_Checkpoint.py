@@ -0,0 +1,266 @@
+import os
+import json
+import time
+import pickle
+import pytest
+import threading
+import importlib
+
+script = importlib.import_module("aci-preupgrade-validation-script")
+Checkpoint = script.Checkpoint
+CheckManager = script.CheckManager
+Result = script.Result
+check_wrapper = script.check_wrapper
+
+common_data = {"cversion": "5.2(8g)", "tversion": "6.0(5h)", "sw_cversion": "15.2(8g)"}
+
+
+@pytest.fixture
+def checkpoint_files(tmp_path):
+    return str(tmp_path / "checkpoint.json"), str(tmp_path / "checkpoint_data.json")
+
+
+def test_save_and_load(checkpoint_files):
+    checkpoint = Checkpoint(*checkpoint_files)
+    checkpoint.start(common_data)
+    checkpoint.add_result("pass_check", Result(result=script.PASS))
+    checkpoint.add_result("fail_check", Result(result=script.FAIL_O, headers=["H1"], data=[["d1"]]))
+    # ERROR is run again on resume
+    checkpoint.add_result("error_check", Result(result=script.ERROR, msg="SSH dropped"))
+    checkpoint.save(shared_data={"fake_data": {"key": [1, 2]}})
+    assert not os.path.exists(checkpoint_files[0] + ".tmp")
+
+    loaded = Checkpoint(*checkpoint_files)
+    assert loaded.load()
+    assert loaded.matches(common_data)
+    assert not loaded.matches(dict(common_data, tversion="6.1(1a)"))
+    assert list(loaded.results) == ["pass_check", "fail_check"]
+    assert loaded.results["fail_check"].data == [["d1"]]
+    assert loaded.shared_data == {"fake_data": {"key": [1, 2]}}
+
+    loaded.remove()
+    assert not any(os.path.exists(f) for f in checkpoint_files)
+
+
+def test_load_without_checkpoint(checkpoint_files):
+    checkpoint = Checkpoint(*checkpoint_files)
+    assert not checkpoint.load()
+    assert not checkpoint.results
+
+
+def test_VrfModel_in_checkpoint(checkpoint_files):
+    vrf_model = script.VrfModel()
+    vrf_model._indexes["vnid_to_vrf"] = {"2850816": "uni/tn-t1/ctx-v1"}
+    checkpoint = Checkpoint(*checkpoint_files)
+    checkpoint.start(common_data)
+    checkpoint.save(shared_data={"vrf_model": vrf_model})
+
+    loaded = Checkpoint(*checkpoint_files)
+    assert loaded.load()
+    assert loaded.shared_data["vrf_model"].vnid_to_vrf == {"2850816": "uni/tn-t1/ctx-v1"}
+
+
+def test_AccessPolicy_in_checkpoint(checkpoint_files):
+    access_policy = script.AccessPolicy(
+        port_data={"101/eth1/1": {"aep": "aep1", "domain_dns": ["uni/phys-dom1"]}},
+        vpool_per_dom={"uni/phys-dom1": {"name": "pool1", "vlan_ids": [10, 11]}},
+    )
+    checkpoint = Checkpoint(*checkpoint_files)
+    checkpoint.start(common_data)
+    checkpoint.save(shared_data={"access_policy": access_policy})
+
+    loaded = Checkpoint(*checkpoint_files)
+    assert loaded.load()
+    assert isinstance(loaded.shared_data["access_policy"], script.AccessPolicy)
+    assert loaded.shared_data["access_policy"].port_data == access_policy.port_data
+    assert loaded.shared_data["access_policy"].vpool_per_dom == access_policy.vpool_per_dom
+
+
+def test_save_if_due(checkpoint_files):
+    checkpoint = Checkpoint(*checkpoint_files, save_every=2, save_interval=3600)
+    checkpoint.start(common_data)
+    checkpoint.add_result("check1", Result(result=script.PASS))
+    checkpoint.save_if_due()
+    assert not os.path.exists(checkpoint_files[0])
+    checkpoint.add_result("check2", Result(result=script.PASS))
+    checkpoint.save_if_due()
+    loaded = Checkpoint(*checkpoint_files)
+    assert loaded.load()
+    assert list(loaded.results) == ["check1", "check2"]
+
+
+def test_save_if_due_interval(checkpoint_files):
+    checkpoint = Checkpoint(*checkpoint_files, save_every=100, save_interval=0)
+    checkpoint.start(common_data)
+    checkpoint.add_result("check1", Result(result=script.PASS))
+    checkpoint.save_if_due()
+    loaded = Checkpoint(*checkpoint_files)
+    assert loaded.load()
+    assert list(loaded.results) == ["check1"]
+
+
+def test_shared_data_not_serializable(checkpoint_files):
+    checkpoint = Checkpoint(*checkpoint_files)
+    checkpoint.start(common_data)
+    checkpoint.save(shared_data={"fake_data": {"key": [1, 2]}, "bad_data": object()})
+    with open(checkpoint_files[1]) as f:
+        assert json.load(f)["bad_data"] == {"class": None, "absent": True}
+
+    loaded = Checkpoint(*checkpoint_files)
+    assert loaded.load()
+    # Built again on resume
+    assert loaded.shared_data == {"fake_data": {"key": [1, 2]}}
+
+
+def test_pickled_data_not_loaded(checkpoint_files):
+    checkpoint = Checkpoint(*checkpoint_files)
+    checkpoint.start(common_data)
+    checkpoint.add_result("pass_check", Result(result=script.PASS))
+    checkpoint.save()
+    with open(checkpoint_files[1], "wb") as f:
+        f.write(pickle.dumps({"fake_data": "pickled data"}))
+
+    loaded = Checkpoint(*checkpoint_files)
+    assert loaded.load()
+    assert list(loaded.results) == ["pass_check"]
+    assert loaded.shared_data == {}
+
+
+def test_resume(checkpoint_files, monkeypatch):
+    ran = []
+    built = []
+
+    def fake_builder():
+        built.append(True)
+        return "new data"
+
+    monkeypatch.setitem(CheckManager.shared_data_builders, "fake_data", fake_builder)
+
+    def fake_check_factory(check_id):
+        @check_wrapper(check_title=check_id, providers=["fake_data"])
+        def fake_check(fake_data, **kwargs):
+            ran.append((check_id, fake_data))
+            return Result(result=script.PASS)
+        fake_check.__name__ = check_id
+        return fake_check
+
+    check_funcs = [fake_check_factory("resume_done_check"), fake_check_factory("resume_todo_check")]
+
+    # Interrupted run with one finished check
+    checkpoint = Checkpoint(*checkpoint_files)
+    checkpoint.start(common_data)
+    checkpoint.add_result("resume_done_check", Result(result=script.FAIL_O, msg="before"))
+    checkpoint.save(shared_data={"fake_data": "checkpointed data"})
+
+    checkpoint = Checkpoint(*checkpoint_files, save_every=1)
+    assert checkpoint.load()
+    cm = CheckManager(checkpoint=checkpoint)
+    cm.check_funcs = check_funcs
+    cm.initialize_checks()
+    assert cm.select_resumed_results(common_data) == ["resume_done_check"]
+    cm.run_checks(common_data)
+
+    assert ran == [("resume_todo_check", "checkpointed data")]
+    assert not built
+    assert cm.get_check_result("resume_done_check").msg == "before"
+    assert cm.get_check_result("resume_todo_check").result == script.PASS
+
+    loaded = Checkpoint(*checkpoint_files)
+    assert loaded.load()
+    assert list(loaded.results) == ["resume_done_check", "resume_todo_check"]
+
+
+@pytest.fixture
+def save_calls(monkeypatch):
+    """Names of the threads saving shared data in a checkpoint"""
+    calls = []
+    _save = Checkpoint.save
+
+    def _recorded_save(self, shared_data=None):
+        if shared_data:
+            calls.append(threading.current_thread().name)
+        _save(self, shared_data)
+
+    monkeypatch.setattr(Checkpoint, "save", _recorded_save)
+    return calls
+
+
+def test_shared_data_saved_in_background(checkpoint_files, monkeypatch, save_calls):
+    check_started = threading.Event()
+    started_before_save = []
+
+    def fake_builder():
+        return "new data"
+
+    monkeypatch.setitem(CheckManager.shared_data_builders, "fake_data", fake_builder)
+    _save = Checkpoint.save
+
+    def slow_save(self, shared_data=None):
+        if shared_data:
+            started_before_save.append(check_started.wait(5))
+        _save(self, shared_data)
+
+    monkeypatch.setattr(Checkpoint, "save", slow_save)
+
+    @check_wrapper(check_title="Fake Check", providers=["fake_data"])
+    def fake_check(fake_data, **kwargs):
+        check_started.set()
+        return Result(result=script.PASS)
+
+    checkpoint = Checkpoint(*checkpoint_files)
+    cm = CheckManager(checkpoint=checkpoint)
+    cm.check_funcs = [fake_check]
+    cm.initialize_checks()
+    cm.select_resumed_results(common_data)
+    cm.run_checks(common_data)
+
+    # The check did not wait for the save. No other save at the end of a complete run.
+    assert started_before_save == [True]
+    assert save_calls == ["checkpoint-fake_data"]
+    loaded = Checkpoint(*checkpoint_files)
+    assert loaded.load()
+    assert loaded.shared_data == {"fake_data": "new data"}
+
+
+def test_shared_data_saved_on_timeout(checkpoint_files, monkeypatch, save_calls):
+    def fake_builder():
+        return "new data"
+
+    monkeypatch.setitem(CheckManager.shared_data_builders, "fake_data", fake_builder)
+
+    @check_wrapper(check_title="Timeout Check", providers=["fake_data"])
+    def timeout_check(fake_data, **kwargs):
+        time.sleep(2)
+
+    checkpoint = Checkpoint(*checkpoint_files)
+    cm = CheckManager(timeout=1, checkpoint=checkpoint)
+    cm.check_funcs = [timeout_check]
+    cm.initialize_checks()
+    cm.select_resumed_results(common_data)
+    cm.run_checks(common_data)
+
+    assert cm.timeout_event.is_set()
+    assert save_calls == ["checkpoint-fake_data", threading.current_thread().name]
+
+
+def test_resume_with_different_versions(checkpoint_files):
+    checkpoint = Checkpoint(*checkpoint_files)
+    checkpoint.start(common_data)
+    checkpoint.add_result("resume_done_check", Result(result=script.PASS))
+    checkpoint.save()
+
+    checkpoint = Checkpoint(*checkpoint_files)
+    assert checkpoint.load()
+    cm = CheckManager(checkpoint=checkpoint)
+    cm.check_funcs = []
+    assert cm.select_resumed_results(dict(common_data, tversion="6.1(1a)")) == []
+    assert not checkpoint.results
+
+
+def test_init_system_resume():
+    filepath = os.path.join(script.DIR, "interrupted_run.txt")
+    with open(filepath, "w") as f:
+        f.write("keep me")
+    script.init_system(resume=True)
+    assert os.path.exists(filepath)
+    os.remove(filepath)
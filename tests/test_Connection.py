@@ -0,0 +1,194 @@
+import os
+import sys
+import pytest
+import importlib
+import pexpect
+
+script = importlib.import_module("aci-preupgrade-validation-script")
+
+
+@pytest.fixture
+def conn():
+    """Connection logged into a local bash with an APIC-like prompt instead of SSH"""
+    c = script.Connection("localhost")
+    try:
+        c.child = pexpect.spawn(
+            "bash --norc --noprofile",
+            env={"PS1": "apic1# ", "PATH": "/usr/bin:/bin", "TERM": "dumb"},
+            searchwindowsize=c.searchwindowsize,
+        )
+        c.child.expect("# ", timeout=5)
+    except (pexpect.ExceptionPexpect, OSError):
+        pytest.skip("bash is not available")
+    c._login = True
+    c.timeout = 5
+    yield c
+    c.close()
+
+
+def test_run_batch(conn):
+    results = conn.run_batch([
+        "echo hello; echo world",
+        "ls /nonexistent_dir",
+        "true",
+    ])
+    assert results[0] == ("hello\r\nworld", 0)
+    assert "No such file or directory" in results[1][0]
+    assert results[1][1] == 2
+    assert results[2] == ("", 0)
+    assert conn.last_match == "prompt"
+
+    # The session is left at the prompt for the next command
+    conn.cmd("echo next")
+    assert "next\r\napic1# " in conn.output
+
+
+def test_run_batch_timeout(conn):
+    results = conn.run_batch(["echo a", "sleep 3", "echo b"], timeout=1)
+    assert results == [("a", 0), ("", None), ("", None)]
+    assert conn.last_match == "timeout"
+
+
+def test_run_batch_empty(conn):
+    assert conn.run_batch([]) == []
+
+
+def test_cmd_stream(conn):
+    lines = []
+    # Lines longer than chunks and more output than the tail
+    command = "seq 1 2000 | sed 's/.*/line-&-xxxxxxxxxx/'"
+    assert conn.cmd(command, on_line=lines.append, tail=100) == "prompt"
+    assert lines[0] == command  # echo of the command
+    assert lines[1:] == ["line-{}-xxxxxxxxxx".format(i) for i in range(1, 2001)]
+    assert len(conn.output) == 100
+    assert conn.output.endswith("line-2000-xxxxxxxxxx\r\napic1# ")
+
+    # The session is left at the prompt for the next command
+    conn.cmd("echo next")
+    assert "next\r\napic1# " in conn.output
+
+
+def test_cmd_stream_regex(conn):
+    matches = []
+    conn.cmd("printf '1.0G observer_8.db\\n11M observer_9.db\\n12G observer_10.db\\n'",
+             line_regex=r"(?P<size>\d+(?:\.\d)?G)\s(?P<file>observer_\d+.db)", on_line=matches.append)
+    assert [m.group("file") for m in matches] == ["observer_8.db", "observer_10.db"]
+
+
+def test_cmd_stream_prompt_in_line(conn):
+    lines = []
+    # A chunk ends right after "# " in the middle of a line
+    assert conn.cmd("printf 'abc# '; sleep 0.1; echo def", on_line=lines.append) == "prompt"
+    assert lines[1:] == ["abc# def"]
+    assert conn.output.endswith("abc# def\r\napic1# ")
+
+
+def test_cmd_stream_timeout(conn):
+    lines = []
+    assert conn.cmd("echo a; sleep 3", on_line=lines.append, timeout=1) == "timeout"
+    assert lines[1:] == ["a"]
+    assert conn.last_match == "timeout"
+
+
+FAKE_SSH = '''#!{python}
+"""Fake ssh emulating ControlMaster with a plain file as the socket"""
+import os
+import subprocess
+import sys
+
+args = sys.argv[1:]
+sock = args[args.index("-S") + 1]
+if "-O" in args:
+    op = args[args.index("-O") + 1]
+    if op == "check":
+        sys.exit(0 if os.path.exists(sock) else 255)
+    if op == "exit":
+        os.remove(sock)
+        sys.exit(0)
+if "ControlMaster=yes" in args:
+    sys.stdout.write("Password: ")
+    sys.stdout.flush()
+    if sys.stdin.readline().strip() != "{password}":
+        sys.stdout.write("Permission denied\\n")
+        sys.exit(255)
+    with open(sock, "w") as f:
+        f.write(" ".join(args))
+    sys.exit(0)
+if not os.path.exists(sock):
+    sys.exit(255)
+sys.exit(subprocess.call(["sh", "-c", args[-1]]))
+'''
+
+
+@pytest.fixture
+def master_conn(tmpdir):
+    ssh = tmpdir.join("ssh")
+    ssh.write(FAKE_SSH.format(python=sys.executable, password="pw"))
+    ssh.chmod(0o755)
+    c = script.Connection("10.0.0.1")
+    c.ssh = str(ssh)
+    c.password = "pw"
+    c.control_dir = str(tmpdir.join("control"))
+    c.timeout = 5
+    return c
+
+
+def test_control_master(master_conn):
+    c = master_conn
+    c.connect()
+    assert c.cmd("echo hello; ls /nonexistent_dir") == "prompt"
+    assert c.output.startswith("hello\n")
+    assert "No such file or directory" in c.output
+    assert c.exit_status == 2
+    assert os.path.exists(c.control_path)
+    assert c.run_batch(["echo a", "false", "echo b"]) == [("a\n", 0), ("", 1), ("b\n", 0)]
+
+    # Another connection to the same host reuses the master without password
+    c2 = script.Connection("10.0.0.1")
+    c2.ssh = c.ssh
+    c2.password = "wrong"
+    c2.control_dir = c.control_dir
+    c2.port = 22
+    assert c2.login()
+
+    c.close()
+    assert not os.path.exists(c.control_path)
+
+
+def test_control_master_persist(master_conn):
+    c = master_conn
+    c.connect()
+    assert c.login()
+    with open(c.control_path) as f:
+        assert "ControlPersist={}".format(script.SSH_CONTROL_PERSIST) in f.read().split()
+
+
+def test_control_master_gone(master_conn):
+    c = master_conn
+    c.connect()
+    assert c.cmd("echo ok") == "prompt"
+    # e.g. the master expired or was killed
+    os.remove(c.control_path)
+    assert c.cmd("echo ok") == "eof"
+    assert c.exit_status == 255
+    assert not c._login
+    # Login again with a new master
+    assert c.cmd("echo again") == "prompt"
+    assert c.output == "again\n"
+
+
+def test_control_master_timeout(master_conn):
+    c = master_conn
+    c.connect()
+    assert c.cmd("sleep 5", timeout=0.5) == "timeout"
+    assert c.exit_status is None
+    assert c.cmd("echo ok") == "prompt"
+    assert c.output == "ok\n"
+
+
+def test_control_master_login_failure(master_conn):
+    c = master_conn
+    c.password = "wrong"
+    c.connect()
+    with pytest.raises(Exception, match="failed to login"):
+        c.cmd("echo hello")
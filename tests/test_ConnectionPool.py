@@ -0,0 +1,191 @@
+import threading
+import time
+import pytest
+import importlib
+
+script = importlib.import_module("aci-preupgrade-validation-script")
+ConnectionPool = script.ConnectionPool
+Connection = script.Connection
+
+
+class FakeConnection(Connection):
+    connects = []
+    fail_hosts = set()
+
+    def connect(self):
+        if self.hostname in self.fail_hosts:
+            raise Exception("Simulated exception at connect()")
+        self.connects.append((self.hostname, self.username))
+
+    def cmd(self, command, **kargs):
+        self.last_match = "timeout" if command == "hang" else "prompt"
+        self.output = command
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    FakeConnection.connects = []
+    FakeConnection.fail_hosts = set()
+    monkeypatch.setattr(script, "Connection", FakeConnection)
+    pool = ConnectionPool()
+    yield pool
+    pool.close_all()
+
+
+def test_reuse(pool):
+    c1 = pool.acquire("10.0.0.1", "admin", "pw")
+    assert (c1.username, c1.password, c1.log) == ("admin", "pw", script.LOG_FILE)
+    pool.release(c1)
+    c2 = pool.acquire("10.0.0.1", "admin", "pw")
+    pool.release(c2)
+    c3 = pool.acquire("10.0.0.1", "rescue-user")
+    pool.release(c3)
+    c4 = pool.acquire("10.0.0.2", "admin", "pw")
+    pool.release(c4)
+    assert c1 is c2
+    assert c3 is not c1
+    assert c4 is not c1
+    assert FakeConnection.connects == [
+        ("10.0.0.1", "admin"),
+        ("10.0.0.1", "rescue-user"),
+        ("10.0.0.2", "admin"),
+    ]
+
+    pool.close_all()
+    assert c1.closed and c3.closed and c4.closed
+    c5 = pool.acquire("10.0.0.1", "admin", "pw")
+    pool.release(c5)
+    assert c5 is not c1
+
+
+def test_exclusive_per_host(pool):
+    using = []
+    max_using = []
+
+    def _use(host):
+        c = pool.acquire(host, "admin", "pw")
+        try:
+            using.append(host)
+            max_using.append(using.count(host))
+            time.sleep(0.1)
+            using.remove(host)
+        finally:
+            pool.release(c)
+
+    threads = [threading.Thread(target=_use, args=(host,)) for host in ["a", "a", "a", "b", "b"]]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert max(max_using) == 1
+    assert sorted(FakeConnection.connects) == [("a", "admin"), ("b", "admin")]
+
+
+def test_discard_broken_session(pool):
+    c1 = pool.acquire("10.0.0.1", "admin", "pw")
+    c1.cmd("hang")
+    pool.release(c1)
+    assert c1.closed
+    c2 = pool.acquire("10.0.0.1", "admin", "pw")
+    pool.release(c2)
+    assert c2 is not c1
+
+
+def test_discard_session_released_as_broken(pool):
+    c1 = pool.acquire("10.0.0.1", "admin", "pw")
+    c1.cmd("hostname")
+    pool.release(c1, broken=True)
+    assert c1.closed
+    c2 = pool.acquire("10.0.0.1", "admin", "pw")
+    pool.release(c2)
+    assert c2 is not c1
+
+
+def test_discard_session_after_exception_in_cmd(pool):
+    c1 = pool.acquire("10.0.0.1", "admin", "pw")
+    c1.cmd("hostname")
+    assert c1.last_match == "prompt"
+    # The real `cmd()` fails after the previous command completed
+    c1.login = lambda: False
+    with pytest.raises(Exception, match="failed to login"):
+        Connection.cmd(c1, "hostname")
+    assert c1.last_match == "error"
+    pool.release(c1)
+    assert c1.closed
+    c2 = pool.acquire("10.0.0.1", "admin", "pw")
+    pool.release(c2)
+    assert c2 is not c1
+
+
+def test_connect_failure(pool):
+    FakeConnection.fail_hosts.add("10.0.0.1")
+    with pytest.raises(Exception, match="Simulated exception at connect"):
+        pool.acquire("10.0.0.1", "admin", "pw")
+    # The host is not left locked
+    FakeConnection.fail_hosts.clear()
+    c = pool.acquire("10.0.0.1", "admin", "pw")
+    pool.release(c)
+
+
+def test_cancelled_while_waiting(pool):
+    c = pool.acquire("10.0.0.1", "admin", "pw")
+    script.CancelToken.set_current(script.CancelToken(0.2))
+    try:
+        with pytest.raises(script.CheckCancelled):
+            pool.acquire("10.0.0.1", "admin", "pw")
+    finally:
+        script.CancelToken.set_current(None)
+        pool.release(c)
+
+
+@pytest.fixture
+def fanout_pool(monkeypatch, pool):
+    monkeypatch.setattr(script, "ssh_pool", pool)
+    return pool
+
+
+def test_ssh_fanout(fanout_pool):
+    FakeConnection.fail_hosts.add("h3")
+    running = []
+    max_running = []
+
+    def _run(c):
+        if c.hostname == "h4":
+            raise Exception("Simulated exception at cmd()")
+        running.append(c.hostname)
+        max_running.append(len(running))
+        time.sleep(0.2)
+        running.remove(c.hostname)
+        c.cmd("hostname")
+        return c.output + "@" + c.hostname
+
+    hosts = ["h1", "h2", "h3", "h4", "h5", "h6"]
+    start = time.time()
+    results = script.ssh_fanout(hosts, _run, "admin", "pw", parallel=2)
+    assert time.time() - start < 0.2 * 4
+    assert max(max_running) == 2
+    assert [r[0] for r in results] == ["hostname@h1", "hostname@h2", None, None, "hostname@h5", "hostname@h6"]
+    assert str(results[2][1]) == "Simulated exception at connect()"
+    assert str(results[3][1]) == "Simulated exception at cmd()"
+    # Sessions are returned to the pool unless `func` failed with them
+    for host in ["h1", "h4"]:
+        c = fanout_pool.acquire(host, "admin", "pw")
+        fanout_pool.release(c)
+    assert FakeConnection.connects.count(("h1", "admin")) == 1
+    assert FakeConnection.connects.count(("h4", "admin")) == 2
+
+
+def test_ssh_fanout_cancelled(fanout_pool):
+    def _run(c):
+        script.CancelToken.current().cancel()
+        script.check_cancelled()
+
+    script.CancelToken.set_current(script.CancelToken())
+    try:
+        with pytest.raises(script.CheckCancelled):
+            script.ssh_fanout(["h1", "h2"], _run, "admin", "pw")
+    finally:
+        script.CancelToken.set_current(None)
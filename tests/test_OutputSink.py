@@ -0,0 +1,59 @@
+import time
+import importlib
+
+script = importlib.import_module("aci-preupgrade-validation-script")
+OutputSink = script.OutputSink
+
+
+def read(filepath):
+    try:
+        with open(filepath, "r") as f:
+            return f.read()
+    except IOError:
+        return ""
+
+
+def test_buffered(tmp_path, capsys):
+    filepath = str(tmp_path / "result.txt")
+    sink = OutputSink(filepath, flush_interval=60)
+    sink.write("line1")
+    sink.write(ValueError("line2"), end="")
+    # Printed right away but not in the file yet
+    assert capsys.readouterr().out == "line1\nline2"
+    assert read(filepath) == ""
+    sink.flush()
+    assert read(filepath) == "line1\nline2"
+    sink.close()
+
+
+def test_flush_size(tmp_path):
+    filepath = str(tmp_path / "result.txt")
+    sink = OutputSink(filepath, flush_size=10, flush_interval=60)
+    sink.write("12345")
+    assert read(filepath) == ""
+    sink.write("67890")
+    assert read(filepath) == "12345\n67890\n"
+    sink.close()
+
+
+def test_flush_interval(tmp_path):
+    filepath = str(tmp_path / "result.txt")
+    sink = OutputSink(filepath, flush_interval=0.1)
+    sink.write("line1")
+    time.sleep(0.5)
+    assert read(filepath) == "line1\n"
+    sink.close()
+
+
+def test_progress(tmp_path, capsys):
+    filepath = str(tmp_path / "result.txt")
+    sink = OutputSink(filepath, flush_interval=60)
+    sink.write("start")
+    sink.write("Progress 1/2", end="\r", progress=True)
+    sink.write("Progress 2/2", end="\r", progress=True)
+    assert capsys.readouterr().out == "start\nProgress 1/2\rProgress 2/2\r"
+    # Only the last progress is written in the file
+    sink.write("end")
+    sink.write("Progress 1/1", end="\r", progress=True)
+    sink.close()
+    assert read(filepath) == "start\nProgress 2/2\nend\nProgress 1/1\n"
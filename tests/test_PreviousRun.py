@@ -0,0 +1,124 @@
+import os
+import json
+import pytest
+import importlib
+
+script = importlib.import_module("aci-preupgrade-validation-script")
+AciResult = script.AciResult
+Result = script.Result
+PreviousRun = script.PreviousRun
+check_wrapper = script.check_wrapper
+
+common_data = {"cversion": "5.2(8g)", "tversion": "6.0(5h)", "sw_cversion": "15.2(8g)"}
+metadata = dict(common_data, script_version=script.SCRIPT_VERSION)
+fingerprints = {"fvBD": [10, "2024-01-01T00:00:00.000+00:00"]}
+aci_results = [
+    AciResult("pass_check", "Pass", Result(result=script.PASS)).as_dict(),
+    AciResult("na_check", "N/A", Result(result=script.NA, msg="Not affected")).as_dict(),
+    AciResult("fail_check", "Fail", Result(result=script.FAIL_O, msg="Failed")).as_dict(),
+]
+
+
+@pytest.fixture
+def summary_file(tmp_path):
+    os.makedirs(str(tmp_path / "logs" / "json_results"))
+    files = {
+        "logs/meta.json": metadata,
+        "logs/fingerprints.json": fingerprints,
+        "logs/summary.json": {"TOTAL": 3},
+    }
+    for aci_result in aci_results:
+        files["logs/json_results/{}.json".format(aci_result["ruleId"])] = aci_result
+    for filepath, content in files.items():
+        with open(str(tmp_path / filepath), "w") as f:
+            json.dump(content, f)
+    return str(tmp_path / "logs" / "summary.json")
+
+
+@pytest.fixture
+def bundle_file(tmp_path, summary_file, monkeypatch):
+    monkeypatch.chdir(str(tmp_path))
+    bundle = script.ResultBundle()
+    bundle.open("bundle.tgz")
+    bundle.close("logs/")
+    return str(tmp_path / "bundle.tgz")
+
+
+@pytest.mark.parametrize("path_fixture", ["summary_file", "bundle_file"])
+def test_load(request, path_fixture):
+    path = request.getfixturevalue(path_fixture)
+    previous_run = PreviousRun.load(path)
+    assert sorted(previous_run.results) == ["fail_check", "na_check", "pass_check"]
+    assert previous_run.metadata == metadata
+    assert previous_run.fingerprints == fingerprints
+    assert previous_run.is_same_environment(common_data)
+    assert not previous_run.is_same_environment(dict(common_data, tversion="6.1(1a)"))
+
+
+def test_load_relative_summary(summary_file, monkeypatch):
+    # A bare filename in the directory of the previous run
+    monkeypatch.chdir(os.path.dirname(summary_file))
+    previous_run = PreviousRun.load("summary.json")
+    assert sorted(previous_run.results) == ["fail_check", "na_check", "pass_check"]
+    assert previous_run.metadata == metadata
+
+
+def test_load_no_results(tmp_path):
+    with open(str(tmp_path / "summary.json"), "w") as f:
+        json.dump({}, f)
+    os.makedirs(str(tmp_path / "json_results"))
+    with pytest.raises(ValueError):
+        PreviousRun.load(str(tmp_path / "summary.json"))
+
+
+@pytest.mark.parametrize(
+    "check_id, classes, current_fingerprints, expected_result",
+    [
+        # No declared classes. Always run again.
+        ("pass_check", None, {}, None),
+        ("na_check", None, {}, None),
+        ("pass_check", [], {}, None),
+        ("fail_check", ["fvBD"], fingerprints, None),
+        ("new_check", ["fvBD"], fingerprints, None),
+        ("pass_check", ["fvBD"], fingerprints, script.PASS),
+        ("na_check", ["fvBD"], fingerprints, script.NA),
+        # Input class changed
+        ("pass_check", ["fvBD"], {"fvBD": [11, "2024-01-02T00:00:00.000+00:00"]}, None),
+        # Failed to get the fingerprint
+        ("pass_check", ["fvBD"], {"fvBD": None}, None),
+        # Not in the previous run
+        ("pass_check", ["fvAEPg"], {"fvAEPg": [1, ""]}, None),
+    ],
+)
+def test_get_reusable_result(summary_file, check_id, classes, current_fingerprints, expected_result):
+    @check_wrapper(check_title="Fake", classes=classes)
+    def fake_check(**kwargs):
+        return Result(result=script.PASS)
+    fake_check.__name__ = check_id
+
+    previous_run = PreviousRun.load(summary_file)
+    r = previous_run.get_reusable_result(fake_check, current_fingerprints)
+    if expected_result is None:
+        assert r is None
+    else:
+        assert r.result == expected_result
+
+
+@pytest.fixture
+def icurl_outputs():
+    return {
+        "fvBD.json?order-by=fvBD.modTs|desc": {
+            "totalCount": "3000",
+            "imdata": [{"fvBD": {"attributes": {"dn": "uni/tn-t1/BD-bd1", "modTs": "2024-01-01T00:00:00.000+00:00"}}}],
+        },
+        "fvAEPg.json?order-by=fvAEPg.modTs|desc": [],
+    }
+
+
+def test_get_class_fingerprints(mock_icurl):
+    assert script.get_class_fingerprints(["fvBD", "fvAEPg", "fvCtx"]) == {
+        "fvBD": [3000, "2024-01-01T00:00:00.000+00:00"],
+        "fvAEPg": [0, ""],
+        # Query failed
+        "fvCtx": None,
+    }
@@ -0,0 +1,80 @@
+import os
+import time
+import pytest
+import importlib
+
+script = importlib.import_module("aci-preupgrade-validation-script")
+ProcessPool = script.ProcessPool
+CancelToken = script.CancelToken
+CheckCancelled = script.CheckCancelled
+
+
+def get_pid(*args):
+    return os.getpid(), args
+
+
+def fail():
+    raise ValueError("bad input")
+
+
+def sleep(sec):
+    time.sleep(sec)
+
+
+@pytest.fixture
+def pool():
+    pool = ProcessPool()
+    yield pool
+    pool.close()
+
+
+def test_without_pool(pool):
+    assert pool.processes == 0
+    assert pool.run(get_pid, 1, "a") == (os.getpid(), (1, "a"))
+
+
+@pytest.mark.parametrize("processes", [None, 0, -1])
+def test_disabled(pool, processes):
+    pool.start(processes)
+    assert pool.processes == 0
+    assert pool.run(get_pid)[0] == os.getpid()
+
+
+def test_run(pool):
+    pool.start(2)
+    assert pool.processes == 2
+    pid, args = pool.run(get_pid, [1, 2], {"a": "b"})
+    assert pid != os.getpid()
+    assert args == ([1, 2], {"a": "b"})
+
+    with pytest.raises(ValueError, match="bad input"):
+        pool.run(fail)
+
+    pool.close()
+    assert pool.processes == 0
+    assert pool.run(get_pid)[0] == os.getpid()
+
+
+def test_cancelled_while_waiting(pool):
+    pool.start(1)
+    CancelToken.set_current(CancelToken(0.5))
+    try:
+        start = time.time()
+        with pytest.raises(CheckCancelled):
+            pool.run(sleep, 30)
+        assert time.time() - start < 5
+    finally:
+        CancelToken.set_current(None)
+
+
+@pytest.mark.parametrize(
+    "cpu_count, expected_result",
+    [
+        (1, 0),
+        (2, 1),
+        (4, 3),
+        (16, 4),
+    ],
+)
+def test_get_default_process_count(cpu_count, expected_result):
+    assert script.get_default_process_count(cpu_count) == expected_result
@@ -0,0 +1,90 @@
+import os
+import json
+import tarfile
+import pytest
+import importlib
+
+script = importlib.import_module("aci-preupgrade-validation-script")
+ResultBundle = script.ResultBundle
+
+
+@pytest.fixture
+def logs_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(str(tmp_path))
+    os.makedirs("logs/json_results")
+    with open("logs/debug.log", "w") as f:
+        f.write("debug\n")
+    with open("logs/json_results/a_check.json", "w") as f:
+        f.write("{}")
+    return "logs/"
+
+
+@pytest.mark.parametrize(
+    "compresslevel, mode",
+    [
+        (6, "r:gz"),
+        (1, "r:gz"),
+        (0, "r:"),
+    ],
+)
+def test_ResultBundle(logs_dir, compresslevel, mode):
+    bundle = ResultBundle()
+    bundle.open("bundle", compresslevel)
+    assert bundle.is_open
+    bundle.add_json("logs/json_results/a_check.json", {"ruleId": "a_check"})
+    bundle.close(logs_dir)
+    assert not bundle.is_open
+
+    with tarfile.open("bundle", mode) as tar:
+        names = tar.getnames()
+        assert sorted(names) == ["logs", "logs/debug.log", "logs/json_results", "logs/json_results/a_check.json"]
+        # Added only once with the content given while running
+        assert names.count("logs/json_results/a_check.json") == 1
+        content = tar.extractfile("logs/json_results/a_check.json").read()
+        assert json.loads(content.decode("utf-8")) == {"ruleId": "a_check"}
+        assert tar.extractfile("logs/debug.log").read() == b"debug\n"
+
+
+def test_ResultBundle_add_json_when_closed(logs_dir):
+    bundle = ResultBundle()
+    # Ignored without an error
+    bundle.add_json("logs/json_results/a_check.json", {"ruleId": "a_check"})
+    assert not bundle.is_open
+
+
+def test_ResultBundle_partial(logs_dir):
+    bundle = ResultBundle()
+    bundle.open("bundle.tgz")
+    # Not under the final name until it is complete
+    assert os.path.exists("bundle.tgz.partial")
+    assert not os.path.exists("bundle.tgz")
+    bundle.close(logs_dir)
+    assert os.path.exists("bundle.tgz")
+    assert not os.path.exists("bundle.tgz.partial")
+    # No-op once closed
+    bundle.abort()
+    assert os.path.exists("bundle.tgz")
+
+
+def test_ResultBundle_abort(logs_dir):
+    bundle = ResultBundle()
+    bundle.open("bundle.tgz")
+    bundle.add_json("logs/json_results/a_check.json", {"ruleId": "a_check"})
+    bundle.abort()
+    assert not bundle.is_open
+    assert not os.path.exists("bundle.tgz.partial")
+    assert not os.path.exists("bundle.tgz")
+
+
+def test_ResultBundle_add_json_twice(logs_dir):
+    bundle = ResultBundle()
+    bundle.open("bundle", 0)
+    bundle.add_json("logs/json_results/a_check.json", {"result": "PASS"})
+    # e.g. a timeout reported while the check was being finalized
+    bundle.add_json("logs/json_results/a_check.json", {"result": "ERROR"})
+    bundle.close(logs_dir)
+
+    with tarfile.open("bundle", "r:") as tar:
+        assert tar.getnames().count("logs/json_results/a_check.json") == 1
+        content = tar.extractfile("logs/json_results/a_check.json").read()
+        assert json.loads(content.decode("utf-8")) == {"result": "PASS"}
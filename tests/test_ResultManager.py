@@ -1,5 +1,6 @@
 import importlib
 import json
+import os
 
 script = importlib.import_module("aci-preupgrade-validation-script")
 AciResult = script.AciResult
@@ -121,3 +122,62 @@ def test_ResultManager():
             expected_num = len([c for c in fake_checks_for_update if c["result_obj"].result == key and c["check_id"] != "no_init_check"])
 
         assert summary[key] == expected_num
+
+
+def test_ResultManager_deferred_json_files(tmp_path):
+    journal_file = str(tmp_path / "results.jsonl")
+    rm = script.ResultManager(json_files="deferred", journal_file=journal_file)
+    rm.init_result(check_id="puv_deferred_check", check_title="PUV Deferred")
+    filepath = rm.get_result_filepath("puv_deferred_check")
+    if os.path.exists(filepath):
+        os.remove(filepath)
+
+    rm.update_result(check_id="puv_deferred_check", result_obj=Result(result=script.FAIL_O, msg="test reason"))
+    # Only in the journal until flushed
+    assert not os.path.exists(filepath)
+    rm.flush_json_files()
+    with open(filepath, "r") as f:
+        assert json.load(f)["ruleStatus"] == AciResult.FAIL
+
+    rm.close()
+    with open(journal_file, "r") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["ruleStatus"] for line in lines] == [AciResult.IN_PROGRESS, AciResult.FAIL]
+
+
+def test_ResultJournal_replay(tmp_path):
+    journal_file = str(tmp_path / "results.jsonl")
+    journal = script.ResultJournal(journal_file, fsync_lines=2)
+    journal.append(AciResult("puv_1_check", "PUV 1").as_dict())
+    journal.append(AciResult("puv_2_check", "PUV 2").as_dict())
+    journal.append(AciResult("puv_1_check", "PUV 1", Result(result=script.PASS)).as_dict())
+    journal.close()
+    # A line broken by a crash in the middle of a write
+    with open(journal_file, "a") as f:
+        f.write('{"ruleId": "puv_2_check", "ruleSta')
+
+    states = script.ResultJournal.replay(journal_file)
+    assert list(states) == ["puv_1_check", "puv_2_check"]
+    assert states["puv_1_check"]["ruleStatus"] == AciResult.PASS
+    assert states["puv_2_check"]["ruleStatus"] == AciResult.IN_PROGRESS
+
+
+def test_ResultManager_columnar_rows():
+    rm = script.ResultManager(columnar_rows=1)
+    rm.init_result(check_id="puv_columnar_check", check_title="PUV Columnar")
+    rm.init_result(check_id="puv_small_check", check_title="PUV Small")
+    data = [["row1", "row2"], ["row3", "row4"]]
+    rm.update_result("puv_columnar_check", Result(result=script.FAIL_O, headers=["col1", "col2"], data=data))
+    rm.update_result("puv_small_check", Result(result=script.FAIL_O, headers=["col1", "col2"], data=data[:1]))
+
+    with open(rm.get_result_filepath("puv_columnar_check"), "r") as f:
+        content = f.read()
+    assert "\n" not in content
+    aci_result = json.loads(content)
+    assert aci_result["failureDetails"]["version"] == AciResult.DETAILS_V2
+    assert aci_result["failureDetails"]["data"] == data
+
+    with open(rm.get_result_filepath("puv_small_check"), "r") as f:
+        aci_result = json.load(f)
+    assert "version" not in aci_result["failureDetails"]
+    assert aci_result["failureDetails"]["data"] == [{"col1": "row1", "col2": "row2"}]
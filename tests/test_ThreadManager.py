@@ -1,5 +1,8 @@
 from __future__ import print_function
+import pytest
 import importlib
+import io
+import threading
 import time
 
 script = importlib.import_module("aci-preupgrade-validation-script")
@@ -73,3 +76,367 @@ Thread task3: Finishing with data common_data
 """
     captured = capsys.readouterr()
     assert captured.out == expected_output
+
+
+def test_ThreadManager_workers():
+    finished = []
+
+    def make_task(name, sec):
+        def task(data=""):
+            time.sleep(sec)
+            finished.append((name, threading.current_thread().name))
+        task.__name__ = name
+        return task
+
+    progress = []
+    tm = script.ThreadManager(
+        funcs=[make_task("task{}".format(i), 0.1) for i in range(6)],
+        common_kwargs={"data": "common_data"},
+        workers=2,
+        callback_on_monitoring=lambda done, total: progress.append((done, total)),
+    )
+    tm.start()
+    tm.join()
+
+    assert len(tm.threads) == 2
+    assert sorted(name for name, _ in finished) == ["task{}".format(i) for i in range(6)]
+    assert set(worker for _, worker in finished) == {"worker-0", "worker-1"}
+    assert progress[-1] == (6, 6)
+    assert not tm.is_timeout()
+
+
+def test_ThreadManager_workers_timeout():
+    timed_out = []
+    tm = script.ThreadManager(
+        funcs=[task4, task5, task3],
+        common_kwargs={"data": "common_data"},
+        monitor_timeout=1,
+        workers=1,
+        callback_on_timeout=timed_out.append,
+    )
+    tm.start()
+    tm.join()
+
+    assert tm.is_timeout()
+    # Both the running check and the checks still in the queue are reported.
+    assert timed_out == ["task4", "task5", "task3"]
+
+
+@pytest.mark.parametrize(
+    "cpu_count, mem_available, expected_result",
+    [
+        (1, None, 4),
+        (4, 16 * 1024 ** 3, 16),
+        (64, 64 * 1024 ** 3, 32),
+        # Memory is the bottleneck
+        (4, 256 * 1024 ** 2, 4),
+        (4, 10 * 1024 ** 2, 1),
+    ],
+)
+def test_get_default_worker_count(monkeypatch, cpu_count, mem_available, expected_result):
+    if mem_available is None:
+        def _raise(*args, **kwargs):
+            raise IOError("No such file or directory: '/proc/meminfo'")
+        monkeypatch.setattr(script, "open", _raise, raising=False)
+    assert script.get_default_worker_count(cpu_count, mem_available) == expected_result
+
+
+def test_ThreadManager_completion_is_pushed():
+    progress = []
+    tm = script.ThreadManager(
+        funcs=[lambda data="": None for _ in range(3)],
+        common_kwargs={"data": "common_data"},
+        callback_on_monitoring=lambda done, total: progress.append((done, total)),
+    )
+    start = time.time()
+    tm.start()
+    tm.join()
+
+    # No polling interval to wait for at the end
+    assert time.time() - start < 0.5
+    assert progress[0] in [(0, 3), (1, 3), (2, 3), (3, 3)]
+    assert progress[-1] == (3, 3)
+    # Each update is reported once
+    assert progress == sorted(set(progress))
+
+
+@pytest.mark.parametrize("workers", [None, 1])
+def test_ThreadManager_providers(workers):
+    events = []
+    provider_released = threading.Event()
+
+    def slow_provider():
+        provider_released.wait(5)
+        events.append("slow_provider")
+
+    def dependent_task(data=""):
+        events.append("dependent_task")
+
+    dependent_task.providers = ("slow_provider",)
+
+    def independent_task(data=""):
+        events.append("independent_task")
+        provider_released.set()
+
+    tm = script.ThreadManager(
+        funcs=[dependent_task, independent_task],
+        common_kwargs={"data": "common_data"},
+        workers=workers,
+        providers=[slow_provider],
+    )
+    tm.start()
+    tm.join()
+
+    # The independent task doesn't wait for the provider even though it's
+    # queued after the dependent one.
+    assert events == ["independent_task", "slow_provider", "dependent_task"]
+
+
+def test_ThreadManager_stats():
+    running = []
+    max_heavy_running = []
+
+    def make_task(name):
+        def task(data=""):
+            running.append(name)
+            max_heavy_running.append(len([n for n in running if n.startswith("heavy")]))
+            time.sleep(0.1)
+            running.remove(name)
+        task.__name__ = name
+        return task
+
+    stats = script.CheckStats()
+    stats.record("light_short", 1.0, 0)
+    stats.record("light_long", 9.0, 0)
+    stats.record("heavy1", 2.0, script.CheckStats.heavy_memory)
+    stats.record("heavy2", 3.0, script.CheckStats.heavy_memory)
+    funcs = [make_task(name) for name in ["light_short", "heavy1", "heavy2", "light_long", "new"]]
+
+    tm = script.ThreadManager(funcs=funcs, common_kwargs={}, stats=stats)
+    assert [func.__name__ for func in tm.funcs] == ["new", "light_long", "heavy2", "heavy1", "light_short"]
+    tm.start()
+    tm.join()
+
+    # Memory heavy checks never ran at the same time
+    assert max(max_heavy_running) == 1
+    # This run is recorded
+    assert stats.checks["new"]["runs"] == 1
+    assert stats.checks["heavy1"]["runs"] == 2
+
+
+def test_get_rss(monkeypatch):
+    def _open(path, *args, **kwargs):
+        assert path == "/proc/self/statm"
+        return io.StringIO(u"1000 200 50 10 0 300 0\n")
+    monkeypatch.setattr(script, "open", _open, raising=False)
+    assert script.get_rss() == 200 * script.resource.getpagesize()
+    monkeypatch.setattr(script, "open", lambda *a, **kw: io.StringIO(u""), raising=False)
+    assert script.get_rss() is None
+
+
+def test_ThreadManager_stats_memory(monkeypatch):
+    rss = [100]
+    both_running = threading.Barrier(2) if hasattr(threading, "Barrier") else None
+
+    def alone_task(data=""):
+        rss[0] += 50
+
+    def concurrent_task(data=""):
+        rss[0] += 1000
+        if both_running is not None:
+            both_running.wait(5)
+        else:
+            time.sleep(0.2)
+
+    def concurrent_task2(data=""):
+        concurrent_task(data)
+
+    monkeypatch.setattr(script, "get_rss", lambda: rss[0])
+    stats = script.CheckStats()
+    tm = script.ThreadManager(funcs=[alone_task], common_kwargs={}, stats=stats)
+    tm.start()
+    tm.join()
+    # The growth of the process memory while the check ran alone
+    assert stats.expected_memory("alone_task") == 50
+
+    tm = script.ThreadManager(funcs=[concurrent_task, concurrent_task2], common_kwargs={}, stats=stats)
+    tm.start()
+    tm.join()
+    # Not attributed to either of the checks running at the same time
+    assert stats.checks["concurrent_task"]["runs"] == 1
+    assert stats.expected_memory("concurrent_task") is None
+    assert stats.expected_memory("concurrent_task2") is None
+
+
+@pytest.mark.parametrize(
+    "files, expected_result",
+    [
+        # No cgroup limit
+        ({"/proc/meminfo": "MemTotal: 8000 kB\nMemAvailable: 4000 kB\n"}, 4000 * 1024),
+        # cgroup v2
+        (
+            {
+                "/proc/meminfo": "MemAvailable: 4000 kB\n",
+                "/sys/fs/cgroup/memory.max": "2048000\n",
+                "/sys/fs/cgroup/memory.current": "1024000\n",
+            },
+            1024000,
+        ),
+        (
+            {
+                "/proc/meminfo": "MemAvailable: 4000 kB\n",
+                "/sys/fs/cgroup/memory.max": "max\n",
+                "/sys/fs/cgroup/memory.current": "1024000\n",
+            },
+            4000 * 1024,
+        ),
+        # cgroup v1, unlimited and limited
+        (
+            {
+                "/proc/meminfo": "MemAvailable: 4000 kB\n",
+                "/sys/fs/cgroup/memory/memory.limit_in_bytes": "9223372036854771712\n",
+                "/sys/fs/cgroup/memory/memory.usage_in_bytes": "1024000\n",
+            },
+            4000 * 1024,
+        ),
+        (
+            {
+                "/sys/fs/cgroup/memory/memory.limit_in_bytes": "1024000\n",
+                "/sys/fs/cgroup/memory/memory.usage_in_bytes": "2048000\n",
+            },
+            0,
+        ),
+        ({}, None),
+    ],
+)
+def test_get_available_memory(monkeypatch, files, expected_result):
+    def _open(path, *args, **kwargs):
+        if path not in files:
+            raise IOError("No such file or directory: '{}'".format(path))
+        return io.StringIO(u"" + files[path])
+    monkeypatch.setattr(script, "open", _open, raising=False)
+    assert script.get_available_memory() == expected_result
+
+
+@pytest.mark.parametrize("workers", [None, 3])
+def test_ThreadManager_memory_admission(monkeypatch, workers):
+    mb = 1024 ** 2
+    running = []
+    max_running = []
+
+    def make_task(name):
+        def task(data=""):
+            running.append(name)
+            max_running.append(len(running))
+            time.sleep(0.2)
+            running.remove(name)
+        task.__name__ = name
+        return task
+
+    monkeypatch.setattr(script, "get_available_memory", lambda: 150 * mb)
+    stats = script.CheckStats()
+    stats.record("learned", 1.0, 60 * mb)
+    funcs = [make_task(name) for name in ["declared1", "declared2", "learned", "unknown"]]
+    tm = script.ThreadManager(
+        funcs=funcs,
+        common_kwargs={},
+        workers=workers,
+        stats=stats,
+        memory_estimates={"declared1": 60 * mb, "declared2": 60 * mb},
+    )
+    tm.start()
+    tm.join()
+
+    # All checks ran. Those with estimates waited for memory instead of failing.
+    assert sorted(tm._finished) == ["declared1", "declared2", "learned", "unknown"]
+    # Only two checks with estimates fit in 150 MB, plus the one without estimate
+    assert max(max_running) == 3
+    assert tm._admitted_memory == {}
+
+
+def test_ThreadManager_memory_admission_used_memory(monkeypatch):
+    mb = 1024 ** 2
+    available = [1000 * mb]
+    monkeypatch.setattr(script, "get_available_memory", lambda: available[0])
+    tm = script.ThreadManager(
+        funcs=[],
+        common_kwargs={},
+        memory_estimates={"check1": 500 * mb, "check2": 300 * mb, "check3": 300 * mb},
+    )
+    assert tm._admit_memory("check1")
+    # check1 used 400 MB of its 500 MB. Only the other 100 MB is still reserved.
+    available[0] = 600 * mb
+    assert tm._admit_memory("check2")
+    # 100 MB of check1 and 300 MB of check2 are reserved. 300 MB more does not fit.
+    assert not tm._admit_memory("check3")
+    assert tm._memory_waiting == set(["check3"])
+    # check2 used 200 MB. Still does not fit until check1 completed.
+    available[0] = 400 * mb
+    assert not tm._admit_memory("check3")
+    tm._notify_done("check1")
+    assert tm._admit_memory("check3")
+    assert tm._memory_waiting == set()
+
+
+@pytest.mark.parametrize(
+    "declared, learned, expected",
+    [
+        (None, None, None),
+        (60, None, 60),
+        (None, 60, 60),
+        (60, 100, 100),
+        (100, 60, 100),
+        # A learned 0 is not an estimate
+        (60, 0, 60),
+        (None, 0, None),
+    ],
+)
+def test_ThreadManager_memory_estimate(declared, learned, expected):
+    stats = script.CheckStats()
+    if learned is not None:
+        stats.record("task1", 1.0, learned)
+    tm = script.ThreadManager(
+        funcs=[task1],
+        common_kwargs={},
+        stats=stats,
+        memory_estimates={"task1": declared} if declared is not None else None,
+    )
+    assert tm._get_memory_estimate("task1") == expected
+
+
+def test_ThreadManager_start_thread_bounded_by_timeout(monkeypatch):
+    class OOMThread(object):
+        name = "oom_thread"
+
+        def start(self):
+            raise RuntimeError("can't start new thread")
+
+        def is_alive(self):
+            return False
+
+    class RunningThread(object):
+        def is_alive(self):
+            return True
+
+    sleeps = []
+    monkeypatch.setattr(script.time, "sleep", sleeps.append)
+    tm = script.ThreadManager(funcs=[], common_kwargs={}, monitor_timeout=30)
+    # Other check threads keep running
+    tm.threads = [RunningThread()]
+    assert not tm._start_thread(OOMThread(), use_semaphore=False)
+    # Waited up to the overall timeout, not forever
+    assert sum(sleeps) == 30
+
+
+def test_ThreadManager_memory_admission_first_check(monkeypatch):
+    # A check larger than the available memory still runs when nothing else does
+    monkeypatch.setattr(script, "get_available_memory", lambda: 0)
+    tm = script.ThreadManager(
+        funcs=[task1],
+        common_kwargs={"data": "common_data"},
+        monitor_timeout=5,
+        memory_estimates={"task1": 1024 ** 3},
+    )
+    tm.start()
+    tm.join()
+    assert tm._finished == set(["task1"])
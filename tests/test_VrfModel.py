@@ -0,0 +1,102 @@
+import pytest
+import importlib
+
+script = importlib.import_module("aci-preupgrade-validation-script")
+VrfModel = script.VrfModel
+
+
+fvCtx = [
+    {"fvCtx": {"attributes": {"dn": "uni/tn-t1/ctx-v1", "scope": "2850816"}}},
+    {"fvCtx": {"attributes": {"dn": "uni/tn-t1/ctx-v2", "scope": "2916352"}}},
+]
+fvRsCtx = [
+    {"fvRsCtx": {"attributes": {"dn": "uni/tn-t1/BD-bd1/rsctx", "tDn": "uni/tn-t1/ctx-v1"}}},
+    {"fvRsCtx": {"attributes": {"dn": "uni/tn-t1/BD-bd2/rsctx", "tDn": "uni/tn-t1/ctx-v1"}}},
+    {"fvRsCtx": {"attributes": {"dn": "uni/tn-t1/BD-bd3/rsctx", "tDn": "uni/tn-t1/ctx-v2"}}},
+]
+fvSubnet = [
+    {"fvSubnet": {"attributes": {"dn": "uni/tn-t1/BD-bd1/subnet-[10.0.1.1/24]", "ip": "10.0.1.1/24", "scope": "private"}}},
+    {"fvSubnet": {"attributes": {"dn": "uni/tn-t1/BD-bd2/subnet-[10.0.2.1/24]", "ip": "10.0.2.1/24", "scope": "public"}}},
+    {"fvSubnet": {"attributes": {"dn": "uni/tn-t1/ap-ap1/epg-epg1/subnet-[10.0.1.1/24]", "ip": "10.0.1.1/24", "scope": "public"}}},
+    # Subnets under other parents (i.e. service graph) are ignored
+    {"fvSubnet": {"attributes": {"dn": "uni/tn-t1/ldevCtx-c-c1-g-g1-n-N1/lIfCtx-c-consumer/subnet-[10.0.9.1/24]", "ip": "10.0.9.1/24", "scope": "private"}}},
+]
+fvRsBd = [
+    {"fvRsBd": {"attributes": {"dn": "uni/tn-t1/ap-ap1/epg-epg1/rsbd", "tDn": "uni/tn-t1/BD-bd1"}}},
+]
+l3extRsEctx = [
+    {"l3extRsEctx": {"attributes": {"dn": "uni/tn-t1/out-l3out1/rsectx", "tDn": "uni/tn-t1/ctx-v1"}}},
+    {"l3extRsEctx": {"attributes": {"dn": "uni/tn-t1/out-l3out2/rsectx", "tDn": "uni/tn-t1/ctx-v2"}}},
+]
+l3extSubnet = [
+    {"l3extSubnet": {"attributes": {"dn": "uni/tn-t1/out-l3out1/instP-epg1/extsubnet-[0.0.0.0/0]", "ip": "0.0.0.0/0", "scope": "import-security"}}},
+    {"l3extSubnet": {"attributes": {"dn": "uni/tn-t1/out-l3out2/instP-epg1/extsubnet-[0.0.0.0/0]", "ip": "0.0.0.0/0", "scope": "import-security"}}},
+    {"l3extSubnet": {"attributes": {"dn": "uni/tn-t1/out-l3out2/instP-epg2/extsubnet-[0.0.0.0/0]", "ip": "0.0.0.0/0", "scope": "export-rtctrl"}}},
+]
+
+
+@pytest.fixture
+def icurl_outputs():
+    return {
+        "fvCtx.json": fvCtx,
+        "fvRsCtx.json": fvRsCtx,
+        "fvSubnet.json": fvSubnet,
+        "fvRsBd.json": fvRsBd,
+        "l3extRsEctx.json": l3extRsEctx,
+        "l3extSubnet.json": l3extSubnet,
+    }
+
+
+@pytest.fixture
+def icurl_queries(monkeypatch, mock_icurl):
+    """Record the queries sent through `icurl()`"""
+    queries = []
+    _icurl = script._icurl
+
+    def _recorded_icurl(apitype, query, page=0, page_size=100000):
+        queries.append(query)
+        return _icurl(apitype, query, page, page_size)
+
+    monkeypatch.setattr(script, "_icurl", _recorded_icurl)
+    return queries
+
+
+def test_vrf_indexes(icurl_queries):
+    vrf_model = VrfModel()
+    assert vrf_model.vnid_to_vrf == {"2850816": "uni/tn-t1/ctx-v1", "2916352": "uni/tn-t1/ctx-v2"}
+    assert vrf_model.vrf_to_vnid == {"uni/tn-t1/ctx-v1": "2850816", "uni/tn-t1/ctx-v2": "2916352"}
+    assert vrf_model.bd_to_vrf["uni/tn-t1/BD-bd3"] == "uni/tn-t1/ctx-v2"
+    assert vrf_model.vrf_to_bds == {
+        "uni/tn-t1/ctx-v1": ["uni/tn-t1/BD-bd1", "uni/tn-t1/BD-bd2"],
+        "uni/tn-t1/ctx-v2": ["uni/tn-t1/BD-bd3"],
+    }
+    assert vrf_model.epg_to_bd == {"uni/tn-t1/ap-ap1/epg-epg1": "uni/tn-t1/BD-bd1"}
+    assert vrf_model.l3out_to_vrf == {
+        "uni/tn-t1/out-l3out1": "uni/tn-t1/ctx-v1",
+        "uni/tn-t1/out-l3out2": "uni/tn-t1/ctx-v2",
+    }
+    # Each class is queried only once even if it is used by multiple indexes
+    assert sorted(icurl_queries) == ["fvCtx.json", "fvRsBd.json", "fvRsCtx.json", "l3extRsEctx.json"]
+
+
+def test_subnet_indexes(icurl_queries):
+    vrf_model = VrfModel()
+    assert sorted(vrf_model.bd_to_subnets) == ["uni/tn-t1/BD-bd1", "uni/tn-t1/BD-bd2"]
+    assert [s["scope"] for s in vrf_model.bd_to_subnets["uni/tn-t1/BD-bd1"]] == ["private"]
+    assert list(vrf_model.epg_to_subnets) == ["uni/tn-t1/ap-ap1/epg-epg1"]
+    assert sorted(vrf_model.l3out_subnets) == ["uni/tn-t1/out-l3out1", "uni/tn-t1/out-l3out2"]
+    assert len(vrf_model.l3out_subnets["uni/tn-t1/out-l3out2"]) == 2
+    assert icurl_queries.count("fvSubnet.json") == 1
+
+
+def test_prefix_indexes(icurl_queries):
+    vrf_model = VrfModel()
+    v2_prefixes = vrf_model.l3out_prefixes["uni/tn-t1/ctx-v2"]
+    assert [s["scope"] for s in v2_prefixes["0.0.0.0/0"]] == ["import-security", "export-rtctrl"]
+    assert len(vrf_model.l3out_prefixes["uni/tn-t1/ctx-v1"]["0.0.0.0/0"]) == 1
+    assert sorted(icurl_queries) == ["l3extRsEctx.json", "l3extSubnet.json"]
+
+
+def test_index_not_queried_until_used(icurl_queries):
+    VrfModel()
+    assert icurl_queries == []
@@ -11,6 +11,14 @@ CheckManager = script.CheckManager
 # ----------------------------
 # Fixtures
 # ----------------------------
+@pytest.fixture(autouse=True)
+def run_files(monkeypatch, tmp_path):
+    """Files kept across runs are written in the current directory. Not in the repo."""
+    monkeypatch.setattr(script, "STATS_FILE", str(tmp_path / "stats.json"))
+    monkeypatch.setattr(script, "CHECKPOINT_FILE", str(tmp_path / "checkpoint.json"))
+    monkeypatch.setattr(script, "CHECKPOINT_DATA_FILE", str(tmp_path / "checkpoint_data.json"))
+
+
 @pytest.fixture
 def mock_query_common_data(monkeypatch, expected_common_data):
     def _mock_query_common_data(api_only, args_cversion, args_tversion, username, password):
@@ -168,3 +168,150 @@ def test_total_checks(args, expected_result):
 def test_max_threads(args, expected_result):
     args = script.parse_args(args)
     assert args.max_threads == expected_result
+
+
+@pytest.mark.parametrize(
+    "args, expected_result",
+    [
+        ([], None),
+        (["--workers"], 0),
+        (["--workers", "8"], 8),
+    ],
+)
+def test_workers(args, expected_result):
+    args = script.parse_args(args)
+    assert args.workers == expected_result
+
+
+@pytest.mark.parametrize(
+    "args, expected_result",
+    [
+        ([], []),
+        (["--check-timeout", "300"], [(None, 300)]),
+        (
+            ["--check-timeout", "300", "--check-timeout", "apic_database_size_check=600"],
+            [(None, 300), ("apic_database_size_check", 600)],
+        ),
+    ],
+)
+def test_check_timeout(args, expected_result):
+    args = script.parse_args(args)
+    assert args.check_timeout == expected_result
+
+
+@pytest.mark.parametrize("value", ["0", "abc", "apic_database_size_check=", "apic_database_size_check=-1"])
+def test_check_timeout_invalid(value):
+    with pytest.raises(SystemExit):
+        script.parse_args(["--check-timeout", value])
+
+
+@pytest.mark.parametrize(
+    "args, expected_result",
+    [
+        ([], None),
+        (["--processes"], 0),
+        (["--processes", "2"], 2),
+    ],
+)
+def test_processes(args, expected_result):
+    args = script.parse_args(args)
+    assert args.processes == expected_result
+
+
+@pytest.mark.parametrize(
+    "args, expected_result",
+    [
+        ([], False),
+        (["--ssh-control-master"], True),
+    ],
+)
+def test_ssh_control_master(args, expected_result):
+    args = script.parse_args(args)
+    assert args.ssh_control_master == expected_result
+
+
+@pytest.mark.parametrize(
+    "args, expected_result",
+    [
+        ([], "live"),
+        (["--json-results", "end"], "end"),
+        (["--json-results", "sync"], "sync"),
+    ],
+)
+def test_json_results(args, expected_result):
+    args = script.parse_args(args)
+    assert args.json_results == expected_result
+
+
+@pytest.mark.parametrize(
+    "args, expected_result",
+    [
+        ([], False),
+        (["--log-responses"], True),
+    ],
+)
+def test_log_responses(args, expected_result):
+    args = script.parse_args(args)
+    assert args.log_responses == expected_result
+
+
+@pytest.mark.parametrize(
+    "args, expected_result",
+    [
+        ([], None),
+        (["--columnar-rows", "1000"], 1000),
+    ],
+)
+def test_columnar_rows(args, expected_result):
+    args = script.parse_args(args)
+    assert args.columnar_rows == expected_result
+
+
+@pytest.mark.parametrize(
+    "args, expected_result",
+    [
+        ([], 6),
+        (["--bundle-compression", "0"], 0),
+        (["--bundle-compression", "9"], 9),
+    ],
+)
+def test_bundle_compression(args, expected_result):
+    args = script.parse_args(args)
+    assert args.bundle_compression == expected_result
+
+
+def test_bundle_compression_invalid():
+    with pytest.raises(SystemExit):
+        script.parse_args(["--bundle-compression", "10"])
+
+
+@pytest.mark.parametrize(
+    "args, expected_result",
+    [
+        ([], None),
+        (["--rerun-from", "preupgrade_validator_old.tgz"], "preupgrade_validator_old.tgz"),
+    ],
+)
+def test_rerun_from(tmp_path, monkeypatch, args, expected_result):
+    monkeypatch.chdir(str(tmp_path))
+    (tmp_path / "preupgrade_validator_old.tgz").write_bytes(b"")
+    args = script.parse_args(args)
+    assert args.rerun_from == expected_result
+
+
+def test_rerun_from_not_found(tmp_path, monkeypatch):
+    monkeypatch.chdir(str(tmp_path))
+    with pytest.raises(SystemExit):
+        script.parse_args(["--rerun-from", "summary.json"])
+
+
+@pytest.mark.parametrize(
+    "args, expected_result",
+    [
+        ([], False),
+        (["--resume"], True),
+    ],
+)
+def test_resume(args, expected_result):
+    args = script.parse_args(args)
+    assert args.resume == expected_result
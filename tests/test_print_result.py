@@ -0,0 +1,51 @@
+import importlib
+
+script = importlib.import_module("aci-preupgrade-validation-script")
+
+
+def test_format_table():
+    data = [["a", 1], ["long value to wrap", "  x  "], ["c\td", ""]]
+    assert script.format_table([{"name": "Name", "width": 8}, "Value"], data) == (
+        "  Name      Value\n"
+        "  ----      -----\n"
+        "  a         1\n"
+        "  long        x\n"
+        "  value to\n"
+        "  wrap\n"
+        "  c\n"
+        "  d"
+    )
+
+
+def test_format_table_invalid_data():
+    assert script.format_table(["h1"], []) == ""
+    assert script.format_table(["h1"], [["a"], "b"]) == ""
+
+
+def test_print_result_row_cap(tmp_path, capsys):
+    table_file = str(tmp_path / "tables" / "fake_check.txt")
+    data = [["node-%04d" % i] for i in range(10)]
+    script.print_result(
+        1, 1, "Fake Check", script.FAIL_O, headers=["Node"], data=data,
+        recommended_action="Fix it", table_file=table_file, max_rows=3,
+    )
+    output = capsys.readouterr().out
+    assert "node-0002" in output
+    assert "node-0003" not in output
+    assert "  ... 7 more rows. See {} for all rows.\n".format(table_file) in output
+    assert "  Recommended Action: Fix it\n" in output
+    with open(table_file, "r") as f:
+        content = f.read()
+    assert content.startswith("[Check 1/1] Fake Check... ")
+    assert all("node-%04d" % i in content for i in range(10))
+
+
+def test_print_result_within_row_cap(tmp_path, capsys):
+    table_file = str(tmp_path / "fake_check.txt")
+    data = [["node-%04d" % i] for i in range(3)]
+    script.print_result(
+        1, 1, "Fake Check", script.FAIL_O, headers=["Node"], data=data,
+        table_file=table_file, max_rows=3,
+    )
+    assert "node-0002" in capsys.readouterr().out
+    assert not tmp_path.joinpath("fake_check.txt").exists()
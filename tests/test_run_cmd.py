@@ -29,3 +29,35 @@ def test_run_cmd_output_type(cmd, splitlines, expected_type):
 def test_non_existing_command(cmd, splitlines, expected_output):
     with pytest.raises(CalledProcessError):
         script.run_cmd(cmd, splitlines)
+
+
+def test_response_log(caplog):
+    caplog.set_level("DEBUG")
+    script.run_cmd("echo abcde", splitlines=False)
+    assert "response: abcde\n" in caplog.messages
+
+
+@pytest.mark.parametrize(
+    "response, cap, expected",
+    [
+        ("abcde" * 2, 10, "abcdeabcde"),
+        ("abcde" * 100 + "vwxyz", 10, "abcde ...<495 bytes omitted out of 505>... vwxyz"),
+        (b"abcde" * 100 + b"vwxyz", 10, "abcde ...<495 bytes omitted out of 505>... vwxyz"),
+        ("abcde" * 100, None, "abcde" * 100),
+    ],
+)
+def test_CappedResponse(response, cap, expected):
+    assert str(script.CappedResponse(response, cap)) == expected
+
+
+def test_response_log_full_dump(tmp_path):
+    filepath = str(tmp_path / "responses.log")
+    script.enable_response_log(filepath)
+    try:
+        script.run_cmd("seq 10000", splitlines=False)
+    finally:
+        script.disable_response_log()
+    with open(filepath, "r") as f:
+        content = f.read()
+    assert "cmd = seq 10000\n1\n2\n" in content
+    assert "\n9999\n10000\n" in content